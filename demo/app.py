@@ -2,8 +2,10 @@
 
 import logging
 import os
+import tempfile
+import time
 from enum import Enum
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 import morecantile
 import uvicorn
@@ -15,9 +17,13 @@ from starlette.middleware.gzip import GZipMiddleware
 from starlette.requests import Request
 from starlette.responses import Response
 
+from rio_tiler.errors import TileOutsideBounds
 from rio_tiler.profiles import img_profiles
 from rio_tiler.utils import render
 from rio_tiler_crs import COGReader
+from rio_tiler_crs.cache import LRUCache, SharedTileCache, SingleFlight
+from rio_tiler_crs.profiles import get_profile
+from rio_tiler_crs.pyramid import resize
 
 log = logging.getLogger()
 
@@ -40,6 +46,43 @@ EPSG3413 = morecantile.TileMatrixSet.custom(
 )
 morecantile.tms.register(EPSG3413)
 
+# Highest tile scale (@3x), tiles are read at this scale and resized for the
+# lower scales
+MAX_TILE_SCALE = 3
+
+# Rendered tiles and highest resolution read of the recent tiles (shared by the
+# @1x/@2x/@3x requests). The cache file is shared by all the server workers, its
+# space is reserved when created (/dev/shm is 64MB by default in Docker), with a
+# fallback to a per-process cache when there is not enough space or when the file
+# was created with other options. Slots fit a @3x read of 4 bands of 16 bits data
+# and its mask, larger values (e.g float data) are not cached.
+TILE_CACHE_SLOTS = int(os.environ.get("TILE_CACHE_SLOTS", 32))
+TILE_CACHE_SLOT_SIZE = int(
+    os.environ.get(
+        "TILE_CACHE_SLOT_SIZE", (MAX_TILE_SCALE * 256) ** 2 * (4 * 2 + 1) + 2 ** 16
+    )
+)
+try:
+    tile_cache: Any = SharedTileCache(
+        os.environ.get(
+            "TILE_CACHE_PATH",
+            os.path.join(
+                "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(),
+                "rio-tiler-crs-tiles.cache",
+            ),
+        ),
+        slots=TILE_CACHE_SLOTS,
+        slot_size=TILE_CACHE_SLOT_SIZE,
+        ttl=300,
+        preallocate=True,
+    )
+except (OSError, ValueError) as err:
+    log.warning(f"Can't open the shared tile cache ({err}), using a local cache")
+    tile_cache = LRUCache(maxsize=TILE_CACHE_SLOTS, ttl=300)
+
+# Concurrent requests for the same tile wait for the in-flight read and render
+tile_flight = SingleFlight()
+
 
 class ImageType(str, Enum):
     """Image Type Enums."""
@@ -219,6 +262,24 @@ app.add_middleware(
 )
 app.add_middleware(GZipMiddleware, minimum_size=0)
 
+# GDAL options are process wide: the latency profile options are set once for
+# the server, the readers only use the profile warp options.
+PROFILE = get_profile("latency")
+gdal_env = PROFILE.gdal_env()
+
+
+@app.on_event("startup")
+def _startup():
+    """Set the GDAL options."""
+    gdal_env.__enter__()
+
+
+@app.on_event("shutdown")
+def _shutdown():
+    """Unset the GDAL options."""
+    gdal_env.__exit__()
+
+
 responses = {
     200: {
         "content": {
@@ -236,6 +297,62 @@ tile_routes_params: Dict[str, Any] = dict(
 )
 
 
+def _render_tile(
+    identifier: str, filename: str, z: int, x: int, y: int, scale: int, ext: ImageType
+) -> Tuple[bytes, Dict[str, float]]:
+    """
+    Read (or reuse the highest scale read of) a tile and render it.
+
+    Returns the image and the duration (in ms) of each stage (`cache`, `read`,
+    `resize` and `render`).
+
+    """
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+
+    def _stage(name: str):
+        nonlocal start
+        now = time.perf_counter()
+        timings[name] = timings.get(name, 0.0) + (now - start) * 1000
+        start = now
+
+    image_key = ("image", identifier, filename, z, x, y, scale, ext.value)
+    image = tile_cache.get(image_key)
+    if image is not None:
+        _stage("cache")
+        return image, timings
+
+    tms = morecantile.tms.get(identifier)
+    key = (identifier, filename, z, x, y)
+    cached = tile_cache.get(key)
+    _stage("cache")
+    if cached:
+        tile, mask = resize(cached[0], cached[1], scale * 256)
+        _stage("resize")
+    else:
+        # Read at the highest scale, so all the scales share the read
+        with COGReader(f"{filename}.tif", tms=tms, profile=PROFILE) as cog:  # type: ignore
+            tiles = cog.tile_scales(x, y, z, scales=(scale, MAX_TILE_SCALE))
+        _stage("read")
+        tile, mask = tiles[scale]
+        tile_cache.set(key, tiles[MAX_TILE_SCALE])
+        _stage("cache")
+
+    driver = drivers[ext.value]
+    options = img_profiles.get(driver.lower(), {})
+    image = render(tile, mask, img_format=ext.value, **options)
+    _stage("render")
+    tile_cache.set(image_key, image)
+    _stage("cache")
+    return image, timings
+
+
+@app.exception_handler(TileOutsideBounds)
+def _tile_outside_bounds(request: Request, exc: TileOutsideBounds):
+    """Return 404 for empty tiles."""
+    return Response(str(exc), status_code=404)
+
+
 @app.get(r"/tiles/{z}/{x}/{y}\.png", **tile_routes_params)
 @app.get(r"/tiles/{identifier}/{z}/{x}/{y}\.png", **tile_routes_params)
 @app.get(r"/tiles/{z}/{x}/{y}@{scale}x\.png", **tile_routes_params)
@@ -245,23 +362,35 @@ def _tile(
     x: int,
     y: int,
     scale: int = Query(
-        1, gt=0, lt=4, description="Tile size scale. 1=256x256, 2=512x512..."
+        1,
+        gt=0,
+        le=MAX_TILE_SCALE,
+        description="Tile size scale. 1=256x256, 2=512x512...",
     ),
     identifier: str = Query("WebMercatorQuad", title="TMS identifier"),
     filename: str = Query(...),
 ):
     """Handle /tiles requests."""
-    tms = morecantile.tms.get(identifier)
-    with COGReader(f"{filename}.tif", tms=tms) as cog:  # type: ignore
-        tile, mask = cog.tile(x, y, z, tilesize=scale * 256)
-
     ext = ImageType.png
-    driver = drivers[ext.value]
-    options = img_profiles.get(driver.lower(), {})
-
-    img = render(tile, mask, img_format="png", **options)
-
-    return TileResponse(img, media_type=mimetype[ext.value])
+    start = time.perf_counter()
+    img, timings = tile_flight.do(
+        (identifier, filename, z, x, y, scale, ext),
+        _render_tile,
+        identifier,
+        filename,
+        z,
+        x,
+        y,
+        scale,
+        ext,
+    )
+    # Time spent waiting for an identical in-flight request
+    wait = (time.perf_counter() - start) * 1000 - sum(timings.values())
+    timings = {**timings, "wait": max(wait, 0.0)}
+    server_timing = ", ".join(f"{k};dur={v:.2f}" for k, v in timings.items())
+    return TileResponse(
+        img, media_type=mimetype[ext.value], headers={"Server-Timing": server_timing},
+    )
 
 
 @app.get(
@@ -0,0 +1,400 @@
+"""
+Load test the demo tile server with map viewport sessions.
+
+Each session starts at a random point of the fixture at a random zoom level and
+then pans and zooms like a map viewer: each view requests its missing tiles
+(center first, with 6 parallel requests like a browser). Sessions are
+generated from `--seed`, so runs with the same options replay the same requests.
+
+The server (`app.py`) is started locally with a fresh tile cache, unless
+`--url` is set, and only the fixtures of `tests/fixtures` are read.
+
+$ pip install uvicorn fastapi
+$ python loadtest.py --sessions 20 --concurrency 4 --workers 2
+$ python loadtest.py --tms EPSG3413 --fixture cog_cmap --json results.json
+
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+import warnings
+from collections import defaultdict
+from concurrent import futures
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import morecantile
+import numpy
+from rasterio.crs import CRS
+
+from rio_tiler_crs import COGReader
+
+DEMO_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(DEMO_DIR, "..", "tests", "fixtures")
+
+# Same custom TMS as the tile server
+EPSG3413 = morecantile.TileMatrixSet.custom(
+    (-4194300, -4194300, 4194300, 4194300),
+    CRS.from_epsg(3413),
+    identifier="EPSG3413",
+    matrix_scale=[2, 2],
+)
+morecantile.tms.register(EPSG3413)
+
+TMS_IDENTIFIERS = ("WebMercatorQuad", "WorldCRS84Quad", "EPSG3413")
+
+# Pan is more common than zoom in map viewers
+ACTIONS = ("pan", "zoom_in", "zoom_out")
+ACTION_WEIGHTS = (6, 2, 2)
+
+Request = Tuple[str, morecantile.Tile]
+
+
+def viewport(
+    tms: morecantile.TileMatrixSet,
+    center: morecantile.Tile,
+    width: int = 4,
+    height: int = 3,
+) -> List[morecantile.Tile]:
+    """Return the tiles of a viewport, sorted from the center."""
+    matrix = tms.matrix(center.z)
+    tiles = [
+        morecantile.Tile(center.x + dx, center.y + dy, center.z)
+        for dy in range(-(height // 2), height - height // 2)
+        for dx in range(-(width // 2), width - width // 2)
+    ]
+    tiles = [
+        tile
+        for tile in tiles
+        if 0 <= tile.x < matrix.matrixWidth and 0 <= tile.y < matrix.matrixHeight
+    ]
+    return sorted(tiles, key=lambda t: (t.x - center.x) ** 2 + (t.y - center.y) ** 2)
+
+
+def _clamp(tms: morecantile.TileMatrixSet, tile: morecantile.Tile) -> morecantile.Tile:
+    """Keep a tile inside the TMS matrix."""
+    matrix = tms.matrix(tile.z)
+    return morecantile.Tile(
+        min(max(tile.x, 0), matrix.matrixWidth - 1),
+        min(max(tile.y, 0), matrix.matrixHeight - 1),
+        tile.z,
+    )
+
+
+def session(
+    tms: morecantile.TileMatrixSet,
+    bounds: Sequence[float],
+    minzoom: int,
+    maxzoom: int,
+    steps: int,
+    rng: random.Random,
+) -> List[List[morecantile.Tile]]:
+    """
+    Create the views of a pan/zoom session.
+
+    Returns the tiles requested by each view (tiles already loaded in the
+    session are not requested again).
+
+    """
+    lon = rng.uniform(bounds[0], bounds[2])
+    lat = rng.uniform(bounds[1], bounds[3])
+    center = tms.tile(lon, lat, rng.randint(minzoom, maxzoom))
+
+    loaded: Set[morecantile.Tile] = set()
+    views = []
+    for _ in range(steps):
+        tiles = [tile for tile in viewport(tms, center) if tile not in loaded]
+        loaded.update(tiles)
+        views.append(tiles)
+
+        action = rng.choices(ACTIONS, weights=ACTION_WEIGHTS)[0]
+        if action == "zoom_in" and center.z < maxzoom:
+            lon, lat = _tile_center(tms, center)
+            center = tms.tile(lon, lat, center.z + 1)
+        elif action == "zoom_out" and center.z > minzoom:
+            lon, lat = _tile_center(tms, center)
+            center = tms.tile(lon, lat, center.z - 1)
+        else:
+            dx, dy = rng.choice([(1, 0), (-1, 0), (0, 1), (0, -1)])
+            center = morecantile.Tile(center.x + dx, center.y + dy, center.z)
+
+        center = _clamp(tms, center)
+
+    return views
+
+
+def _tile_center(
+    tms: morecantile.TileMatrixSet, tile: morecantile.Tile
+) -> Tuple[float, float]:
+    """Return the WGS84 center of a tile."""
+    west, south, east, north = tms.bounds(tile)
+    return (west + east) / 2, (south + north) / 2
+
+
+def create_sessions(
+    fixture: str, identifiers: Sequence[str], count: int, steps: int, seed: int,
+) -> List[List[List[Request]]]:
+    """Create `count` sessions, spread over the TMS."""
+    rng = random.Random(seed)
+
+    grids = {}
+    for identifier in identifiers:
+        tms = morecantile.tms.get(identifier)
+        with COGReader(fixture, tms=tms) as cog:  # type: ignore
+            grids[identifier] = (tms, cog.bounds, cog.minzoom, cog.maxzoom)
+
+    sessions = []
+    with warnings.catch_warnings():
+        # Sessions can pan out of the TMS bounds, tiles are clamped
+        warnings.simplefilter("ignore", UserWarning)
+        for ix in range(count):
+            identifier = identifiers[ix % len(identifiers)]
+            tms, bounds, minzoom, maxzoom = grids[identifier]
+            views = session(tms, bounds, minzoom, maxzoom, steps, rng)
+            sessions.append([[(identifier, tile) for tile in view] for view in views])
+
+    return sessions
+
+
+def _parse_server_timing(header: Optional[str]) -> Dict[str, float]:
+    """Parse a `Server-Timing` header (e.g `read;dur=12.1, render;dur=3.2`)."""
+    timings: Dict[str, float] = {}
+    for metric in (header or "").split(","):
+        name, _, params = metric.strip().partition(";")
+        if name and params.startswith("dur="):
+            timings[name] = float(params[4:])
+
+    return timings
+
+
+def fetch(url: str, timeout: float = 60) -> Dict:
+    """Request a tile, return its status, latency (ms), size and server timings."""
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            body = response.read()
+            status = response.status
+            header = response.headers.get("Server-Timing")
+    except urllib.error.HTTPError as err:
+        body = err.read()
+        status = err.code
+        header = None
+    except (urllib.error.URLError, OSError):
+        body, status, header = b"", 0, None
+
+    return {
+        "status": status,
+        "latency": (time.perf_counter() - start) * 1000,
+        "size": len(body),
+        "stages": _parse_server_timing(header),
+    }
+
+
+def run(
+    endpoint: str,
+    fixture: str,
+    sessions: List[List[List[Request]]],
+    concurrency: int = 4,
+    connections: int = 6,
+) -> Tuple[List[Dict], float]:
+    """Replay the sessions with `concurrency` simultaneous users."""
+    filename = os.path.splitext(os.path.abspath(fixture))[0]
+    results: List[Dict] = []
+
+    with futures.ThreadPoolExecutor(max_workers=concurrency * connections) as pool:
+
+        def _request(request: Request) -> Dict:
+            identifier, tile = request
+            url = f"{endpoint}/tiles/{identifier}/{tile.z}/{tile.x}/{tile.y}.png?filename={filename}"
+            return {"tms": identifier, **fetch(url)}
+
+        def _session(views: List[List[Request]]) -> List[Dict]:
+            out: List[Dict] = []
+            for view in views:
+                out.extend(pool.map(_request, view))
+            return out
+
+        start = time.perf_counter()
+        with futures.ThreadPoolExecutor(max_workers=concurrency) as users:
+            for session_results in users.map(_session, sessions):
+                results.extend(session_results)
+        duration = time.perf_counter() - start
+
+    return results, duration
+
+
+def _percentiles(values: Sequence[float]) -> Dict[str, float]:
+    """Return mean/p50/p95/p99 of values."""
+    if not len(values):
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0}
+
+    p50, p95, p99 = numpy.percentile(values, [50, 95, 99])
+    return {
+        "mean": float(numpy.mean(values)),
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+    }
+
+
+def summarize(results: List[Dict], duration: float) -> Dict:
+    """Compute throughput, latency percentiles and stage breakdown."""
+    status: Dict[int, int] = defaultdict(int)
+    by_tms: Dict[str, List[float]] = defaultdict(list)
+    stages: Dict[str, List[float]] = defaultdict(list)
+    for result in results:
+        status[result["status"]] += 1
+        by_tms[result["tms"]].append(result["latency"])
+        for name, value in result["stages"].items():
+            stages[name].append(value)
+
+    latencies = [result["latency"] for result in results]
+    return {
+        "requests": len(results),
+        "duration": duration,
+        "rps": len(results) / duration if duration else 0.0,
+        "bytes": sum(result["size"] for result in results),
+        "status": dict(sorted(status.items())),
+        "latency": _percentiles(latencies),
+        "tms": {name: _percentiles(values) for name, values in by_tms.items()},
+        # Stages are only reported by the server for the tiles it rendered
+        "stages": {
+            name: {"count": len(values), **_percentiles(values)}
+            for name, values in stages.items()
+        },
+    }
+
+
+def report(summary: Dict) -> str:
+    """Format the summary as a text report."""
+
+    def _row(name: str, values: Dict) -> str:
+        return f"{name:<18}" + "".join(
+            f"{values[k]:>10.1f}" for k in ("mean", "p50", "p95", "p99")
+        )
+
+    header = f"{'':<18}" + "".join(f"{k:>10}" for k in ("mean", "p50", "p95", "p99"))
+    lines = [
+        f"requests: {summary['requests']} in {summary['duration']:.2f}s "
+        f"({summary['rps']:.1f} req/s, {summary['bytes'] / 1e6:.1f} MB)",
+        "status: " + ", ".join(f"{k}: {v}" for k, v in summary["status"].items()),
+        "",
+        "latency (ms)",
+        header,
+        _row("all", summary["latency"]),
+        *[_row(name, values) for name, values in summary["tms"].items()],
+        "",
+        "server stages (ms)",
+        header + f"{'count':>10}",
+        *[
+            _row(name, values) + f"{values['count']:>10}"
+            for name, values in summary["stages"].items()
+        ],
+    ]
+    return "\n".join(lines)
+
+
+def _free_port() -> int:
+    """Return a free local port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, workers: int, cache_path: str) -> subprocess.Popen:
+    """Start the demo server and wait until it accepts connections."""
+    env = {**os.environ, "TILE_CACHE_PATH": cache_path}
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+        ],
+        cwd=DEMO_DIR,
+        env=env,
+    )
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Tile server exited during startup")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return process
+        except OSError:
+            time.sleep(0.2)
+
+    process.terminate()
+    raise RuntimeError("Tile server didn't start")
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    """Run the load test."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--url", help="Use a running server (e.g http://127.0.0.1:8501)"
+    )
+    parser.add_argument("--fixture", default="cog", help="Fixture name (default: cog)")
+    parser.add_argument(
+        "--tms",
+        nargs="+",
+        default=list(TMS_IDENTIFIERS),
+        help="TileMatrixSets (default: WebMercatorQuad WorldCRS84Quad EPSG3413)",
+    )
+    parser.add_argument("--sessions", type=int, default=12, help="Number of sessions")
+    parser.add_argument("--steps", type=int, default=10, help="Views per session")
+    parser.add_argument("--concurrency", type=int, default=4, help="Simultaneous users")
+    parser.add_argument("--workers", type=int, default=1, help="Server workers")
+    parser.add_argument("--seed", type=int, default=0, help="Sessions random seed")
+    parser.add_argument("--json", help="Write the results to a JSON file")
+    args = parser.parse_args(argv)
+
+    fixture = os.path.join(FIXTURES_DIR, f"{args.fixture}.tif")
+    sessions = create_sessions(fixture, args.tms, args.sessions, args.steps, args.seed)
+
+    process = None
+    with tempfile.TemporaryDirectory() as tmpdir:
+        endpoint = args.url
+        if not endpoint:
+            port = _free_port()
+            cache_path = os.path.join(tmpdir, "tiles.cache")
+            process = start_server(port, args.workers, cache_path)
+            endpoint = f"http://127.0.0.1:{port}"
+
+        try:
+            results, duration = run(
+                endpoint.rstrip("/"), fixture, sessions, concurrency=args.concurrency
+            )
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+    summary = summarize(results, duration)
+    summary["options"] = vars(args)
+    print(report(summary))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
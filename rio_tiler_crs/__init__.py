@@ -1,6 +1,40 @@
 """rio-tiler-crs: Create tiles in different projection."""
 
-from .cogeo import COGReader  # noqa
-from .stac import STACReader  # noqa
+import importlib
+import sys
+from typing import TYPE_CHECKING, Any, List
 
 __version__ = "3.0.0-beta.7"
+
+# Readers are imported on first access (PEP 562), so `import rio_tiler_crs`
+# doesn't load rasterio, rio-tiler and morecantile.
+_lazy_imports = {
+    "COGReader": "cogeo",
+    "MosaicReader": "mosaic",
+    "STACReader": "stac",
+    "STACStackReader": "stack",
+}
+
+__all__ = list(_lazy_imports)
+
+if TYPE_CHECKING or sys.version_info < (3, 7):
+    from .cogeo import COGReader  # noqa
+    from .mosaic import MosaicReader  # noqa
+    from .stac import STACReader  # noqa
+    from .stack import STACStackReader  # noqa
+
+
+def __getattr__(name: str) -> Any:
+    """Import the readers on first access."""
+    if name in _lazy_imports:
+        module = importlib.import_module(f".{_lazy_imports[name]}", __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> List[str]:
+    """List module attributes, including the lazy ones."""
+    return sorted(set(globals()) | set(_lazy_imports))
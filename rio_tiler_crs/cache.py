@@ -0,0 +1,474 @@
+"""rio-tiler-crs.cache: in-memory caches and request deduplication."""
+
+import hashlib
+import io
+import mmap
+import os
+import struct
+import threading
+import time
+import warnings
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import attr
+import numpy
+
+try:
+    import fcntl
+except ImportError:  # pragma: nocover
+    fcntl = None  # type: ignore
+
+
+@attr.s
+class LRUCache:
+    """
+    Thread-safe Least Recently Used cache with optional time-to-live.
+
+    Examples
+    --------
+    cache = LRUCache(maxsize=128, ttl=60)
+    cache.set("key", value)
+    cache.get("key")
+
+    Attributes
+    ----------
+    maxsize: int, optional
+        Maximum number of entries (default is 512).
+    ttl: float, optional
+        Entries time-to-live in seconds (default is None, entries never expire).
+
+    """
+
+    maxsize: int = attr.ib(default=512)
+    ttl: Optional[float] = attr.ib(default=None)
+
+    _data: Dict[Hashable, Tuple[float, Any]] = attr.ib(init=False, factory=OrderedDict)
+    _lock: threading.Lock = attr.ib(init=False, factory=threading.Lock)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the value for key, or default if missing or expired."""
+        with self._lock:
+            try:
+                created, value = self._data[key]
+            except KeyError:
+                return default
+
+            if self.ttl is not None and time.monotonic() - created > self.ttl:
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)  # type: ignore
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        """Set the value for key and evict the least recently used entries."""
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)  # type: ignore
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)  # type: ignore
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove key and return its value."""
+        with self._lock:
+            try:
+                return self._data.pop(key)[1]
+            except KeyError:
+                return default
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Check if key is in the cache (and not expired)."""
+        sentinel = object()
+        return self.get(key, sentinel) is not sentinel
+
+    def __len__(self) -> int:
+        """Number of entries (including expired ones not yet evicted)."""
+        return len(self._data)
+
+
+@attr.s
+class _Call:
+    """In-flight call."""
+
+    done: threading.Event = attr.ib(factory=threading.Event)
+    result: Any = attr.ib(default=None)
+    error: Optional[BaseException] = attr.ib(default=None)
+
+
+@attr.s
+class SingleFlight:
+    """
+    Deduplicate concurrent calls with the same key.
+
+    The first caller for a key runs the function, callers arriving while it is
+    running wait and get the same result (or exception). Nothing is kept once
+    the call is done.
+
+    Examples
+    --------
+    flight = SingleFlight()
+    flight.do(("WebMercatorQuad", 1, 1, 2), cog.tile, 1, 1, 2)
+
+    """
+
+    _calls: Dict[Hashable, _Call] = attr.ib(init=False, factory=dict)
+    _lock: threading.Lock = attr.ib(init=False, factory=threading.Lock)
+
+    def do(self, key: Hashable, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Run func, or wait for the in-flight call with the same key."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+    def __len__(self) -> int:
+        """Number of in-flight calls."""
+        return len(self._calls)
+
+
+_MAGIC = b"RTCTILE1"
+_FILE_HEADER = struct.Struct("<8sIIQ")  # magic, slots, ways, slot size
+_SLOT_HEADER = struct.Struct("<Q16sQdd")  # seq, key digest, length, created, accessed
+_DATA_OFFSET = 64
+_EMPTY_DIGEST = bytes(16)
+
+_VALUE = struct.Struct("<cQ")  # type, length
+_NUMBER = struct.Struct("<d")
+
+
+def _key_digest(key: Hashable) -> bytes:
+    """Return a digest of the key `repr`, stable between processes."""
+    return hashlib.blake2b(repr(key).encode(), digest_size=16).digest()
+
+
+def _encode_item(value: Any) -> bytes:
+    """Encode bytes, numpy arrays and numbers, without pickle."""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        kind, payload = b"b", bytes(value)
+    elif isinstance(value, numpy.ndarray):
+        buf = io.BytesIO()
+        numpy.lib.format.write_array(buf, value, allow_pickle=False)
+        kind, payload = b"a", buf.getvalue()
+    elif isinstance(value, bool) or value is None:
+        raise TypeError(f"Can't store {type(value)} in a SharedTileCache")
+    elif isinstance(value, int):
+        kind, payload = b"i", value.to_bytes(8, "little", signed=True)
+    elif isinstance(value, float):
+        kind, payload = b"f", _NUMBER.pack(value)
+    else:
+        raise TypeError(f"Can't store {type(value)} in a SharedTileCache")
+
+    return _VALUE.pack(kind, len(payload)) + payload
+
+
+def _encode(value: Any) -> bytes:
+    """Encode a value or a tuple of values."""
+    if isinstance(value, tuple):
+        return b"t" + b"".join(_encode_item(item) for item in value)
+
+    return b"v" + _encode_item(value)
+
+
+def _decode(payload: bytes) -> Any:
+    """Decode a value encoded with `_encode`."""
+    items: List[Any] = []
+    offset = 1
+    while offset < len(payload):
+        kind, length = _VALUE.unpack_from(payload, offset)
+        offset += _VALUE.size
+        data = payload[offset : offset + length]
+        offset += length
+        if kind == b"b":
+            items.append(data)
+        elif kind == b"a":
+            items.append(
+                numpy.lib.format.read_array(io.BytesIO(data), allow_pickle=False)
+            )
+        elif kind == b"i":
+            items.append(int.from_bytes(data, "little", signed=True))
+        else:
+            items.append(_NUMBER.unpack(data)[0])
+
+    return tuple(items) if payload[:1] == b"t" else items[0]
+
+
+def _allocate(fd: int, size: int):
+    """Reserve the space of a new file (OSError if the filesystem is full)."""
+    if hasattr(os, "posix_fallocate"):
+        os.posix_fallocate(fd, 0, size)
+        return
+
+    # e.g macOS: write the file blocks
+    chunk = bytes(2 ** 20)
+    for offset in range(0, size, len(chunk)):
+        os.pwrite(fd, chunk[: size - offset], offset)
+
+
+@attr.s
+class SharedTileCache:
+    """
+    Cache shared between processes, backed by a memory mapped file.
+
+    Every process (e.g uvicorn/gunicorn workers) opening the same `path` shares
+    the entries. The file is split in fixed size slots grouped in sets of
+    `ways` slots: a key can only be stored in its set, and the least recently
+    used slot of the set is evicted. Reads don't take any lock, a sequence
+    number in each slot header is checked before and after the copy (a slot
+    rewritten during a read is a cache miss). Writes lock the set (record lock
+    on the file) so concurrent writers don't interleave.
+
+    Values can be bytes, numpy arrays, numbers or tuples of those (e.g the
+    (data, mask) of a tile). Values larger than `slot_size` are not cached (a
+    warning is emitted): size the slots for the largest tiles, e.g a 512x512
+    tile of 3 uint16 bands and its mask needs 512 * 512 * (3 * 2 + 1) bytes
+    plus a few hundred bytes of headers.
+    Keys are identified by a digest of their `repr`, which must be stable
+    between processes (e.g tuples of str and int).
+
+    Examples
+    --------
+    cache = SharedTileCache("/dev/shm/tiles.cache", slots=1024, slot_size=2**20)
+    cache.set(("cog.tif", 1, 1, 2), (data, mask))
+    data, mask = cache.get(("cog.tif", 1, 1, 2))
+
+    Attributes
+    ----------
+    path: str
+        Cache file path (use a `tmpfs`, e.g /dev/shm, to keep it in memory).
+    slots: int, optional
+        Number of entries (default is 1024).
+    slot_size: int, optional
+        Maximum size of an encoded value in bytes (default is 1MB, enough for
+        a 256x256 tile of 3 float32 bands and its mask).
+    ways: int, optional
+        Number of slots per set (default is 8).
+    ttl: float, optional
+        Entries time-to-live in seconds (default is None, entries never expire).
+    preallocate: bool, optional
+        Reserve the file space when opening the cache (default is False). The
+        file is sparse otherwise, and writing to a full filesystem (e.g a small
+        /dev/shm) kills the process with SIGBUS; with `preallocate` an OSError
+        is raised when opening instead.
+
+    """
+
+    path: str = attr.ib()
+    slots: int = attr.ib(default=1024)
+    slot_size: int = attr.ib(default=2 ** 20)
+    ways: int = attr.ib(default=8)
+    ttl: Optional[float] = attr.ib(default=None)
+    preallocate: bool = attr.ib(default=False)
+
+    _fd: int = attr.ib(init=False, default=-1)
+    _map: mmap.mmap = attr.ib(init=False, default=None)
+    _lock: threading.Lock = attr.ib(init=False, factory=threading.Lock)
+
+    def __attrs_post_init__(self):
+        """Create or open the cache file."""
+        if fcntl is None:
+            raise RuntimeError("SharedTileCache requires fcntl (POSIX systems)")
+
+        self.ways = max(1, min(self.ways, self.slots))
+        self.slots -= self.slots % self.ways
+        size = _DATA_OFFSET + self.slots * self._stride
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            self._map = self._open(fd, size)
+        except BaseException:
+            os.close(fd)
+            raise
+
+        self._fd = fd
+
+    def _open(self, fd: int, size: int) -> mmap.mmap:
+        """Initialize (if new) and map the cache file."""
+        expected = _FILE_HEADER.pack(_MAGIC, self.slots, self.ways, self.slot_size)
+        fcntl.lockf(fd, fcntl.LOCK_EX, _DATA_OFFSET, 0)
+        try:
+            header = os.pread(fd, _FILE_HEADER.size, 0)
+            if not header.strip(b"\x00"):
+                os.ftruncate(fd, size)
+                if self.preallocate:
+                    try:
+                        _allocate(fd, size)
+                    except OSError:
+                        os.ftruncate(fd, 0)
+                        raise
+
+                os.pwrite(fd, expected, 0)
+                header = expected
+        finally:
+            fcntl.lockf(fd, fcntl.LOCK_UN, _DATA_OFFSET, 0)
+
+        if header != expected:
+            raise ValueError(
+                f"{self.path} is not a cache file or was created with other options"
+            )
+
+        return mmap.mmap(fd, size)
+
+    @property
+    def _stride(self) -> int:
+        """Slot size, header included (aligned on 64 bytes)."""
+        return -(-(_SLOT_HEADER.size + self.slot_size) // 64) * 64
+
+    def _set_offsets(self, digest: bytes) -> List[int]:
+        """Return the offsets of the slots where a key can be stored."""
+        index = int.from_bytes(digest[:8], "little") % (self.slots // self.ways)
+        first = _DATA_OFFSET + index * self.ways * self._stride
+        return [first + ix * self._stride for ix in range(self.ways)]
+
+    def _expired(self, created: float, now: float) -> bool:
+        """Check if an entry created at `created` is expired."""
+        return self.ttl is not None and now - created > self.ttl
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the value for key, or default if missing or expired."""
+        digest = _key_digest(key)
+        now = time.time()
+        for offset in self._set_offsets(digest):
+            seq, slot_digest, length, created, _ = _SLOT_HEADER.unpack_from(
+                self._map, offset
+            )
+            if seq % 2 or slot_digest != digest:
+                continue
+
+            if self._expired(created, now):
+                return default
+
+            start = offset + _SLOT_HEADER.size
+            payload = self._map[start : start + length]
+            if _SLOT_HEADER.unpack_from(self._map, offset)[0] != seq:
+                return default  # Slot rewritten during the read
+
+            # Approximate LRU: racing updates of the access time are harmless
+            struct.pack_into("<d", self._map, offset + 40, now)
+            return _decode(payload)
+
+        return default
+
+    def set(self, key: Hashable, value: Any) -> bool:
+        """Set the value for key (return False if the value is too large)."""
+        payload = _encode(value)
+        if len(payload) > self.slot_size:
+            warnings.warn(
+                f"{len(payload)} bytes value is larger than the cache slots "
+                f"({self.slot_size} bytes), it is not cached",
+                UserWarning,
+            )
+            return False
+
+        digest = _key_digest(key)
+        offsets = self._set_offsets(digest)
+        fd = self._fd
+        with self._lock:
+            fcntl.lockf(fd, fcntl.LOCK_EX, self.ways * self._stride, offsets[0])
+            try:
+                headers = [_SLOT_HEADER.unpack_from(self._map, o) for o in offsets]
+                now = time.time()
+
+                def _priority(ix: int) -> Tuple[int, float]:
+                    _, slot_digest, _, created, accessed = headers[ix]
+                    if slot_digest == digest:
+                        return (0, 0.0)
+                    if slot_digest == _EMPTY_DIGEST or self._expired(created, now):
+                        return (1, 0.0)
+                    return (2, accessed)
+
+                ix = min(range(len(offsets)), key=_priority)
+                offset, seq = offsets[ix], headers[ix][0]
+
+                struct.pack_into("<Q", self._map, offset, seq + 1)
+                start = offset + _SLOT_HEADER.size
+                self._map[start : start + len(payload)] = payload
+                _SLOT_HEADER.pack_into(
+                    self._map, offset, seq + 1, digest, len(payload), now, now
+                )
+                struct.pack_into("<Q", self._map, offset, seq + 2)
+            finally:
+                fcntl.lockf(fd, fcntl.LOCK_UN, self.ways * self._stride, offsets[0])
+
+        return True
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove key and return its value."""
+        value = self.get(key, default)
+        digest = _key_digest(key)
+        offsets = self._set_offsets(digest)
+        fd = self._fd
+        with self._lock:
+            fcntl.lockf(fd, fcntl.LOCK_EX, self.ways * self._stride, offsets[0])
+            try:
+                for offset in offsets:
+                    seq, slot_digest = _SLOT_HEADER.unpack_from(self._map, offset)[:2]
+                    if slot_digest == digest:
+                        _SLOT_HEADER.pack_into(
+                            self._map, offset, seq + 2, _EMPTY_DIGEST, 0, 0.0, 0.0
+                        )
+            finally:
+                fcntl.lockf(fd, fcntl.LOCK_UN, self.ways * self._stride, offsets[0])
+
+        return value
+
+    def clear(self):
+        """Remove all entries."""
+        fd = self._fd
+        with self._lock:
+            fcntl.lockf(fd, fcntl.LOCK_EX, 0, _DATA_OFFSET)
+            try:
+                for ix in range(self.slots):
+                    offset = _DATA_OFFSET + ix * self._stride
+                    seq = _SLOT_HEADER.unpack_from(self._map, offset)[0]
+                    _SLOT_HEADER.pack_into(
+                        self._map, offset, seq + 2, _EMPTY_DIGEST, 0, 0.0, 0.0
+                    )
+            finally:
+                fcntl.lockf(fd, fcntl.LOCK_UN, 0, _DATA_OFFSET)
+
+    def close(self):
+        """Close the memory map and the file."""
+        if self._map is not None:
+            self._map.close()
+            os.close(self._fd)
+            self._map = None
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Check if key is in the cache (and not expired)."""
+        sentinel = object()
+        return self.get(key, sentinel) is not sentinel
+
+    def __len__(self) -> int:
+        """Number of entries (including expired ones not yet evicted)."""
+        return sum(
+            _SLOT_HEADER.unpack_from(self._map, _DATA_OFFSET + ix * self._stride)[1]
+            != _EMPTY_DIGEST
+            for ix in range(self.slots)
+        )
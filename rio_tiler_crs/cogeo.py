@@ -1,22 +1,58 @@
 """rio-tiler-crs.cogeo."""
 
+import threading
 from concurrent import futures
-from typing import Any, Dict, Optional, Sequence, Tuple
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
 
 import attr
 import morecantile
 import numpy
+from rasterio.crs import CRS
 from rasterio.transform import from_bounds
-from rasterio.warp import calculate_default_transform
+from rasterio.warp import calculate_default_transform, transform, transform_bounds
+from rasterio.windows import Window
 
 from rio_tiler import constants, reader
 from rio_tiler.errors import TileOutsideBounds
 from rio_tiler.expression import apply_expression, parse_expression
 from rio_tiler.io import COGReader as RioTilerReader
+from rio_tiler.mosaic import mosaic_reader
+from rio_tiler.mosaic.methods.base import MosaicMethodBase
+
+from .coverage import CoverageIndex, coverage_cache, footprint, polygon_intersects
+from .export import write_tiles
+from .masks import PackedMask, combine, masked_array, pack, to_uint8
+from .prefetch import ReadPlan, plan_reads, prefetch
+from .profiles import PerformanceProfile, get_profile
+from .pyramid import resize, tile_pyramid
+from .stats import stream_stats
+from .tms import prepare
 
 default_tms = morecantile.tms.get("WebMercatorQuad")
 
 
+@attr.s
+class TMSMetadata:
+    """COG zoom levels and footprint (None if it can't be represented) for a TMS."""
+
+    tms: morecantile.TileMatrixSet = attr.ib()
+    minzoom: int = attr.ib()
+    maxzoom: int = attr.ib()
+    footprint: Optional[numpy.ndarray] = attr.ib()
+
+
 def geotiff_options(
     x: int,
     y: int,
@@ -57,6 +93,18 @@ class COGReader(RioTilerReader):
         Rasterio dataset.
     tms: morecantile.TileMatrixSet, optional
         TileMatrixSet to use, default is WebMercatorQuad.
+    coverage_index: bool, optional
+        Skip the reads for tiles without valid pixels, using a low resolution
+        coverage index of the dataset (default is False).
+    profile: str or rio_tiler_crs.profiles.PerformanceProfile, optional
+        Performance profile (`latency`, `throughput`, `low-memory` or a custom
+        profile) whose warp options are the reader default `vrt_options`. The
+        profile GDAL options are process wide, they are not set by the reader
+        (see `PerformanceProfile.gdal_env`).
+    tile_cache: rio_tiler_crs.cache.LRUCache or SharedTileCache, optional
+        Cache for the tiles read by `tile` (default is None, no cache). The
+        cache can be shared between readers (and between processes for a
+        SharedTileCache), cached tiles must not be modified in place.
 
     Properties
     ----------
@@ -71,42 +119,89 @@ class COGReader(RioTilerReader):
     colormap: dict
         COG internal colormap.
     info: dict
-        General information about the COG (datatype, indexes, ...)
+        General information about the COG (datatype, indexes, performance profile, ...)
+    footprint: numpy.ndarray
+        COG footprint polygon in TMS projection (None if it can't be represented).
+    coverage: rio_tiler_crs.coverage.CoverageIndex
+        COG coverage index (created on first use and shared between readers).
 
     Methods
     -------
     tile(0, 0, 0, indexes=(1,2,3), expression="B1/B2", tilesize=512, resampling_methods="nearest")
         Read a map tile from the COG.
+    tile_scales(0, 0, 0, scales=(1, 2), tilesize=256)
+        Read a map tile at multiple scales from one read.
+    tms_metadata(tms)
+        Get the COG zoom levels and footprint for another TMS (cached).
     part((0,10,0,10), indexes=(1,2,3,), expression="B1/B20", max_size=1024)
         Read part of the COG.
     preview(max_size=1024)
         Read preview of the COG.
     point((10, 10), indexes=1)
         Read a point value from the COG.
+    points([(10, 10), (11, 11)], indexes=1)
+        Read values for multiple points from the COG.
     stats(pmin=5, pmax=95)
         Get Raster statistics.
     meta(pmin=5, pmax=95)
         Get info + raster statistics
+    streaming_stats(pmin=5, pmax=95, overview_level=0)
+        Get Raster statistics by streaming over the internal blocks.
+    tile_stats(7, tilesize=256)
+        Get per-tile statistics for all the tiles of a zoom level.
+    pyramid(minzoom=5, maxzoom=8, method="mean")
+        Create the tiles of multiple zoom levels from the max zoom tiles.
+    export("out.tif", 8, bounds=(-60, 72, -55, 74))
+        Export a zoom level to a GeoTIFF aligned on the TMS grid.
+    to_xarray(8, bounds=(-60, 72, -55, 74))
+        Get a zoom level as a lazy xarray.DataArray (one dask chunk per tile).
+    prefetch([(0, 0, 1), (1, 0, 1)], tilesize=256)
+        Coalesce and prefetch the internal blocks needed for multiple tiles.
 
     """
 
     tms: morecantile.TileMatrixSet = attr.ib(default=default_tms)
+    coverage_index: bool = attr.ib(default=False)
+    profile: Optional[Union[str, PerformanceProfile]] = attr.ib(default=None)
+    tile_cache: Optional[Any] = attr.ib(default=None)
 
-    def _get_zooms(self):
-        """Calculate raster min/max zoom level."""
+    _tms_metadata: Dict[int, TMSMetadata] = attr.ib(init=False, factory=dict)
+    _profile: Optional[PerformanceProfile] = attr.ib(init=False, default=None)
+
+    def __attrs_post_init__(self):
+        """Apply the performance profile and open the dataset."""
+        if self.profile is not None:
+            self._profile = get_profile(self.profile)
+            self.vrt_options = {**self._profile.vrt_options, **(self.vrt_options or {})}
+
+        super().__attrs_post_init__()
+
+    def info(self) -> Dict:
+        """Return COG info, with the performance profile settings."""
+        meta = super().info()
+        if self._profile is not None:
+            meta["profile"] = {
+                "name": self._profile.name,
+                "vrt_options": self._kwargs.get("vrt_options"),
+            }
+
+        return meta
+
+    def _zooms(self, tms: morecantile.TileMatrixSet) -> Tuple[int, int]:
+        """Calculate raster min/max zoom level for a TMS."""
+        prepared = prepare(tms)
 
         def _zoom_for_pixelsize(pixel_size, max_z=24):
             """Get zoom level corresponding to a pixel resolution."""
             for z in range(max_z):
-                matrix = self.tms.matrix(z)
-                if pixel_size > self.tms._resolution(matrix):
+                if pixel_size > prepared.resolution(z):
                     return max(0, z - 1)  # We don't want to scale up
 
             return max_z - 1
 
         dst_affine, w, h = calculate_default_transform(
             self.dataset.crs,
-            self.tms.crs,
+            tms.crs,
             self.dataset.width,
             self.dataset.height,
             *self.dataset.bounds,
@@ -114,20 +209,55 @@ class COGReader(RioTilerReader):
         resolution = max(abs(dst_affine[0]), abs(dst_affine[4]))
         max_zoom = _zoom_for_pixelsize(resolution)
 
-        matrix = self.tms.tileMatrix[0]
+        matrix = tms.tileMatrix[0]
         ovr_resolution = (
             resolution * max(h, w) / max(matrix.tileWidth, matrix.tileHeight)
         )
         min_zoom = _zoom_for_pixelsize(ovr_resolution)
 
+        return min_zoom, max_zoom
+
+    def _get_zooms(self):
+        """Calculate raster min/max zoom level."""
+        min_zoom, max_zoom = self._zooms(self.tms)
+
         self.minzoom = self.minzoom or min_zoom
         self.maxzoom = self.maxzoom or max_zoom
 
         return
 
-    def _tile_exists(self, tile: morecantile.Tile):
-        """Check if a tile is inside a given bounds."""
-        tile_bounds = self.tms.bounds(*tile)
+    def tms_metadata(
+        self, tms: Optional[morecantile.TileMatrixSet] = None
+    ) -> TMSMetadata:
+        """Return the COG zoom levels and footprint for a TMS (cached per TMS)."""
+        tms = tms or self.tms
+        metadata = self._tms_metadata.get(id(tms))
+        if metadata is None or metadata.tms is not tms:
+            if tms is self.tms:
+                minzoom, maxzoom = self.minzoom, self.maxzoom
+            else:
+                minzoom, maxzoom = self._zooms(tms)
+
+            metadata = TMSMetadata(tms, minzoom, maxzoom, footprint(self.dataset, tms))
+            self._tms_metadata[id(tms)] = metadata
+
+        return metadata
+
+    @property
+    def footprint(self) -> Optional[numpy.ndarray]:
+        """Return the COG footprint polygon in the TMS CRS."""
+        return self.tms_metadata().footprint
+
+    def _tile_exists(
+        self, tile: morecantile.Tile, tms: Optional[morecantile.TileMatrixSet] = None,
+    ):
+        """Check if a tile intersects the COG footprint."""
+        tms = tms or self.tms
+        polygon = self.tms_metadata(tms).footprint
+        if polygon is not None:
+            return polygon_intersects(polygon, prepare(tms).xy_bounds(*tile))
+
+        tile_bounds = prepare(tms).bounds(*tile)
         return (
             (tile_bounds[0] < self.bounds[2])
             and (tile_bounds[2] > self.bounds[0])
@@ -135,6 +265,53 @@ class COGReader(RioTilerReader):
             and (tile_bounds[1] < self.bounds[3])
         )
 
+    def _tiles(
+        self,
+        zoom: int,
+        bounds: Optional[Tuple[float, float, float, float]] = None,
+        tms: Optional[morecantile.TileMatrixSet] = None,
+    ) -> List[morecantile.Tile]:
+        """
+        Return the tiles of a zoom level intersecting the COG (and `bounds`).
+
+        Tiles are selected in the TMS coordinates, from the COG footprint
+        bounding box (or the densified WGS84 `bounds`), so they cover the COG
+        in any projection (e.g polar grids).
+
+        """
+        tms = tms or self.tms
+        polygon = self.tms_metadata(tms).footprint
+        if polygon is None:
+            tiles = tms.tiles(*(bounds or self.bounds), zooms=zoom)
+            return [tile for tile in tiles if self._tile_exists(tile, tms)]
+
+        left, bottom = polygon.min(axis=0).tolist()
+        right, top = polygon.max(axis=0).tolist()
+        if bounds is not None:
+            xmin, ymin, xmax, ymax = transform_bounds(
+                constants.WGS84_CRS, tms.crs, *bounds, densify_pts=21
+            )
+            left, bottom = max(left, xmin), max(bottom, ymin)
+            right, top = min(right, xmax), min(top, ymax)
+            if left >= right or bottom >= top:
+                return []
+
+        tiles = prepare(tms).xy_tiles((left, bottom, right, top), zoom)
+        return [tile for tile in tiles if self._tile_exists(tile, tms)]
+
+    @property
+    def coverage(self) -> CoverageIndex:
+        """Return the COG coverage index."""
+        nodata = self._kwargs.get("nodata")
+        key = (self.filepath, nodata)
+        index = coverage_cache.get(key) if self.filepath else None
+        if index is None:
+            index = CoverageIndex.from_dataset(self.dataset, nodata=nodata)
+            if self.filepath:
+                coverage_cache.set(key, index)
+
+        return index
+
     def tile(
         self,
         tile_x: int,
@@ -143,10 +320,12 @@ class COGReader(RioTilerReader):
         tilesize: int = 256,
         indexes: Optional[Sequence] = None,
         expression: Optional[str] = "",
+        tms: Optional[morecantile.TileMatrixSet] = None,
         **kwargs: Any,
     ) -> Tuple[numpy.ndarray, numpy.ndarray]:
-        """Read a TMS map tile from a COG."""
+        """Read a TMS map tile from a COG (in the reader TMS or in `tms`)."""
         kwargs = {**self._kwargs, **kwargs}
+        tms = tms or self.tms
 
         if isinstance(indexes, int):
             indexes = (indexes,)
@@ -155,43 +334,801 @@ class COGReader(RioTilerReader):
             indexes = parse_expression(expression)
 
         tile = morecantile.Tile(x=tile_x, y=tile_y, z=tile_z)
-        if not self._tile_exists(tile):
+        if not self._tile_exists(tile, tms):
             raise TileOutsideBounds(
                 "Tile {}/{}/{} is outside image bounds".format(tile_z, tile_x, tile_y)
             )
 
-        tile_bounds = self.tms.xy_bounds(*tile)
-        tile, mask = reader.part(
+        if self.coverage_index and self.coverage.is_empty(tms, tile):
+            raise TileOutsideBounds(
+                "Tile {}/{}/{} has no valid pixel".format(tile_z, tile_x, tile_y)
+            )
+
+        cache_key = None
+        if self.tile_cache is not None and self.filepath:
+            # Options are part of the key, functions (post_process) can't be
+            if not any(callable(value) for value in kwargs.values()):
+                cache_key = (
+                    "tile",
+                    self.filepath,
+                    prepare(tms).key,
+                    *tile,
+                    tilesize,
+                    tuple(indexes) if indexes else None,
+                    expression,
+                    repr(sorted(kwargs.items())),
+                )
+                cached = self.tile_cache.get(cache_key)
+                if cached is not None:
+                    return cached
+
+        tile_bounds = prepare(tms).xy_bounds(*tile)
+        data, mask = reader.part(
             self.dataset,
             tile_bounds,
             tilesize,
             tilesize,
-            dst_crs=self.tms.crs,
+            dst_crs=tms.crs,
             indexes=indexes,
             **kwargs,
         )
         if expression:
             blocks = expression.lower().split(",")
             bands = [f"b{bidx}" for bidx in indexes]
-            tile = apply_expression(blocks, bands, tile)
+            data = apply_expression(blocks, bands, data)
+
+        if cache_key is not None:
+            self.tile_cache.set(cache_key, (data, mask))
+
+        return data, mask
+
+    def tile_scales(
+        self,
+        tile_x: int,
+        tile_y: int,
+        tile_z: int,
+        scales: Sequence[int] = (1, 2),
+        tilesize: int = 256,
+        method: str = "nearest",
+        **kwargs: Any,
+    ) -> Dict[int, Tuple[numpy.ndarray, numpy.ndarray]]:
+        """
+        Read a TMS map tile at multiple scales (e.g @1x and @2x) from one read.
+
+        The tile is read once at the highest scale and downsampled in numpy for
+        the lower scales.
+
+        Attributes
+        ----------
+        tile_x: int
+            TMS tile X index.
+        tile_y: int
+            TMS tile Y index.
+        tile_z: int
+            TMS tile ZOOM level.
+        scales: sequence of int, optional
+            Tile size scales (default is (1, 2)).
+        tilesize: int, optional (default: 256)
+            Tile size at scale 1.
+        method: str, optional
+            Downsampling method, `nearest` or `mean` (default is `nearest`).
+        kwargs: dict, optional
+            These will be passed to the 'tile' method.
 
-        return tile, mask
+        Returns
+        -------
+        tiles: dict
+            (data, mask) for each scale.
+
+        """
+        max_scale = max(scales)
+        data, mask = self.tile(
+            tile_x, tile_y, tile_z, tilesize=tilesize * max_scale, **kwargs
+        )
+        return {
+            scale: resize(data, mask, tilesize * scale, method=method)
+            for scale in scales
+        }
+
+    def points(
+        self,
+        coords: Sequence[Tuple[float, float]],
+        coord_crs: CRS = constants.WGS84_CRS,
+        indexes: Optional[Sequence] = None,
+        expression: Optional[str] = "",
+        **kwargs: Any,
+    ) -> numpy.ma.MaskedArray:
+        """
+        Read values for multiple points from a COG.
+
+        Coordinates are transformed in one call and grouped by internal block,
+        so each block is read only once. Values are read from the source pixels
+        (nearest), `vrt_options` and `resampling_method` are not used.
+
+        Attributes
+        ----------
+        coords: sequence of (x, y)
+            Point coordinates in `coord_crs`.
+        coord_crs: CRS, optional
+            Coordinates reference system, default is "epsg:4326".
+        indexes: int or sequence of int
+            Band indexes (e.g. 1 or (1, 2, 3))
+        expression: str
+            rio-tiler expression (e.g. b1/b2+b3)
+        kwargs: dict, optional
+            `nodata`, `unscale` and `post_process` options.
+
+        Returns
+        -------
+        values: numpy.ma.MaskedArray
+            Array of shape (points, bands), points outside the dataset or
+            with no data are masked.
+
+        """
+        kwargs = {**self._kwargs, **kwargs}
+
+        if isinstance(indexes, int):
+            indexes = (indexes,)
+
+        if expression:
+            indexes = parse_expression(expression)
+
+        indexes = indexes or self.dataset.indexes
+
+        points = numpy.asarray(coords, dtype="float64").reshape(-1, 2)
+        xs, ys = transform(coord_crs, self.dataset.crs, points[:, 0], points[:, 1])
+        inv_transform = ~self.dataset.transform
+        cols, rows = inv_transform * (numpy.asarray(xs), numpy.asarray(ys))
+        cols = numpy.floor(cols).astype("int64")
+        rows = numpy.floor(rows).astype("int64")
+
+        inside = (
+            (rows >= 0)
+            & (rows < self.dataset.height)
+            & (cols >= 0)
+            & (cols < self.dataset.width)
+        )
+
+        bidx = numpy.asarray(indexes) - 1
+        dtype = numpy.result_type(*[self.dataset.dtypes[i] for i in bidx])
+        values = numpy.zeros((len(points), len(indexes)), dtype=dtype)
+        mask = numpy.ones((len(points), len(indexes)), dtype="bool")
+
+        nodata = kwargs.get("nodata")
+        block_height, block_width = self.dataset.block_shapes[0]
+        block_rows = rows[inside] // block_height
+        block_cols = cols[inside] // block_width
+        points_idx = numpy.flatnonzero(inside)
+
+        blocks = numpy.unique(numpy.stack([block_rows, block_cols], axis=1), axis=0)
+        for block_row, block_col in blocks:
+            window = Window(
+                block_col * block_width,
+                block_row * block_height,
+                min(block_width, self.dataset.width - block_col * block_width),
+                min(block_height, self.dataset.height - block_row * block_height),
+            )
+            in_block = (block_rows == block_row) & (block_cols == block_col)
+            idx = points_idx[in_block]
+            r = rows[idx] - int(window.row_off)
+            c = cols[idx] - int(window.col_off)
+
+            data = self.dataset.read(indexes=indexes, window=window)
+            values[idx] = data[:, r, c].T
+            if nodata is not None:
+                mask[idx] = data[:, r, c].T == nodata
+            else:
+                valid = self.dataset.dataset_mask(window=window)[r, c] != 0
+                mask[idx] = ~valid[:, None]
+
+        if kwargs.get("unscale"):
+            values = values.astype("float32", casting="unsafe")
+            scales = numpy.array(self.dataset.scales)[bidx]
+            offsets = numpy.array(self.dataset.offsets)[bidx]
+            numpy.multiply(values, scales, out=values, casting="unsafe")
+            numpy.add(values, offsets, out=values, casting="unsafe")
+
+        post_process = kwargs.get("post_process")
+        if post_process:
+            data, _ = post_process(values.T, numpy.where(mask.T, 0, 255))
+            values = data.T
+
+        if expression:
+            blocks = expression.lower().split(",")
+            bands = [f"b{bidx}" for bidx in indexes]
+            values = apply_expression(blocks, bands, values.T).T
+            mask = numpy.repeat(mask.any(axis=1)[:, None], values.shape[1], axis=1)
+
+        return numpy.ma.MaskedArray(values, mask=mask)
+
+    def streaming_stats(
+        self,
+        pmin: float = 2.0,
+        pmax: float = 98.0,
+        hist_options: Optional[Dict] = None,
+        overview_level: Optional[int] = None,
+        indexes: Optional[Sequence] = None,
+        threads: int = constants.MAX_THREADS,
+        executor: Optional[futures.Executor] = None,
+        **kwargs: Any,
+    ) -> Dict:
+        """
+        Return bands statistics by streaming over the COG internal blocks.
+
+        Unlike `stats`, which reads a decimated preview in memory, the statistics
+        are accumulated block by block (in parallel) on the full resolution
+        or on the chosen overview. Percentiles are exact for 8/16 bits integer
+        data and approximated from a fine histogram otherwise.
+
+        Attributes
+        ----------
+        pmin: float, optional, (default: 2)
+            Histogram minimum cut.
+        pmax: float, optional, (default: 98)
+            Histogram maximum cut.
+        hist_options: dict, optional
+            Options to forward to numpy.histogram function.
+            e.g: {bins=20, range=(0, 1000)}
+        overview_level: int, optional
+            Overview level to read (default is None, full resolution).
+        indexes: int or sequence of int
+            Band indexes (e.g. 1 or (1, 2, 3))
+        threads: int, optional
+            Number of workers (default is rio_tiler.constants.MAX_THREADS).
+        executor: concurrent.futures.Executor, optional
+            Executor running the workers (default is a new ThreadPoolExecutor).
+        kwargs: dict, optional
+            `nodata` and `unscale` options.
+
+        Returns
+        -------
+        out: dict
+            Dictionary with bands statistics.
+
+        """
+        kwargs = {**self._kwargs, **kwargs}
+
+        if isinstance(indexes, int):
+            indexes = (indexes,)
+
+        hist_options = hist_options or {}
+        if self.colormap and not hist_options.get("bins"):
+            hist_options["bins"] = [
+                k for k, v in self.colormap.items() if v != (0, 0, 0, 255)
+            ]
+
+        return stream_stats(
+            self.dataset,
+            indexes=indexes,
+            overview_level=overview_level,
+            percentiles=(pmin, pmax),
+            hist_options=hist_options,
+            nodata=kwargs.get("nodata"),
+            unscale=kwargs.get("unscale", False),
+            threads=threads,
+            executor=executor,
+        )
+
+    def _clone(self) -> "COGReader":
+        """Open a new reader on the same file, with the same options."""
+        options = dict(
+            self._kwargs,
+            tms=self.tms,
+            coverage_index=self.coverage_index,
+            profile=self.profile,
+            tile_cache=self.tile_cache,
+            minzoom=self.minzoom,
+            maxzoom=self.maxzoom,
+            colormap=self.colormap,
+        )
+        return COGReader(self.filepath, **options)
+
+    @contextmanager
+    def _thread_readers(self) -> Iterator[Callable[[], "COGReader"]]:
+        """Yield a function returning a reader per thread (closed on exit)."""
+        local = threading.local()
+        cogs: List[COGReader] = []
+        cogs_lock = threading.Lock()
+
+        def _reader() -> "COGReader":
+            if not self.filepath:
+                return self
+
+            cog = getattr(local, "cog", None)
+            if cog is None:
+                cog = local.cog = self._clone()
+                with cogs_lock:
+                    cogs.append(cog)
+            return cog
+
+        try:
+            yield _reader
+        finally:
+            for cog in cogs:
+                cog.close()
+
+    def tile_stats(
+        self,
+        zoom: int,
+        tilesize: int = 256,
+        indexes: Optional[Sequence] = None,
+        expression: Optional[str] = "",
+        threads: int = constants.MAX_THREADS,
+        **kwargs: Any,
+    ) -> numpy.recarray:
+        """
+        Return statistics for each tile of a zoom level covering the COG.
+
+        Tiles are read with `tile` by `threads` workers (each with its own
+        dataset handle) and only their summary is kept, so memory use does
+        not depend on the number of tiles.
+
+        Attributes
+        ----------
+        zoom: int
+            TMS zoom level.
+        tilesize: int, optional (default: 256)
+            Output tile size.
+        indexes: int or sequence of int
+            Band indexes (e.g. 1 or (1, 2, 3))
+        expression: str
+            rio-tiler expression (e.g. b1/b2+b3)
+        threads: int, optional
+            Number of workers (default is rio_tiler.constants.MAX_THREADS).
+        kwargs: dict, optional
+            These will be passed to the 'tile' method.
+
+        Returns
+        -------
+        stats: numpy.recarray
+            Record array with `x`, `y`, `z`, `valid` (valid pixels fraction) and
+            per band `min`, `max` and `mean` fields (NaN for empty tiles).
+
+        """
+        tiles = self._tiles(zoom)
+
+        def _worker(tile: morecantile.Tile) -> Optional[Tuple]:
+            try:
+                data, mask = get_reader().tile(
+                    tile.x,
+                    tile.y,
+                    tile.z,
+                    tilesize=tilesize,
+                    indexes=indexes,
+                    expression=expression,
+                    **kwargs,
+                )
+            except TileOutsideBounds:
+                return None
+
+            valid = mask != 0
+            stats: Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+            if valid.any():
+                values = data[:, valid].astype("float64")
+                stats = (values.min(axis=1), values.max(axis=1), values.mean(axis=1))
+            else:
+                empty = numpy.full(data.shape[0], numpy.nan)
+                stats = (empty, empty, empty)
+
+            return (tile.x, tile.y, tile.z, valid.mean(), *stats)
+
+        if not self.filepath:
+            threads = 1
+
+        with self._thread_readers() as get_reader:
+            if threads and threads > 1:
+                with futures.ThreadPoolExecutor(max_workers=threads) as executor:
+                    results = list(executor.map(_worker, tiles))
+            else:
+                results = [_worker(tile) for tile in tiles]
+
+        count = next((len(r[4]) for r in results if r is not None), 0)
+        # Tiles skipped by the coverage index have no valid pixel
+        nodata = (numpy.full(count, numpy.nan),) * 3
+        results = [
+            r if r is not None else (tile.x, tile.y, tile.z, 0.0, *nodata)
+            for tile, r in zip(tiles, results)
+        ]
+        dtype = [
+            ("x", "int64"),
+            ("y", "int64"),
+            ("z", "int64"),
+            ("valid", "float64"),
+            ("min", "float64", (count,)),
+            ("max", "float64", (count,)),
+            ("mean", "float64", (count,)),
+        ]
+        return numpy.rec.array(numpy.array(results, dtype=dtype))
+
+    def pyramid(
+        self,
+        minzoom: Optional[int] = None,
+        maxzoom: Optional[int] = None,
+        tilesize: int = 256,
+        method: str = "mean",
+        indexes: Optional[Sequence] = None,
+        expression: Optional[str] = "",
+        threads: int = constants.MAX_THREADS,
+        **kwargs: Any,
+    ) -> Iterator[Tuple[morecantile.Tile, numpy.ndarray, numpy.ndarray]]:
+        """
+        Create all the tiles covering the COG from `minzoom` to `maxzoom`.
+
+        Only the `maxzoom` tiles are read from the COG (by `threads` workers,
+        each with its own dataset handle), lower zoom levels are created by
+        downsampling their 4 children. Tiles are yielded bottom-up, with only a
+        few tiles per zoom level kept in memory. The TMS has to be a quadtree.
+
+        Attributes
+        ----------
+        minzoom: int, optional
+            Lowest zoom level (default is the COG minzoom).
+        maxzoom: int, optional
+            Zoom level read from the COG (default is the COG maxzoom).
+        tilesize: int, optional (default: 256)
+            Output tile size.
+        method: str, optional
+            Downsampling method, `mean`, `mode` or `nearest` (default is `mean`).
+        indexes: int or sequence of int
+            Band indexes (e.g. 1 or (1, 2, 3))
+        expression: str
+            rio-tiler expression (e.g. b1/b2+b3)
+        threads: int, optional
+            Number of workers (default is rio_tiler.constants.MAX_THREADS).
+        kwargs: dict, optional
+            These will be passed to the 'tile' method.
+
+        Returns
+        -------
+        tiles: iterator of (morecantile.Tile, data, mask)
+            Non-empty tiles, children before their parent.
+
+        """
+        minzoom = self.minzoom if minzoom is None else minzoom
+        maxzoom = self.maxzoom if maxzoom is None else maxzoom
+        tiles = self._tiles(minzoom)
+
+        if not self.filepath:
+            threads = 1
+
+        def _read(
+            tile: morecantile.Tile,
+        ) -> Optional[Tuple[numpy.ndarray, numpy.ndarray]]:
+            try:
+                data, mask = get_reader().tile(
+                    tile.x,
+                    tile.y,
+                    tile.z,
+                    tilesize=tilesize,
+                    indexes=indexes,
+                    expression=expression,
+                    **kwargs,
+                )
+            except TileOutsideBounds:
+                return None
+
+            return (data, mask) if mask.any() else None
+
+        with self._thread_readers() as get_reader:
+            yield from tile_pyramid(
+                _read,
+                self.tms,
+                tiles,
+                maxzoom,
+                method=method,
+                tile_exists=self._tile_exists,
+                threads=threads,
+            )
+
+    def export(
+        self,
+        dst_path: str,
+        zoom: int,
+        bounds: Optional[Tuple[float, float, float, float]] = None,
+        tilesize: int = 256,
+        indexes: Optional[Sequence] = None,
+        expression: Optional[str] = "",
+        threads: int = constants.MAX_THREADS,
+        overview_resampling: str = "nearest",
+        cog: bool = True,
+        creation_options: Optional[Dict] = None,
+        **kwargs: Any,
+    ) -> Dict:
+        """
+        Export a zoom level of the COG to a GeoTIFF aligned on the TMS grid.
+
+        The tiles covering `bounds` are read with `tile` by `threads` workers
+        and written block by block, so large areas can be exported with
+        bounded memory. Overviews are built afterwards.
+
+        Attributes
+        ----------
+        dst_path: str
+            Output path.
+        zoom: int
+            TMS zoom level.
+        bounds: tuple[float], optional
+            Area to export in WGS84 crs (default is the COG bounds).
+        tilesize: int, optional (default: 256)
+            Output tile (and internal block) size.
+        indexes: int or sequence of int
+            Band indexes (e.g. 1 or (1, 2, 3))
+        expression: str
+            rio-tiler expression (e.g. b1/b2+b3)
+        threads: int, optional
+            Number of workers (default is rio_tiler.constants.MAX_THREADS).
+        overview_resampling: str, optional
+            Overviews resampling method (default is `nearest`).
+        cog: bool, optional
+            Write a Cloud Optimized GeoTIFF (default is True).
+        creation_options: dict, optional
+            GDAL GeoTIFF creation options (e.g {"compress": "jpeg"}).
+        kwargs: dict, optional
+            These will be passed to the 'tile' method.
+
+        Returns
+        -------
+        profile: dict
+            Output dataset profile.
+
+        """
+        tiles = self._tiles(zoom, bounds)
+
+        if not self.filepath:
+            threads = 1
+
+        def _read(
+            tile: morecantile.Tile,
+        ) -> Optional[Tuple[numpy.ndarray, numpy.ndarray]]:
+            try:
+                data, mask = get_reader().tile(
+                    tile.x,
+                    tile.y,
+                    tile.z,
+                    tilesize=tilesize,
+                    indexes=indexes,
+                    expression=expression,
+                    **kwargs,
+                )
+            except TileOutsideBounds:
+                return None
+
+            return (data, mask) if mask.any() else None
+
+        with self._thread_readers() as get_reader:
+            return write_tiles(
+                dst_path,
+                _read,
+                self.tms,
+                tiles,
+                tilesize=tilesize,
+                threads=threads,
+                overview_resampling=overview_resampling,
+                cog=cog,
+                **(creation_options or {}),
+            )
+
+    def to_xarray(
+        self,
+        zoom: int,
+        bounds: Optional[Tuple[float, float, float, float]] = None,
+        tilesize: int = 256,
+        indexes: Optional[Sequence] = None,
+        expression: Optional[str] = "",
+        fill_value: Optional[Union[int, float]] = None,
+        **kwargs: Any,
+    ):
+        """
+        Return a zoom level of the COG as a lazy DataArray aligned on the TMS grid.
+
+        Each dask chunk is a TMS tile, read with `tile` (by a new reader on the
+        same file) when the chunk is computed: nothing is read when the array is
+        created, and the reads can run on a dask cluster. Requires `dask` and
+        `xarray` (`pip install rio-tiler-crs[xarray]`).
+
+        Attributes
+        ----------
+        zoom: int
+            TMS zoom level.
+        bounds: tuple[float], optional
+            Area to load in WGS84 crs (default is the COG footprint). The tiles
+            are selected in the TMS coordinates, so the array covers the area in
+            any projection (e.g polar grids).
+        tilesize: int, optional (default: 256)
+            Tile (and chunk) size.
+        indexes: int or sequence of int
+            Band indexes (e.g. 1 or (1, 2, 3))
+        expression: str
+            rio-tiler expression (e.g. b1/b2+b3)
+        fill_value: int or float, optional
+            Value of the masked pixels (default is the COG nodata or 0).
+        kwargs: dict, optional
+            These will be passed to the 'tile' method.
+
+        Returns
+        -------
+        xarray.DataArray
+            (band, y, x) array in the TMS CRS.
+
+        """
+        from .dataarray import TileLoader, tile_grid_array
+
+        if not self.filepath:
+            raise ValueError("to_xarray needs a reader opened from a file path")
+
+        if isinstance(indexes, int):
+            indexes = (indexes,)
+
+        band_names: List[Union[int, str]]
+        if expression:
+            bands = parse_expression(expression)
+            blocks = expression.lower().split(",")
+            band_names = list(blocks)
+            dtype = apply_expression(
+                blocks,
+                [f"b{bidx}" for bidx in bands],
+                numpy.ones((len(bands), 1, 1), dtype=self.dataset.dtypes[0]),
+            ).dtype
+        else:
+            bidxs = list(indexes or self.dataset.indexes)
+            band_names = list(bidxs)
+            dtype = numpy.result_type(
+                *[self.dataset.dtypes[bidx - 1] for bidx in bidxs]
+            )
+
+        if fill_value is None:
+            nodata = kwargs.get("nodata", self._kwargs.get("nodata"))
+            if nodata is None:
+                nodata = self.dataset.nodata
+            fill_value = nodata if nodata is not None else 0
+
+        loader = TileLoader(
+            self.filepath,
+            type(self),
+            dict(
+                tms=self.tms,
+                coverage_index=self.coverage_index,
+                profile=self.profile,
+                minzoom=self.minzoom,
+                maxzoom=self.maxzoom,
+                **self._kwargs,
+            ),
+            tilesize,
+            fill_value,
+            dict(indexes=indexes, expression=expression, **kwargs),
+        )
+        if bounds is not None:
+            xy_bounds = transform_bounds(
+                constants.WGS84_CRS, self.tms.crs, *bounds, densify_pts=21
+            )
+            tiles = list(prepare(self.tms).xy_tiles(xy_bounds, zoom))
+        else:
+            tiles = self._tiles(zoom)
+
+        if not tiles:
+            raise TileOutsideBounds(f"No tiles at zoom {zoom} in the requested area")
+
+        return tile_grid_array(
+            loader,
+            self.tms,
+            tiles,
+            len(band_names),
+            dtype,
+            band_names=band_names,
+            name=self.filepath,
+        )
+
+    def prefetch(
+        self,
+        tiles: Sequence[Tuple[int, int, int]],
+        tilesize: int = 256,
+        indexes: Optional[Sequence] = None,
+        max_gap: int = 0,
+    ) -> ReadPlan:
+        """
+        Prefetch the internal blocks needed to create multiple TMS tiles.
+
+        Attributes
+        ----------
+        tiles: sequence of (x, y, z) tuples or morecantile.Tile
+            TMS tiles which will be requested.
+        tilesize: int, optional (default: 256)
+            Output tile size.
+        indexes: int or sequence of int
+            Band indexes (e.g. 1 or (1, 2, 3))
+        max_gap: int, optional (default: 0)
+            Number of unneeded blocks allowed inside a merged request.
+
+        Returns
+        -------
+        plan: rio_tiler_crs.prefetch.ReadPlan
+
+        """
+        if isinstance(indexes, int):
+            indexes = (indexes,)
+
+        tiles = [morecantile.Tile(*tile) for tile in tiles]
+        tiles = [tile for tile in tiles if self._tile_exists(tile)]
+
+        plan = plan_reads(
+            self.dataset, tiles, self.tms, tilesize=tilesize, max_gap=max_gap
+        )
+        prefetch(self.dataset, plan, indexes=indexes)
+        return plan
 
 
 def multi_tile(
     assets: Sequence[str],
     *args: Any,
     tms: morecantile.TileMatrixSet = default_tms,
+    pixel_selection: Optional[Union[Type[MosaicMethodBase], MosaicMethodBase]] = None,
+    threads: int = constants.MAX_THREADS,
+    masked: bool = False,
     **kwargs: Any,
 ) -> Tuple[numpy.ndarray, numpy.ndarray]:
-    """Assemble multiple tiles."""
+    """
+    Assemble multiple tiles.
+
+    Without `pixel_selection`, the tiles of all the assets are read and their
+    bands are concatenated (the masks are kept as packed bitmaps until the
+    end). With a `pixel_selection` method, the assets are composited in
+    priority order (the order of `assets`) with rio-tiler's `mosaic_reader`:
+    assets are read by chunks of `threads` and no more chunks are read once the
+    method is done (e.g the tile is filled for `FirstMethod`).
 
-    def _worker(asset: str):
+    Attributes
+    ----------
+    assets: sequence of str
+        COG paths, in priority order.
+    args: Any
+        Tile x, y and z indexes.
+    tms: morecantile.TileMatrixSet, optional
+        TileMatrixSet to use, default is WebMercatorQuad.
+    pixel_selection: MosaicMethod, optional
+        rio-tiler mosaic method (e.g `rio_tiler.mosaic.methods.defaults.FirstMethod`).
+    threads: int, optional
+        Number of concurrent reads (default is rio_tiler.constants.MAX_THREADS).
+    masked: bool, optional
+        Return the data as a numpy.ma.MaskedArray view (default is False).
+    kwargs: dict, optional
+        These will be passed to the 'COGReader.tile' method.
+
+    Returns
+    -------
+    data: numpy ndarray or numpy.ma.MaskedArray
+    mask: numpy array
+
+    """
+
+    def _reader(
+        asset: str, *args: Any, **kwargs: Any
+    ) -> Tuple[numpy.ndarray, numpy.ndarray]:
         with COGReader(asset, tms=tms) as cog:  # type: ignore
             return cog.tile(*args, **kwargs)
 
-    with futures.ThreadPoolExecutor(max_workers=constants.MAX_THREADS) as executor:
-        data, masks = zip(*list(executor.map(_worker, assets)))
+    if pixel_selection is None:
+
+        def _packed(asset: str) -> Tuple[numpy.ndarray, PackedMask]:
+            data, mask = _reader(asset, *args, **kwargs)
+            return data, pack(mask)
+
+        with futures.ThreadPoolExecutor(max_workers=max(threads, 1)) as executor:
+            data, masks = zip(*list(executor.map(_packed, assets)))
+
         data = numpy.concatenate(data)
-        mask = numpy.all(masks, axis=0).astype(numpy.uint8) * 255
-        return data, mask
+        mask = to_uint8(combine(masks))
+        return (masked_array(data, mask), mask) if masked else (data, mask)
+
+    (data, mask), _ = mosaic_reader(
+        assets,
+        _reader,
+        *args,
+        pixel_selection=pixel_selection,
+        threads=threads,
+        **kwargs,
+    )
+    if data is None:
+        raise TileOutsideBounds("Tile is outside the assets bounds")
+
+    mask = mask.astype(numpy.uint8)
+    return (masked_array(data, mask), mask) if masked else (data, mask)
@@ -0,0 +1,264 @@
+"""rio-tiler-crs.coverage: dataset footprint and coverage index to detect empty tiles."""
+
+import math
+from typing import Optional, Sequence, Union
+
+import attr
+import morecantile
+import numpy
+from affine import Affine
+from rasterio.crs import CRS
+from rasterio.io import DatasetReader, DatasetWriter
+from rasterio.vrt import WarpedVRT
+from rasterio.warp import transform, transform_bounds
+
+from .cache import LRUCache
+from .tms import prepare
+
+Bounds = Sequence[float]
+
+
+def footprint(
+    src_dst: Union[DatasetReader, DatasetWriter, WarpedVRT],
+    tms: morecantile.TileMatrixSet,
+    densify_pts: int = 21,
+) -> Optional[numpy.ndarray]:
+    """
+    Return the dataset footprint polygon in the TMS CRS.
+
+    The dataset bounds edges are densified with `densify_pts` points before the
+    transformation. None is returned when the footprint can't be represented
+    as a simple polygon in the TMS CRS (e.g it crosses the TMS antimeridian).
+
+    Attributes
+    ----------
+    src_dst: rasterio.io.DatasetReader
+        Rasterio io.DatasetReader object.
+    tms: morecantile.TileMatrixSet
+        TileMatrixSet to use.
+    densify_pts: int, optional
+        Number of points added to each edge (default is 21).
+
+    Returns
+    -------
+    polygon: numpy.ndarray, optional
+        Footprint vertices, of shape (n, 2).
+
+    """
+    left, bottom, right, top = src_dst.bounds
+    steps = numpy.linspace(0, 1, densify_pts + 2)[:-1]
+    xs = numpy.concatenate(
+        [
+            left + (right - left) * steps,
+            numpy.full(steps.size, right),
+            right - (right - left) * steps,
+            numpy.full(steps.size, left),
+        ]
+    )
+    ys = numpy.concatenate(
+        [
+            numpy.full(steps.size, top),
+            top - (top - bottom) * steps,
+            numpy.full(steps.size, bottom),
+            bottom + (top - bottom) * steps,
+        ]
+    )
+    if src_dst.crs == tms.crs:
+        return numpy.column_stack([xs, ys])
+
+    polygon = numpy.column_stack(transform(src_dst.crs, tms.crs, xs, ys))
+    if not numpy.isfinite(polygon).all():
+        return None
+
+    # Large jumps between consecutive vertices means the footprint wraps around
+    xmin, _, xmax, _ = tms.xy_bbox
+    if (numpy.abs(numpy.diff(polygon[:, 0])) > (xmax - xmin) / 2).any():
+        return None
+
+    return polygon
+
+
+def polygon_intersects(polygon: numpy.ndarray, bounds: Bounds) -> bool:
+    """Check if a polygon (vertices of shape (n, 2)) intersects a bounding box."""
+    xmin, ymin, xmax, ymax = bounds
+    x0, y0 = polygon[:, 0], polygon[:, 1]
+    x1, y1 = numpy.roll(x0, -1), numpy.roll(y0, -1)
+    dx, dy = x1 - x0, y1 - y0
+
+    # Liang-Barsky clipping of the polygon edges against the bounding box
+    t0 = numpy.zeros(x0.size)
+    t1 = numpy.ones(x0.size)
+    inside = numpy.ones(x0.size, dtype="bool")
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        for p, q in (
+            (-dx, x0 - xmin),
+            (dx, xmax - x0),
+            (-dy, y0 - ymin),
+            (dy, ymax - y0),
+        ):
+            ratio = q / p
+            inside &= ~((p == 0) & (q < 0))
+            t0 = numpy.where(p < 0, numpy.maximum(t0, ratio), t0)
+            t1 = numpy.where(p > 0, numpy.minimum(t1, ratio), t1)
+
+    if (inside & (t0 <= t1)).any():
+        return True
+
+    # No edge crosses the bounding box, it is either inside or outside the polygon
+    crossing = (y0 > ymin) != (y1 > ymin)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        x_cross = x0 + (ymin - y0) * dx / dy
+
+    return bool(numpy.count_nonzero(crossing & (xmin < x_cross)) % 2)
+
+
+@attr.s
+class CoverageIndex:
+    """
+    Low resolution coverage index of a dataset.
+
+    The dataset validity (mask or nodata) is read from the lowest resolution
+    overview, max-pooled to at most `max_size` pixels and dilated by one pixel.
+    It is stored as a summed-area table, so checking if a tile holds valid
+    pixels is a constant time lookup. Tiles are tested with a one pixel margin
+    so partially covered low resolution pixels are never reported as empty.
+
+    The index is as conservative as the overviews: valid pixels dropped by the
+    overviews resampling (e.g isolated pixels with `nearest`) are not indexed,
+    overviews built with `average` keep any valid pixel.
+
+    Examples
+    --------
+    with rasterio.open(src_path) as src_dst:
+        index = CoverageIndex.from_dataset(src_dst)
+        index.is_empty(tms, morecantile.Tile(0, 0, 3))
+
+    Attributes
+    ----------
+    crs: rasterio.crs.CRS
+        Coverage coordinate reference system (the dataset CRS).
+    transform: affine.Affine
+        Coverage affine transform.
+    integral: numpy.ndarray
+        Summed-area table of the valid pixels, of shape (height + 1, width + 1).
+
+    """
+
+    crs: CRS = attr.ib()
+    transform: Affine = attr.ib()
+    integral: numpy.ndarray = attr.ib()
+    _tiles: LRUCache = attr.ib(init=False, factory=lambda: LRUCache(maxsize=4096))
+
+    @classmethod
+    def from_dataset(
+        cls,
+        src_dst: Union[DatasetReader, DatasetWriter, WarpedVRT],
+        max_size: int = 512,
+        nodata: Optional[Union[float, int]] = None,
+    ) -> "CoverageIndex":
+        """
+        Create a coverage index from a dataset.
+
+        Attributes
+        ----------
+        src_dst: rasterio.io.DatasetReader
+            Rasterio io.DatasetReader object.
+        max_size: int, optional
+            Maximum size of the coverage mask (default is 512).
+        nodata: int or float, optional
+            Overwrite the dataset nodata value.
+
+        Returns
+        -------
+        index: CoverageIndex
+
+        """
+        # Lowest resolution overview (or the dataset decimated to max_size)
+        factors = src_dst.overviews(1)
+        decim = (
+            max(factors) if factors else max(src_dst.width, src_dst.height) / max_size
+        )
+        decim = max(1, decim)
+        height = max(1, math.ceil(src_dst.height / decim))
+        width = max(1, math.ceil(src_dst.width / decim))
+        if nodata is not None:
+            data = src_dst.read(out_shape=(src_dst.count, height, width))
+            valid = (data != nodata).any(axis=0)
+        else:
+            valid = src_dst.dataset_mask(out_shape=(height, width)) != 0
+
+        # Max pooling (any valid pixel) of pool x pool cells, down to max_size
+        pool = max(1, math.ceil(max(height, width) / max_size))
+        if pool > 1:
+            padded = numpy.zeros(
+                (math.ceil(height / pool) * pool, math.ceil(width / pool) * pool),
+                dtype="bool",
+            )
+            padded[:height, :width] = valid
+            valid = padded.reshape(
+                padded.shape[0] // pool, pool, padded.shape[1] // pool, pool
+            ).any(axis=(1, 3))
+
+        # Overviews resampling can move or drop valid pixels, dilate by one cell
+        dilated = numpy.pad(valid, 1)
+        valid = numpy.zeros_like(valid)
+        for row in range(3):
+            for col in range(3):
+                valid |= dilated[row : row + valid.shape[0], col : col + valid.shape[1]]
+
+        integral = numpy.zeros((valid.shape[0] + 1, valid.shape[1] + 1), dtype="int64")
+        integral[1:, 1:] = valid.astype("int64").cumsum(axis=0).cumsum(axis=1)
+
+        transform = src_dst.transform * Affine.scale(
+            src_dst.width / width * pool, src_dst.height / height * pool
+        )
+        return cls(src_dst.crs, transform, integral)
+
+    @property
+    def height(self) -> int:
+        """Coverage mask height."""
+        return self.integral.shape[0] - 1
+
+    @property
+    def width(self) -> int:
+        """Coverage mask width."""
+        return self.integral.shape[1] - 1
+
+    def count(self, bounds) -> int:
+        """Return the number of valid coverage pixels in bounds (coverage CRS)."""
+        inv_transform = ~self.transform
+        cols, rows = inv_transform * (
+            numpy.array([bounds[0], bounds[2]]),
+            numpy.array([bounds[3], bounds[1]]),
+        )
+        col_start = max(0, int(math.floor(cols.min())) - 1)
+        col_stop = min(self.width, int(math.ceil(cols.max())) + 1)
+        row_start = max(0, int(math.floor(rows.min())) - 1)
+        row_stop = min(self.height, int(math.ceil(rows.max())) + 1)
+        if col_start >= col_stop or row_start >= row_stop:
+            return 0
+
+        integral = self.integral
+        return int(
+            integral[row_stop, col_stop]
+            - integral[row_start, col_stop]
+            - integral[row_stop, col_start]
+            + integral[row_start, col_start]
+        )
+
+    def is_empty(self, tms: morecantile.TileMatrixSet, tile: morecantile.Tile) -> bool:
+        """Check if a TMS tile has no valid pixel."""
+        key = (prepare(tms).key, tuple(tile))
+        empty = self._tiles.get(key)
+        if empty is None:
+            bounds = transform_bounds(
+                tms.crs, self.crs, *prepare(tms).xy_bounds(*tile), densify_pts=21
+            )
+            empty = self.count(bounds) == 0
+            self._tiles.set(key, empty)
+
+        return empty
+
+
+# Coverage indexes shared by the readers, keyed by dataset path and nodata
+coverage_cache = LRUCache(maxsize=128)
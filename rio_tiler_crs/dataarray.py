@@ -0,0 +1,172 @@
+"""rio-tiler-crs.dataarray: lazy xarray/dask arrays on a TMS tile grid."""
+
+import functools
+from typing import Any, Dict, Optional, Sequence, Tuple, Type, Union
+
+import attr
+import morecantile
+import numpy
+
+from rio_tiler.errors import TileOutsideBounds
+
+from .export import tiles_grid
+
+try:
+    import dask.array as da
+    import xarray
+except ImportError:  # pragma: nocover
+    da = None  # type: ignore
+    xarray = None  # type: ignore
+
+
+@attr.s
+class TileLoader:
+    """
+    Read a tile of a dataset, filling the masked pixels.
+
+    The loader only holds the dataset path and the reader options, so it can be
+    sent to other processes (e.g dask distributed workers) and each call opens
+    its own reader.
+
+    Attributes
+    ----------
+    filepath: str
+        Dataset path.
+    reader: rio_tiler_crs.COGReader
+        Reader class.
+    reader_options: dict
+        Options to forward to the reader (e.g tms).
+    tilesize: int
+        Tile size.
+    fill_value: int or float
+        Value of the masked pixels.
+    tile_options: dict, optional
+        Options to forward to the reader `tile` method (e.g indexes).
+
+    """
+
+    filepath: str = attr.ib()
+    reader: Type = attr.ib()
+    reader_options: Dict = attr.ib()
+    tilesize: int = attr.ib()
+    fill_value: Any = attr.ib()
+    tile_options: Dict = attr.ib(factory=dict)
+
+    def __call__(self, tile: morecantile.Tile) -> Optional[numpy.ndarray]:
+        """Read a tile (None if it is outside the dataset)."""
+        try:
+            with self.reader(self.filepath, **self.reader_options) as cog:
+                data, mask = cog.tile(
+                    *tile, tilesize=self.tilesize, **self.tile_options
+                )
+        except TileOutsideBounds:
+            return None
+
+        return numpy.where(mask != 0, data, self.fill_value).astype(data.dtype)
+
+
+def _load_block(
+    loader: TileLoader,
+    origin: Tuple[int, int, int],
+    shape: Tuple[int, int, int],
+    dtype: numpy.dtype,
+    block_info: Optional[Dict] = None,
+) -> numpy.ndarray:
+    """Load the tile of a dask block."""
+    if block_info is None:  # Called by dask to infer metadata
+        return numpy.empty((0, 0, 0), dtype=dtype)
+
+    _, row, col = block_info[None]["chunk-location"]
+    minx, miny, zoom = origin
+    data = loader(morecantile.Tile(minx + col, miny + row, zoom))
+    if data is None:
+        return numpy.full(shape, loader.fill_value, dtype=dtype)
+
+    return data.astype(dtype, copy=False)
+
+
+def tile_grid_array(
+    loader: TileLoader,
+    tms: morecantile.TileMatrixSet,
+    tiles: Sequence[morecantile.Tile],
+    count: int,
+    dtype: Any,
+    band_names: Optional[Sequence[Union[int, str]]] = None,
+    name: Optional[str] = None,
+) -> "xarray.DataArray":
+    """
+    Create a lazy DataArray of tiles, with one dask chunk per tile.
+
+    Attributes
+    ----------
+    loader: TileLoader
+        Tile loader, called when a chunk is computed.
+    tms: morecantile.TileMatrixSet
+        TileMatrixSet of the tiles.
+    tiles: sequence of morecantile.Tile
+        Tiles of the same zoom level, the array covers their bounding rectangle.
+    count: int
+        Number of bands returned by the loader.
+    dtype: numpy.dtype
+        Data type returned by the loader.
+    band_names: sequence of int or str, optional
+        Band coordinates (default is 1 to count).
+    name: str, optional
+        DataArray name.
+
+    Returns
+    -------
+    xarray.DataArray
+        (band, y, x) array in the TMS CRS, with `crs`, `transform`, `tms`,
+        `zoom` and `nodata` attributes.
+
+    """
+    if da is None or xarray is None:
+        raise ImportError(
+            "dask and xarray are required (pip install rio-tiler-crs[xarray])"
+        )
+
+    zoom = tiles[0].z
+    tilesize = loader.tilesize
+    grid = tiles_grid(tms, tiles, tilesize=tilesize)
+    dtype = numpy.dtype(dtype)
+
+    chunks = (
+        (count,),
+        (tilesize,) * (grid["height"] // tilesize),
+        (tilesize,) * (grid["width"] // tilesize),
+    )
+    array = da.map_blocks(
+        functools.partial(
+            _load_block,
+            loader,
+            (grid["minx"], grid["miny"], zoom),
+            (count, tilesize, tilesize),
+            dtype,
+        ),
+        chunks=chunks,
+        dtype=dtype,
+        meta=numpy.empty((0, 0, 0), dtype=dtype),
+        name=f"tiles-{tms.identifier}-{zoom}-{da.core.tokenize(loader, tiles)}",
+    )
+
+    transform = grid["transform"]
+    xs = transform.c + (numpy.arange(grid["width"]) + 0.5) * transform.a
+    ys = transform.f + (numpy.arange(grid["height"]) + 0.5) * transform.e
+    return xarray.DataArray(
+        array,
+        dims=("band", "y", "x"),
+        coords={
+            "band": list(band_names) if band_names else list(range(1, count + 1)),
+            "y": ys,
+            "x": xs,
+        },
+        name=name,
+        attrs={
+            "crs": grid["crs"].to_wkt(),
+            "transform": tuple(transform)[:6],
+            "tms": tms.identifier,
+            "zoom": zoom,
+            "nodata": loader.fill_value,
+        },
+    )
@@ -0,0 +1,11 @@
+"""rio-tiler-crs errors."""
+
+from rio_tiler.errors import RioTilerError
+
+
+class InvalidTileMatrixSet(RioTilerError):
+    """TileMatrixSet doesn't support the operation."""
+
+
+class InvalidPerformanceProfile(RioTilerError):
+    """Invalid performance profile name."""
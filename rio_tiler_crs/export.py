@@ -0,0 +1,187 @@
+"""rio-tiler-crs.export: write TMS tiles to a GeoTIFF or COG."""
+
+import os
+import tempfile
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import morecantile
+import numpy
+import rasterio
+from rasterio.enums import Resampling
+from rasterio.shutil import copy
+from rasterio.transform import from_bounds
+from rasterio.windows import Window
+
+from rio_tiler.errors import TileOutsideBounds
+
+from .pyramid import _read_ahead
+
+TileData = Tuple[numpy.ndarray, numpy.ndarray]
+
+DEFAULT_PROFILE = {
+    "driver": "GTiff",
+    "tiled": True,
+    "compress": "deflate",
+    "interleave": "pixel",
+    "BIGTIFF": "IF_SAFER",
+}
+
+
+def tiles_grid(
+    tms: morecantile.TileMatrixSet,
+    tiles: Sequence[morecantile.Tile],
+    tilesize: int = 256,
+) -> Dict:
+    """
+    Return the grid (crs, transform, width and height) of a set of tiles.
+
+    Attributes
+    ----------
+    tms: morecantile.TileMatrixSet
+        TileMatrixSet of the tiles.
+    tiles: sequence of morecantile.Tile
+        Tiles of the same zoom level.
+    tilesize: int, optional (default: 256)
+        Tile size.
+
+    Returns
+    -------
+    grid: dict
+        `crs`, `transform`, `width`, `height` and the `minx`/`miny` tile indexes
+        of the grid origin.
+
+    """
+    zoom = tiles[0].z
+    minx = min(tile.x for tile in tiles)
+    maxx = max(tile.x for tile in tiles)
+    miny = min(tile.y for tile in tiles)
+    maxy = max(tile.y for tile in tiles)
+
+    left, _, _, top = tms.xy_bounds(morecantile.Tile(minx, miny, zoom))
+    _, bottom, right, _ = tms.xy_bounds(morecantile.Tile(maxx, maxy, zoom))
+    width = (maxx - minx + 1) * tilesize
+    height = (maxy - miny + 1) * tilesize
+    return dict(
+        crs=tms.crs,
+        transform=from_bounds(left, bottom, right, top, width, height),
+        width=width,
+        height=height,
+        minx=minx,
+        miny=miny,
+    )
+
+
+def write_tiles(
+    dst_path: str,
+    read_tile: Callable[[morecantile.Tile], Optional[TileData]],
+    tms: morecantile.TileMatrixSet,
+    tiles: Sequence[morecantile.Tile],
+    tilesize: int = 256,
+    threads: int = 1,
+    overview_resampling: str = "nearest",
+    cog: bool = True,
+    **creation_options,
+) -> Dict:
+    """
+    Write tiles to a tiled GeoTIFF (or COG) in the TMS CRS.
+
+    Tiles are read with `read_tile` by `threads` workers (with a bounded
+    read-ahead) and written as internal blocks as soon as they are ready, so
+    memory use doesn't depend on the output size. Overviews are built once all
+    the tiles are written.
+
+    Attributes
+    ----------
+    dst_path: str
+        Output path.
+    read_tile: callable
+        Return the (data, mask) for a tile, or None for empty tiles.
+    tms: morecantile.TileMatrixSet
+        TileMatrixSet of the tiles.
+    tiles: sequence of morecantile.Tile
+        Tiles of the same zoom level.
+    tilesize: int, optional (default: 256)
+        Tile size, also used as internal block size (must be a multiple of 16).
+    threads: int, optional
+        Number of `read_tile` workers (default is 1).
+    overview_resampling: str, optional
+        Overviews resampling method (default is `nearest`).
+    cog: bool, optional
+        Write a Cloud Optimized GeoTIFF (default is True).
+    creation_options: dict, optional
+        GDAL GeoTIFF creation options (e.g compress="jpeg").
+
+    Returns
+    -------
+    profile: dict
+        Output dataset profile.
+
+    """
+    if not tiles:
+        raise TileOutsideBounds("No tile to write")
+
+    grid = tiles_grid(tms, tiles, tilesize=tilesize)
+    minx, miny = grid.pop("minx"), grid.pop("miny")
+
+    if cog:
+        fd, tmp_path = tempfile.mkstemp(
+            suffix=".tif", dir=os.path.dirname(os.path.abspath(dst_path))
+        )
+        os.close(fd)
+    else:
+        tmp_path = dst_path
+
+    creation_options = {
+        **DEFAULT_PROFILE,
+        "blockxsize": tilesize,
+        "blockysize": tilesize,
+        **creation_options,
+    }
+    profile = {**creation_options, **grid}
+
+    try:
+        with rasterio.Env(GDAL_TIFF_INTERNAL_MASK=True):
+            dst = None
+            results = _read_ahead(read_tile, iter(tiles), threads=threads)
+            try:
+                for tile, result in zip(tiles, results):
+                    if result is None:
+                        continue
+
+                    data, mask = result
+                    if dst is None:
+                        profile.update(count=data.shape[0], dtype=data.dtype.name)
+                        dst = rasterio.open(tmp_path, "w", **profile)
+
+                    window = Window(
+                        (tile.x - minx) * tilesize,
+                        (tile.y - miny) * tilesize,
+                        tilesize,
+                        tilesize,
+                    )
+                    dst.write(data, window=window)
+                    dst.write_mask(mask.astype("uint8"), window=window)
+
+                if dst is None:
+                    raise TileOutsideBounds("No data in the requested tiles")
+
+                factors: List[int] = []
+                size = max(grid["width"], grid["height"])
+                while size > tilesize:
+                    factors.append(2 ** (len(factors) + 1))
+                    size //= 2
+
+                if factors:
+                    dst.build_overviews(factors, Resampling[overview_resampling])
+            finally:
+                if dst is not None:
+                    dst.close()
+
+            if cog:
+                copy(tmp_path, dst_path, copy_src_overviews=True, **creation_options)
+
+    finally:
+        if cog and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return profile
@@ -0,0 +1,70 @@
+"""rio-tiler-crs.masks: packed boolean masks."""
+
+from typing import Sequence, Tuple
+
+import numpy
+
+PackedMask = Tuple[numpy.ndarray, int]
+
+
+def pack(mask: numpy.ndarray) -> PackedMask:
+    """
+    Pack a mask (0 for invalid pixels) in a bitmap, 8 pixels per byte.
+
+    Returns the packed rows and the mask width (needed to unpack).
+
+    """
+    return numpy.packbits(mask != 0, axis=-1), mask.shape[-1]
+
+
+def unpack(packed: PackedMask) -> numpy.ndarray:
+    """Return the boolean mask (True for valid pixels) of a packed mask."""
+    bits, width = packed
+    return numpy.unpackbits(bits, axis=-1, count=width).view(bool)
+
+
+def combine(packed_masks: Sequence[PackedMask], how: str = "all") -> PackedMask:
+    """
+    Combine packed masks with bitwise operations.
+
+    Attributes
+    ----------
+    packed_masks: sequence of packed masks
+        Masks of the same shape.
+    how: str, optional
+        `all` (valid in every mask) or `any` (valid in at least one mask).
+        Default is `all`.
+
+    Returns
+    -------
+    packed mask
+
+    """
+    if how not in ("all", "any"):
+        raise ValueError(f"Invalid mask combination: {how}")
+
+    operator = numpy.bitwise_and if how == "all" else numpy.bitwise_or
+    bits, width = packed_masks[0]
+    out = bits.copy()
+    for other, _ in packed_masks[1:]:
+        operator(out, other, out=out)
+
+    return out, width
+
+
+def to_uint8(packed: PackedMask) -> numpy.ndarray:
+    """Expand a packed mask to a uint8 mask (0 or 255), e.g for rendering."""
+    return numpy.multiply(unpack(packed), 255, dtype="uint8")
+
+
+def masked_array(data: numpy.ndarray, mask: numpy.ndarray) -> numpy.ma.MaskedArray:
+    """
+    Return a MaskedArray view of data (bands, height, width) and its mask.
+
+    The data array is not copied and the mask (0 for invalid pixels) is a
+    read-only view broadcast to all the bands (one (height, width) boolean
+    array), set a new mask to modify it.
+
+    """
+    invalid = numpy.broadcast_to(mask == 0, data.shape)
+    return numpy.ma.MaskedArray(data, mask=invalid, copy=False)
@@ -0,0 +1,312 @@
+"""rio-tiler-crs.mosaic: read tiles from multiple datasets."""
+
+from concurrent import futures
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type, Union, cast
+
+import attr
+import morecantile
+import numpy
+from rasterio.warp import transform_bounds
+
+from rio_tiler import constants
+from rio_tiler.constants import WGS84_CRS
+from rio_tiler.errors import TileOutsideBounds
+from rio_tiler.io import BaseReader
+from rio_tiler.mosaic import mosaic_reader
+from rio_tiler.mosaic.methods.base import MosaicMethodBase
+from rio_tiler.mosaic.methods.defaults import FirstMethod
+
+from .cogeo import COGReader
+from .tms import prepare
+
+default_tms = morecantile.tms.get("WebMercatorQuad")
+
+Bounds = Tuple[float, float, float, float]
+
+
+def _intersects(bbox_1: Bounds, bbox_2: Bounds) -> bool:
+    """Check if two bounding boxes intersect."""
+    return (
+        (bbox_1[0] < bbox_2[2])
+        and (bbox_1[2] > bbox_2[0])
+        and (bbox_1[3] > bbox_2[1])
+        and (bbox_1[1] < bbox_2[3])
+    )
+
+
+@attr.s
+class MosaicReader:
+    """
+    Mosaic Reader for multiple COGs or STAC items.
+
+    Datasets footprints are indexed on the TMS tiles of `index_zoom` (in the
+    TMS coordinates), so only the datasets intersecting a tile are read (in
+    parallel, in the assets order).
+
+    Examples
+    --------
+    with MosaicReader(["cog1.tif", "cog2.tif"], tms=tms) as mosaic:
+        tile, mask = mosaic.tile(...)
+
+    with MosaicReader(
+        ["item1.json", "item2.json"],
+        reader=STACReader,
+        footprints={"item1.json": (...), "item2.json": (...)},
+    ) as mosaic:
+        tile, mask = mosaic.tile(..., assets="B01")
+
+    Attributes
+    ----------
+    assets: sequence of str
+        Datasets paths, by priority order.
+    tms: morecantile.TileMatrixSet, optional
+        TileMatrixSet to use, default is WebMercatorQuad.
+    reader: BaseReader, optional
+        rio-tiler-crs Reader (default is set to rio_tiler_crs.COGReader).
+    reader_options: dict, optional
+        additional option to forward to the Reader (default is {}).
+    footprints: dict, optional
+        Datasets WGS84 bounds, if not set the datasets are opened to get them.
+    index_zoom: int, optional
+        Zoom level of the spatial index (default is the datasets minzoom, or
+        when `footprints` are set, the zoom level where the tiles are about
+        the size of the footprints).
+    minzoom: int, optional
+        Set minzoom for the tiles (default is the minimum of the datasets minzoom).
+    maxzoom: int, optional
+        Set maxzoom for the tiles (default is the maximum of the datasets maxzoom).
+    threads: int, optional
+        Number of datasets to read concurrently (default is rio_tiler.constants.MAX_THREADS).
+
+    Properties
+    ----------
+    bounds: tuple[float]
+        Mosaic bounds in WGS84 crs.
+    center: tuple[float, float, int]
+        Mosaic center + minzoom
+
+    Methods
+    -------
+    assets_for_tile(0, 0, 0)
+        Return the datasets intersecting a tile.
+    tile(0, 0, 0, pixel_selection=FirstMethod)
+        Read a map tile from the datasets.
+
+    """
+
+    assets: Sequence[str] = attr.ib()
+    tms: morecantile.TileMatrixSet = attr.ib(default=default_tms)
+    reader: Type[BaseReader] = attr.ib(default=COGReader)
+    reader_options: Dict = attr.ib(factory=dict)
+    footprints: Optional[Dict[str, Bounds]] = attr.ib(default=None)
+    index_zoom: Optional[int] = attr.ib(default=None)
+    minzoom: Optional[int] = attr.ib(default=None)
+    maxzoom: Optional[int] = attr.ib(default=None)
+    threads: int = attr.ib(default=constants.MAX_THREADS)
+
+    bounds: Bounds = attr.ib(init=False)
+    _xy_bounds: Dict[str, Bounds] = attr.ib(init=False, factory=dict)
+    _xy_bbox: Bounds = attr.ib(init=False)
+    _index: Dict[morecantile.Tile, List[str]] = attr.ib(init=False, factory=dict)
+    _priority: Dict[str, int] = attr.ib(init=False, factory=dict)
+
+    def __attrs_post_init__(self):
+        """Get datasets footprints and build the spatial index."""
+        self.reader_options.update({"tms": self.tms})
+        self._priority = {asset: ix for ix, asset in enumerate(self.assets)}
+
+        if self.footprints is None:
+            self._get_footprints()
+        elif self.index_zoom is None:
+            self.index_zoom = self._footprints_zoom()
+
+        if self.minzoom is None:
+            self.minzoom = self.tms.minzoom
+
+        if self.maxzoom is None:
+            self.maxzoom = self.tms.maxzoom
+
+        footprints = list(self.footprints.values())
+        self.bounds = (
+            min(bbox[0] for bbox in footprints),
+            min(bbox[1] for bbox in footprints),
+            max(bbox[2] for bbox in footprints),
+            max(bbox[3] for bbox in footprints),
+        )
+
+        xy_bounds = [self._get_xy_bounds(asset) for asset in self.assets]
+        self._xy_bbox = (
+            min(bbox[0] for bbox in xy_bounds),
+            min(bbox[1] for bbox in xy_bounds),
+            max(bbox[2] for bbox in xy_bounds),
+            max(bbox[3] for bbox in xy_bounds),
+        )
+
+        if self.index_zoom is None:
+            self.index_zoom = self.minzoom
+
+        prepared = prepare(self.tms)
+        for asset, bbox in zip(self.assets, xy_bounds):
+            for tile in prepared.xy_tiles(bbox, self.index_zoom):
+                self._index.setdefault(tile, []).append(asset)
+
+    def __enter__(self):
+        """Support using with Context Managers."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Support using with Context Managers."""
+        pass
+
+    @property
+    def center(self) -> Tuple[float, float, int]:
+        """Mosaic center + minzoom."""
+        return (
+            (self.bounds[0] + self.bounds[2]) / 2,
+            (self.bounds[1] + self.bounds[3]) / 2,
+            self.minzoom,
+        )
+
+    def _get_footprints(self):
+        """Open the datasets to get their bounds and zoom levels."""
+
+        def _worker(asset: str) -> Tuple[Bounds, int, int, Optional[numpy.ndarray]]:
+            with self.reader(asset, **self.reader_options) as src:  # type: ignore
+                polygon = getattr(src, "footprint", None)
+                bounds = cast(Bounds, tuple(src.bounds))
+                return bounds, src.minzoom, src.maxzoom, polygon
+
+        with futures.ThreadPoolExecutor(max_workers=self.threads) as executor:
+            results = list(executor.map(_worker, self.assets))
+
+        self.footprints = {}
+        for asset, (bounds, _, _, polygon) in zip(self.assets, results):
+            self.footprints[asset] = bounds
+            if polygon is not None:
+                self._xy_bounds[asset] = (
+                    *polygon.min(axis=0).tolist(),
+                    *polygon.max(axis=0).tolist(),
+                )
+
+        if self.minzoom is None:
+            self.minzoom = min(minzoom for _, minzoom, _, _ in results)
+
+        if self.maxzoom is None:
+            self.maxzoom = max(maxzoom for _, _, maxzoom, _ in results)
+
+    def _get_xy_bounds(self, asset: str) -> Bounds:
+        """Return a dataset bounds in the TMS CRS."""
+        bbox = self._xy_bounds.get(asset)
+        if bbox is None:
+            # Densified WGS84 bounds, to cover the dataset in any projection
+            bbox = self._xy_bounds[asset] = transform_bounds(
+                WGS84_CRS, self.tms.crs, *self.footprints[asset], densify_pts=21
+            )
+
+        return bbox
+
+    def _footprints_zoom(self) -> int:
+        """Return the zoom level where the tiles are about the footprints size."""
+        prepared = prepare(self.tms)
+        sizes = []
+        for asset in self.assets:
+            left, bottom, right, top = self._get_xy_bounds(asset)
+            sizes.append(max(right - left, top - bottom))
+
+        size = float(numpy.median(sizes))
+        zoom = self.tms.minzoom
+        for z in range(self.tms.minzoom, self.tms.maxzoom + 1):
+            matrix = prepared.matrix(z)
+            span = prepared.resolution(z) * max(matrix.tileWidth, matrix.tileHeight)
+            if span < size:
+                break
+            zoom = z
+
+        return zoom
+
+    def assets_for_tile(self, tile_x: int, tile_y: int, tile_z: int) -> List[str]:
+        """Return the datasets intersecting a TMS tile, by priority order."""
+        prepared = prepare(self.tms)
+        tile_bounds = prepared.xy_bounds(tile_x, tile_y, tile_z)
+        if not _intersects(tile_bounds, self._xy_bbox):
+            return []
+
+        # Tiles larger than the index tiles would expand to many index keys
+        if tile_z < self.index_zoom:
+            candidates = set(self.assets)
+        else:
+            candidates = set()
+            for index_tile in prepared.xy_tiles(tile_bounds, self.index_zoom):
+                candidates.update(self._index.get(index_tile, []))
+
+        assets = [
+            asset
+            for asset in candidates
+            if _intersects(tile_bounds, self._xy_bounds[asset])
+        ]
+        return sorted(assets, key=lambda asset: self._priority[asset])
+
+    def tile(
+        self,
+        tile_x: int,
+        tile_y: int,
+        tile_z: int,
+        pixel_selection: Union[Type[MosaicMethodBase], MosaicMethodBase] = FirstMethod,
+        chunk_size: Optional[int] = None,
+        **kwargs: Any,
+    ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Read a TMS map tile from the datasets.
+
+        Attributes
+        ----------
+        tile_x: int
+            TMS tile X index.
+        tile_y: int
+            TMS tile Y index.
+        tile_z: int
+            TMS tile ZOOM level.
+        pixel_selection: MosaicMethod, optional
+            rio-tiler pixel selection method (e.g FirstMethod, HighestMethod,
+            MeanMethod), default is FirstMethod.
+        chunk_size: int, optional
+            Number of datasets read per loop, reading stops when the pixel
+            selection method is done (default is `threads`).
+        kwargs: dict, optional
+            These will be passed to the reader's 'tile' method.
+
+        Returns
+        -------
+        data: numpy ndarray
+        mask: numpy array
+
+        """
+        assets = self.assets_for_tile(tile_x, tile_y, tile_z)
+        if not assets:
+            raise TileOutsideBounds(
+                "Tile {}/{}/{} is outside mosaic bounds".format(tile_z, tile_x, tile_y)
+            )
+
+        def _reader(
+            asset: str, *args: Any, **kwargs: Any
+        ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+            with self.reader(asset, **self.reader_options) as src:  # type: ignore
+                return src.tile(*args, **kwargs)
+
+        (data, mask), _ = mosaic_reader(
+            assets,
+            _reader,
+            tile_x,
+            tile_y,
+            tile_z,
+            pixel_selection=pixel_selection,
+            chunk_size=chunk_size,
+            threads=self.threads,
+            **kwargs,
+        )
+        if data is None:
+            raise TileOutsideBounds(
+                "Tile {}/{}/{} is outside mosaic bounds".format(tile_z, tile_x, tile_y)
+            )
+
+        return data, mask.astype("uint8")
@@ -0,0 +1,267 @@
+"""rio-tiler-crs.prefetch: plan and coalesce internal block reads for TMS tiles."""
+
+import math
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Union
+
+import attr
+import morecantile
+from rasterio import windows
+from rasterio.io import DatasetReader, DatasetWriter
+from rasterio.vrt import WarpedVRT
+from rasterio.warp import transform_bounds
+
+from rio_tiler.utils import get_overview_level, has_mask_band
+
+from .tms import prepare
+
+Block = Tuple[int, int]  # (row, col) of an internal block
+BlockRange = Tuple[int, int, int, int]  # (row_start, row_stop, col_start, col_stop)
+
+
+@attr.s
+class ReadPlan:
+    """
+    Internal block read plan for a set of TMS tiles.
+
+    Attributes
+    ----------
+    block_shape: tuple
+        Internal block (height, width).
+    decimations: dict
+        Decimation factor for each overview level (-1 is the full resolution).
+    tiles: dict
+        Blocks needed for each tile, as `{tile: (level, blocks)}`.
+    requests: list
+        Coalesced block ranges, as `[(level, (row_start, row_stop, col_start, col_stop))]`.
+
+    """
+
+    block_shape: Tuple[int, int] = attr.ib()
+    decimations: Dict[int, int] = attr.ib()
+    tiles: Dict[morecantile.Tile, Tuple[int, Set[Block]]] = attr.ib(factory=dict)
+    requests: List[Tuple[int, BlockRange]] = attr.ib(factory=list)
+
+    @property
+    def block_count(self) -> int:
+        """Number of unique internal blocks needed by the tiles."""
+        blocks: Set[Tuple[int, int, int]] = set()
+        for level, tile_blocks in self.tiles.values():
+            blocks.update((level, row, col) for row, col in tile_blocks)
+        return len(blocks)
+
+    @property
+    def naive_block_count(self) -> int:
+        """Number of block reads when each tile is read independently."""
+        return sum(len(blocks) for _, blocks in self.tiles.values())
+
+
+def coalesce_blocks(blocks: Set[Block], max_gap: int = 0) -> List[BlockRange]:
+    """
+    Merge internal blocks into rectangular block ranges.
+
+    COG internal blocks of one level are written row by row, so horizontally
+    adjacent blocks are stored as contiguous byte ranges. Blocks are first merged
+    in horizontal spans (allowing `max_gap` unused blocks in between) and
+    vertically consecutive rows with identical spans are then merged together.
+
+    Attributes
+    ----------
+    blocks: set
+        Set of (row, col) block indexes.
+    max_gap: int, optional
+        Number of unneeded blocks allowed between two blocks of the same span.
+
+    Returns
+    -------
+    ranges: list
+        List of (row_start, row_stop, col_start, col_stop) block ranges (stop excluded).
+
+    """
+    rows: Dict[int, List[int]] = {}
+    for row, col in blocks:
+        rows.setdefault(row, []).append(col)
+
+    spans: Dict[Tuple[int, int], List[int]] = {}
+    for row in sorted(rows):
+        cols = sorted(rows[row])
+        start = prev = cols[0]
+        for col in cols[1:]:
+            if col - prev > max_gap + 1:
+                spans.setdefault((start, prev + 1), []).append(row)
+                start = col
+            prev = col
+        spans.setdefault((start, prev + 1), []).append(row)
+
+    ranges: List[BlockRange] = []
+    for (col_start, col_stop), span_rows in spans.items():
+        row_start = prev = span_rows[0]
+        for row in span_rows[1:]:
+            if row != prev + 1:
+                ranges.append((row_start, prev + 1, col_start, col_stop))
+                row_start = row
+            prev = row
+        ranges.append((row_start, prev + 1, col_start, col_stop))
+
+    return sorted(ranges)
+
+
+def tile_blocks(
+    src_dst: Union[DatasetReader, DatasetWriter, WarpedVRT],
+    tms: morecantile.TileMatrixSet,
+    tile: morecantile.Tile,
+    tilesize: int = 256,
+) -> Optional[Tuple[int, Set[Block]]]:
+    """
+    Return the overview level and internal blocks needed to create a TMS tile.
+
+    Attributes
+    ----------
+    src_dst: rasterio.io.DatasetReader
+        Rasterio io.DatasetReader object.
+    tms: morecantile.TileMatrixSet
+        TileMatrixSet of the tile.
+    tile: morecantile.Tile
+        TMS tile.
+    tilesize: int, optional (default: 256)
+        Output tile size.
+
+    Returns
+    -------
+    level, blocks: tuple or None
+        Overview level (-1 for full resolution) and set of (row, col) blocks,
+        None if the tile does not intersect the dataset.
+
+    """
+    tile_bounds = prepare(tms).xy_bounds(*tile)
+    level = get_overview_level(
+        src_dst, tile_bounds, tilesize, tilesize, dst_crs=tms.crs
+    )
+    decim = src_dst.overviews(1)[level] if level >= 0 else 1
+
+    bounds = transform_bounds(tms.crs, src_dst.crs, *tile_bounds, densify_pts=21)
+    window = windows.from_bounds(*bounds, transform=src_dst.transform)
+    full = windows.Window(0, 0, src_dst.width, src_dst.height)
+    try:
+        window = window.intersection(full)
+    except windows.WindowError:
+        return None
+
+    block_height, block_width = src_dst.block_shapes[0]
+    level_height = math.ceil(src_dst.height / decim)
+    level_width = math.ceil(src_dst.width / decim)
+
+    row_start = int(window.row_off / decim // block_height)
+    row_stop = math.ceil((window.row_off + window.height) / decim / block_height)
+    col_start = int(window.col_off / decim // block_width)
+    col_stop = math.ceil((window.col_off + window.width) / decim / block_width)
+    row_stop = min(row_stop, math.ceil(level_height / block_height))
+    col_stop = min(col_stop, math.ceil(level_width / block_width))
+
+    blocks = {
+        (row, col)
+        for row in range(row_start, row_stop)
+        for col in range(col_start, col_stop)
+    }
+    return level, blocks
+
+
+def plan_reads(
+    src_dst: Union[DatasetReader, DatasetWriter, WarpedVRT],
+    tiles: Sequence[morecantile.Tile],
+    tms: morecantile.TileMatrixSet,
+    tilesize: int = 256,
+    max_gap: int = 0,
+) -> ReadPlan:
+    """
+    Compute a coalesced internal block read plan for multiple TMS tiles.
+
+    Attributes
+    ----------
+    src_dst: rasterio.io.DatasetReader
+        Rasterio io.DatasetReader object.
+    tiles: sequence of morecantile.Tile
+        TMS tiles to plan.
+    tms: morecantile.TileMatrixSet
+        TileMatrixSet of the tiles.
+    tilesize: int, optional (default: 256)
+        Output tile size.
+    max_gap: int, optional (default: 0)
+        Number of unneeded blocks allowed inside a merged request.
+
+    Returns
+    -------
+    plan: ReadPlan
+
+    """
+    decimations = {-1: 1}
+    decimations.update({ix: decim for ix, decim in enumerate(src_dst.overviews(1))})
+    plan = ReadPlan(block_shape=src_dst.block_shapes[0], decimations=decimations)
+
+    levels: Dict[int, Set[Block]] = {}
+    for tile in tiles:
+        tile = morecantile.Tile(*tile)
+        needed = tile_blocks(src_dst, tms, tile, tilesize=tilesize)
+        if needed is None:
+            continue
+
+        level, blocks = needed
+        plan.tiles[tile] = (level, blocks)
+        levels.setdefault(level, set()).update(blocks)
+
+    for level in sorted(levels):
+        plan.requests.extend(
+            (level, block_range)
+            for block_range in coalesce_blocks(levels[level], max_gap=max_gap)
+        )
+
+    return plan
+
+
+def prefetch(
+    src_dst: Union[DatasetReader, DatasetWriter, WarpedVRT],
+    plan: ReadPlan,
+    indexes: Optional[Sequence[int]] = None,
+):
+    """
+    Read the planned block ranges to fill GDAL's block cache.
+
+    Each block range is read with one `RasterIO` call at the overview resolution,
+    letting GDAL fetch the underlying byte ranges together. Subsequent warped
+    reads on the same dataset handle are then served from the block cache
+    (make sure `GDAL_CACHEMAX` is large enough to hold the planned blocks).
+
+    Attributes
+    ----------
+    src_dst: rasterio.io.DatasetReader
+        Rasterio io.DatasetReader object.
+    plan: ReadPlan
+        Read plan from `plan_reads`.
+    indexes: sequence of int, optional
+        Band indexes to prefetch (default is all bands).
+
+    """
+    indexes = indexes or src_dst.indexes
+    block_height, block_width = plan.block_shape
+    read_mask = has_mask_band(src_dst)
+
+    for level, (row_start, row_stop, col_start, col_stop) in plan.requests:
+        decim = plan.decimations[level]
+        level_height = math.ceil(src_dst.height / decim)
+        level_width = math.ceil(src_dst.width / decim)
+
+        row_off = row_start * block_height
+        col_off = col_start * block_width
+        height = min(row_stop * block_height, level_height) - row_off
+        width = min(col_stop * block_width, level_width) - col_off
+
+        window = windows.Window(
+            col_off * decim, row_off * decim, width * decim, height * decim
+        ).intersection(windows.Window(0, 0, src_dst.width, src_dst.height))
+
+        src_dst.read(
+            indexes=indexes, window=window, out_shape=(len(indexes), height, width)
+        )
+        if read_mask:
+            src_dst.read_masks(
+                indexes=indexes[0], window=window, out_shape=(height, width)
+            )
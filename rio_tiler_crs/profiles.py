@@ -0,0 +1,127 @@
+"""
+rio-tiler-crs.profiles: GDAL and warp performance profiles.
+
+A profile has two parts. The `vrt_options` are per dataset: they are the
+default warp options of the readers created with the profile, so readers with
+different profiles can run concurrently. The `env` options are GDAL
+configuration options, which are process wide: they are not set by the readers
+but once for the application, with `PerformanceProfile.gdal_env` (e.g at
+startup, around the server or the batch job).
+
+"""
+
+from typing import Any, Dict, Union
+
+import attr
+import rasterio
+
+from .errors import InvalidPerformanceProfile
+
+# Options shared by all the profiles for remote (HTTP/S3) datasets
+_REMOTE_OPTIONS = {
+    "GDAL_DISABLE_READDIR_ON_OPEN": "EMPTY_DIR",
+    "GDAL_HTTP_MERGE_CONSECUTIVE_RANGES": "YES",
+}
+
+
+@attr.s(frozen=True)
+class PerformanceProfile:
+    """
+    GDAL configuration and warp options for a workload.
+
+    Examples
+    --------
+    profile = get_profile("throughput")
+    with profile.gdal_env():
+        with COGReader(src_path, profile=profile) as cog:
+            cog.part(...)
+
+    Attributes
+    ----------
+    name: str
+        Profile name.
+    env: dict, optional
+        GDAL configuration options, process wide (see `gdal_env`).
+    vrt_options: dict, optional
+        `rasterio.vrt.WarpedVRT` options (e.g `warp_mem_limit`, `tolerance`
+        and `warp_extras`), used by the readers.
+
+    """
+
+    name: str = attr.ib()
+    env: Dict[str, Any] = attr.ib(factory=dict)
+    vrt_options: Dict[str, Any] = attr.ib(factory=dict)
+
+    def to_dict(self) -> Dict:
+        """Return the profile settings."""
+        return attr.asdict(self)
+
+    def gdal_env(self, **options: Any) -> rasterio.Env:
+        """
+        Return a `rasterio.Env` with the profile GDAL options (and `options`).
+
+        GDAL options are process wide, the environment should be entered once
+        for the application, not around concurrent reads.
+
+        """
+        return rasterio.Env(**{**self.env, **options})
+
+
+PROFILES: Dict[str, PerformanceProfile] = {
+    # Small reads (e.g map tiles): single threaded warping (threads cost more
+    # than they save on 256x256 tiles), small warp buffers, HTTP/2 and a per
+    # file VSI cache for the headers and overviews.
+    "latency": PerformanceProfile(
+        "latency",
+        env={
+            **_REMOTE_OPTIONS,
+            "VSI_CACHE": "TRUE",
+            "VSI_CACHE_SIZE": 5 * 1024 * 1024,
+            "GDAL_HTTP_MULTIPLEX": "YES",
+            "GDAL_HTTP_VERSION": 2,
+        },
+        vrt_options={
+            "warp_mem_limit": 64,
+            "tolerance": 0.125,
+            "warp_extras": {"NUM_THREADS": 1},
+        },
+    ),
+    # Large reads (e.g export, statistics): multithreaded warping, large warp
+    # buffers, coarser approximate transformer and a large VSI cache.
+    "throughput": PerformanceProfile(
+        "throughput",
+        env={
+            **_REMOTE_OPTIONS,
+            "VSI_CACHE": "TRUE",
+            "VSI_CACHE_SIZE": 50 * 1024 * 1024,
+        },
+        vrt_options={
+            "warp_mem_limit": 512,
+            "tolerance": 0.25,
+            "warp_extras": {"NUM_THREADS": "ALL_CPUS"},
+        },
+    ),
+    # Constrained workers: small warp buffers and no VSI cache.
+    "low-memory": PerformanceProfile(
+        "low-memory",
+        env={**_REMOTE_OPTIONS, "VSI_CACHE": "FALSE"},
+        vrt_options={
+            "warp_mem_limit": 16,
+            "tolerance": 0.125,
+            "warp_extras": {"NUM_THREADS": 1},
+        },
+    ),
+}
+
+
+def get_profile(profile: Union[str, PerformanceProfile]) -> PerformanceProfile:
+    """Return a registered profile (by name) or the profile itself."""
+    if isinstance(profile, PerformanceProfile):
+        return profile
+
+    try:
+        return PROFILES[profile]
+    except KeyError:
+        raise InvalidPerformanceProfile(
+            f"Invalid profile: {profile}, should be one of {list(PROFILES)}"
+        )
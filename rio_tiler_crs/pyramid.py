@@ -0,0 +1,302 @@
+"""rio-tiler-crs.pyramid: build tile pyramids by downsampling child tiles."""
+
+from collections import deque
+from concurrent import futures
+from typing import (
+    Callable,
+    Deque,
+    Generator,
+    Iterator,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+import morecantile
+import numpy
+
+from .errors import InvalidTileMatrixSet
+
+TileData = Tuple[numpy.ndarray, numpy.ndarray]
+PyramidTile = Tuple[morecantile.Tile, numpy.ndarray, numpy.ndarray]
+
+METHODS = ("mean", "mode", "nearest")
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def is_quadtree(tms: morecantile.TileMatrixSet, minzoom: int, maxzoom: int) -> bool:
+    """Check if each tile is split in 2x2 tiles at the next zoom level."""
+    for zoom in range(minzoom, maxzoom):
+        matrix = tms.matrix(zoom)
+        child = tms.matrix(zoom + 1)
+        if (
+            child.matrixWidth != matrix.matrixWidth * 2
+            or child.matrixHeight != matrix.matrixHeight * 2
+            or child.tileWidth != matrix.tileWidth
+            or child.tileHeight != matrix.tileHeight
+            or tuple(child.topLeftCorner) != tuple(matrix.topLeftCorner)
+            or not numpy.isclose(matrix.scaleDenominator / child.scaleDenominator, 2)
+        ):
+            return False
+
+    return True
+
+
+def children(tile: morecantile.Tile) -> Tuple[morecantile.Tile, ...]:
+    """Return the 4 children of a quadtree tile (top-left, top-right, bottom-left, bottom-right)."""
+    x, y, z = tile.x * 2, tile.y * 2, tile.z + 1
+    return (
+        morecantile.Tile(x, y, z),
+        morecantile.Tile(x + 1, y, z),
+        morecantile.Tile(x, y + 1, z),
+        morecantile.Tile(x + 1, y + 1, z),
+    )
+
+
+def downsample(
+    data: numpy.ndarray, mask: numpy.ndarray, method: str = "mean"
+) -> TileData:
+    """
+    Downsample data by a factor 2, ignoring the masked pixels.
+
+    Attributes
+    ----------
+    data: numpy.ndarray
+        Data array of shape (bands, 2 * height, 2 * width).
+    mask: numpy.ndarray
+        Mask array (0 for invalid pixels) of shape (2 * height, 2 * width).
+    method: str, optional
+        `mean` (average of the valid pixels), `mode` (most common valid pixel
+        value) or `nearest` (first valid pixel). Default is `mean`.
+
+    Returns
+    -------
+    data: numpy.ndarray
+    mask: numpy.ndarray
+        uint8 mask (0 or 255).
+
+    """
+    if method not in METHODS:
+        raise ValueError(f"Invalid downsampling method: {method}")
+
+    count, height, width = data.shape[0], data.shape[1] // 2, data.shape[2] // 2
+
+    # Stack the 4 pixels of each 2x2 block: (bands, 4, height, width)
+    values = numpy.stack(
+        [data[:, dy::2, dx::2] for dy in (0, 1) for dx in (0, 1)], axis=1
+    )
+    valid = numpy.stack([mask[dy::2, dx::2] != 0 for dy in (0, 1) for dx in (0, 1)])
+    out_mask = valid.any(axis=0).astype("uint8") * 255
+
+    if method == "mean":
+        total = valid.sum(axis=0)
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            mean = (values * valid).sum(axis=1, dtype="float64") / total
+        mean = numpy.where(total > 0, mean, 0)
+        if numpy.dtype(data.dtype).kind in "biu":
+            mean = numpy.rint(mean)
+        return mean.astype(data.dtype), out_mask
+
+    if method == "mode":
+        # Number of valid pixels (all bands) equal to each pixel of the block
+        same = (values[:, :, None] == values[:, None, :]).all(axis=0) & valid[None]
+        score = numpy.where(valid, same.sum(axis=1), -1)
+    else:
+        score = valid.astype("int8")
+
+    # argmax returns the first index for ties, so top-left pixels are preferred
+    index = numpy.broadcast_to(
+        numpy.argmax(score, axis=0)[None, None], (count, 1, height, width)
+    )
+    out = numpy.take_along_axis(values, index, axis=1)[:, 0]
+    return numpy.where(out_mask != 0, out, 0).astype(data.dtype), out_mask
+
+
+def resize(
+    data: numpy.ndarray, mask: numpy.ndarray, size: int, method: str = "nearest"
+) -> TileData:
+    """
+    Downsample a square tile to `size` pixels.
+
+    Attributes
+    ----------
+    data: numpy.ndarray
+        Data array of shape (bands, height, width).
+    mask: numpy.ndarray
+        Mask array (0 for invalid pixels) of shape (height, width).
+    size: int
+        Output tile size (lower or equal to the input size).
+    method: str, optional
+        `nearest` or `mean` (average of the valid pixels, only used for integer
+        scale factors, nearest is used otherwise). Default is `nearest`.
+
+    Returns
+    -------
+    data: numpy.ndarray
+    mask: numpy.ndarray
+
+    """
+    count, height, width = data.shape
+    if (height, width) == (size, size):
+        return data, mask
+
+    if method == "mean" and not height % size and not width % size:
+        fy, fx = height // size, width // size
+        valid = (mask != 0).reshape(size, fy, size, fx)
+        values = data.reshape(count, size, fy, size, fx)
+        total = valid.sum(axis=(1, 3))
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            mean = (values * valid[None]).sum(axis=(2, 4), dtype="float64") / total
+        mean = numpy.where(total > 0, mean, 0)
+        if numpy.dtype(data.dtype).kind in "biu":
+            mean = numpy.rint(mean)
+        out_mask = numpy.where(total > 0, 255, 0).astype(mask.dtype)
+        return mean.astype(data.dtype), out_mask
+
+    rows = ((numpy.arange(size) + 0.5) * height / size).astype("int64")
+    cols = ((numpy.arange(size) + 0.5) * width / size).astype("int64")
+    return data[:, rows[:, None], cols], mask[rows[:, None], cols]
+
+
+def merge_children(tiles: Sequence[Optional[TileData]]) -> Optional[TileData]:
+    """Merge 4 children tiles (None for empty tiles) in a 2x2 larger tile."""
+    sample = next((tile for tile in tiles if tile is not None), None)
+    if sample is None:
+        return None
+
+    count, height, width = sample[0].shape
+    data = numpy.zeros((count, height * 2, width * 2), dtype=sample[0].dtype)
+    mask = numpy.zeros((height * 2, width * 2), dtype="uint8")
+    for ix, tile in enumerate(tiles):
+        if tile is None:
+            continue
+
+        row, col = (ix // 2) * height, (ix % 2) * width
+        data[:, row : row + height, col : col + width] = tile[0]
+        mask[row : row + height, col : col + width] = tile[1]
+
+    return data, mask
+
+
+def _leaves(
+    tile: morecantile.Tile, maxzoom: int, exists: Callable[[morecantile.Tile], bool]
+) -> Iterator[morecantile.Tile]:
+    """Return the `maxzoom` descendants of a tile, skipping the missing subtrees."""
+    if not exists(tile):
+        return
+
+    if tile.z == maxzoom:
+        yield tile
+    else:
+        for child in children(tile):
+            yield from _leaves(child, maxzoom, exists)
+
+
+def _read_ahead(
+    read_tile: Callable[[T], R], tiles: Iterator[T], threads: int = 1,
+) -> Iterator[R]:
+    """
+    Read tiles in order, with at most `2 * threads` pending reads.
+
+    Closing the iterator early cancels the reads that haven't started yet.
+
+    """
+    if threads <= 1:
+        yield from map(read_tile, tiles)
+        return
+
+    with futures.ThreadPoolExecutor(max_workers=threads) as executor:
+        pending: Deque[futures.Future] = deque()
+        try:
+            for tile in tiles:
+                pending.append(executor.submit(read_tile, tile))
+                if len(pending) > threads * 2:
+                    yield pending.popleft().result()
+
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def tile_pyramid(
+    read_tile: Callable[[morecantile.Tile], Optional[TileData]],
+    tms: morecantile.TileMatrixSet,
+    tiles: Sequence[morecantile.Tile],
+    maxzoom: int,
+    method: str = "mean",
+    tile_exists: Optional[Callable[[morecantile.Tile], bool]] = None,
+    threads: int = 1,
+) -> Iterator[PyramidTile]:
+    """
+    Build tile pyramids from the `maxzoom` tiles.
+
+    Only the `maxzoom` tiles are read (with `read_tile`, by `threads` workers),
+    lower zoom levels are created by downsampling their 4 children. Each pyramid
+    is walked depth first, so only a few tiles per zoom level are kept in memory
+    and tiles are yielded before their parent.
+
+    Attributes
+    ----------
+    read_tile: callable
+        Return the (data, mask) for a `maxzoom` tile, or None for empty tiles.
+    tms: morecantile.TileMatrixSet
+        Quadtree TileMatrixSet.
+    tiles: sequence of morecantile.Tile
+        Top level tiles of the pyramids (all at the same zoom level).
+    maxzoom: int
+        Zoom level of the tiles to read.
+    method: str, optional
+        Downsampling method (see `downsample`), default is `mean`.
+    tile_exists: callable, optional
+        Return False for tiles (and their children) that can be skipped.
+    threads: int, optional
+        Number of `read_tile` workers (default is 1).
+
+    Returns
+    -------
+    tiles: iterator of (morecantile.Tile, data, mask)
+
+    """
+    if method not in METHODS:
+        raise ValueError(f"Invalid downsampling method: {method}")
+
+    zooms = {tile.z for tile in tiles}
+    if zooms and not is_quadtree(tms, min(zooms), maxzoom):
+        raise InvalidTileMatrixSet(
+            f"TileMatrixSet {tms.identifier} is not a quadtree between zooms {min(zooms)} and {maxzoom}"
+        )
+
+    def _exists(tile: morecantile.Tile) -> bool:
+        return tile_exists(tile) if tile_exists else True
+
+    leaves = (leaf for tile in tiles for leaf in _leaves(tile, maxzoom, _exists))
+    results = _read_ahead(read_tile, leaves, threads)
+
+    def _build(
+        tile: morecantile.Tile,
+    ) -> Generator[PyramidTile, None, Optional[TileData]]:
+        if not _exists(tile):
+            return None
+
+        if tile.z == maxzoom:
+            result = next(results)
+        else:
+            child_tiles = []
+            for child in children(tile):
+                child_tiles.append((yield from _build(child)))
+
+            merged = merge_children(child_tiles)
+            result = downsample(*merged, method=method) if merged else None
+
+        if result is not None:
+            yield (tile, *result)
+
+        return result
+
+    for tile in tiles:
+        yield from _build(tile)
@@ -1,17 +1,203 @@
 """rio-tiler-crs.stac."""
 
-from typing import Type
+import hashlib
+import json
+import os
+import threading
+import time
+import warnings
+from collections import OrderedDict
+from concurrent import futures
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 
 import attr
 import morecantile
+import numpy
+from rasterio.crs import CRS
 
+from rio_tiler import constants
+from rio_tiler.errors import ExpressionMixingWarning, MissingAssets
+from rio_tiler.expression import apply_expression
 from rio_tiler.io import BaseReader
 from rio_tiler.io import STACReader as RioTilerSTACReader
+from rio_tiler.io.stac import _get_assets, fetch
 
+from .cache import LRUCache
 from .cogeo import COGReader
+from .masks import combine, pack, to_uint8
 
 default_tms = morecantile.tms.get("WebMercatorQuad")
 
+_executor: Optional[futures.ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> futures.ThreadPoolExecutor:
+    """Return the ThreadPoolExecutor shared by all the STACReader instances."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = futures.ThreadPoolExecutor(max_workers=constants.MAX_THREADS)
+        return _executor
+
+
+@attr.s
+class ItemCache:
+    """
+    STAC Items cache.
+
+    Parsed items are cached in memory (LRU) and optionally on disk, with their
+    derived asset lists for each include/exclude filters combination.
+
+    Examples
+    --------
+    cache = ItemCache(maxsize=1024, ttl=300, directory="/tmp/stac")
+    with STACReader(stac_url, item_cache=cache) as stac:
+        stac.tile(...)
+
+    Attributes
+    ----------
+    maxsize: int, optional
+        Maximum number of items kept in memory (default is 512).
+    ttl: float, optional
+        Items time-to-live in seconds (default is None, items never expire).
+    directory: str, optional
+        Directory where items are also cached as JSON files.
+
+    """
+
+    maxsize: int = attr.ib(default=512)
+    ttl: Optional[float] = attr.ib(default=None)
+    directory: Optional[str] = attr.ib(default=None)
+
+    _items: LRUCache = attr.ib(init=False)
+    _assets: LRUCache = attr.ib(init=False)
+
+    def __attrs_post_init__(self):
+        """Create in-memory caches."""
+        self._items = LRUCache(maxsize=self.maxsize, ttl=self.ttl)
+        self._assets = LRUCache(maxsize=self.maxsize * 4, ttl=self.ttl)
+
+    def _disk_path(self, filepath: str) -> str:
+        """Return the JSON cache file path for an item url."""
+        name = hashlib.sha256(filepath.encode()).hexdigest()
+        return os.path.join(self.directory, f"{name}.json")
+
+    def _read_disk(self, filepath: str) -> Optional[Dict]:
+        """Read an item from the disk cache."""
+        path = self._disk_path(filepath)
+        try:
+            if self.ttl is not None and time.time() - os.path.getmtime(path) > self.ttl:
+                return None
+
+            with open(path, "r") as f:
+                return json.load(f)
+
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, filepath: str, item: Dict):
+        """Write an item to the disk cache."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._disk_path(filepath)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(item, f)
+        os.replace(tmp_path, path)
+
+    def get(self, filepath: str) -> Dict:
+        """Return the parsed STAC item, fetching it if not cached."""
+        item = self._items.get(filepath)
+        if item is not None:
+            return item
+
+        if self.directory:
+            item = self._read_disk(filepath)
+
+        if item is None:
+            # rio-tiler's `fetch` is wrapped in a lru_cache without expiration.
+            item = fetch.__wrapped__(filepath)  # type: ignore
+            if self.directory:
+                self._write_disk(filepath, item)
+
+        self._items.set(filepath, item)
+        return item
+
+    def assets(
+        self,
+        filepath: str,
+        item: Dict,
+        include: Optional[Set[str]] = None,
+        exclude: Optional[Set[str]] = None,
+        include_asset_types: Optional[Set[str]] = None,
+        exclude_asset_types: Optional[Set[str]] = None,
+    ) -> List[str]:
+        """Return the cached list of valid assets for an item."""
+
+        def _freeze(values: Optional[Set[str]]) -> Optional[FrozenSet[str]]:
+            return frozenset(values) if values is not None else None
+
+        key = (
+            filepath,
+            _freeze(include),
+            _freeze(exclude),
+            _freeze(include_asset_types),
+            _freeze(exclude_asset_types),
+        )
+        assets = self._assets.get(key)
+        if assets is None:
+            assets = list(
+                _get_assets(
+                    item,
+                    include=include,
+                    exclude=exclude,
+                    include_asset_types=include_asset_types,
+                    exclude_asset_types=exclude_asset_types,
+                )
+            )
+            self._assets.set(key, assets)
+
+        return list(assets)
+
+    def invalidate(self, filepath: str):
+        """Remove an item from the caches."""
+        self._items.pop(filepath)
+        if self.directory:
+            try:
+                os.remove(self._disk_path(filepath))
+            except OSError:
+                pass
+
+    def clear(self):
+        """Remove all the items from the in-memory caches."""
+        self._items.clear()
+        self._assets.clear()
+
+
+default_item_cache = ItemCache()
+
+
+@attr.s
+class _PoolEntry:
+    """Idle readers of an asset and the number of readers in use."""
+
+    readers: List[BaseReader] = attr.ib(factory=list)
+    in_use: int = attr.ib(default=0)
+
 
 @attr.s
 class STACReader(RioTilerSTACReader):
@@ -51,6 +237,14 @@ class STACReader(RioTilerSTACReader):
         Only include some assets base on their type
     include_asset_types: Set, optional
         Exclude some assets base on their type
+    item_cache: ItemCache, optional
+        STAC Items cache, default is a shared in-memory cache. If None,
+        rio-tiler's `fetch` function is used.
+    max_readers: int, optional
+        Maximum number of idle asset readers kept open (default is 32).
+    threads: int, optional
+        If > 1, assets are read concurrently with the executor shared by all
+        the STACReader instances (default is rio_tiler.constants.MAX_THREADS).
 
     Properties
     ----------
@@ -69,8 +263,12 @@ class STACReader(RioTilerSTACReader):
         Read preview of the COG.
     point((10, 10), assets="B01")
         Read a point value from the COG.
+    points([(10, 10), (11, 11)], assets="B01")
+        Read values for multiple points from the COGs.
     stats(assets="B01", pmin=5, pmax=95)
         Get Raster statistics.
+    streaming_stats(assets="B01", pmin=5, pmax=95)
+        Get Raster statistics by streaming over the internal blocks.
     info(assets="B01")
         Get Assets raster info.
     metadata(assets="B01", pmin=5, pmax=95)
@@ -82,6 +280,13 @@ class STACReader(RioTilerSTACReader):
     tms: morecantile.TileMatrixSet = attr.ib(default=default_tms)
     minzoom: int = attr.ib(default=None)
     maxzoom: int = attr.ib(default=None)
+    item_cache: Optional[ItemCache] = attr.ib(default=default_item_cache)
+    max_readers: int = attr.ib(default=32)
+    threads: int = attr.ib(default=constants.MAX_THREADS)
+
+    # Asset readers are kept open for the lifetime of the STACReader.
+    _readers: Dict[str, _PoolEntry] = attr.ib(init=False, factory=OrderedDict)
+    _readers_lock: threading.Lock = attr.ib(init=False, factory=threading.Lock)
 
     def __attrs_post_init__(self):
         """forward tms to readers options and set min/max zoom."""
@@ -93,4 +298,369 @@ class STACReader(RioTilerSTACReader):
         if self.maxzoom is None:
             self.maxzoom = self.tms.maxzoom
 
-        super().__attrs_post_init__()
+        if self.item_cache is None:
+            super().__attrs_post_init__()
+            return
+
+        # Items fetched from a path are cached with their derived assets list
+        cached = self.item is None
+        self.item = self.item or self.item_cache.get(self.filepath)
+        self.bounds = self.item["bbox"]
+
+        filters = dict(
+            include=self.include_assets,
+            exclude=self.exclude_assets,
+            include_asset_types=self.include_asset_types,
+            exclude_asset_types=self.exclude_asset_types,
+        )
+        if cached:
+            self.assets = self.item_cache.assets(self.filepath, self.item, **filters)
+        else:
+            self.assets = list(_get_assets(self.item, **filters))
+
+        if not self.assets:
+            raise MissingAssets("No valid asset found")
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Support using with Context Managers."""
+        self.close()
+
+    def close(self):
+        """Close the pooled asset readers."""
+        with self._readers_lock:
+            entries = list(self._readers.values())
+            self._readers.clear()
+
+        for entry in entries:
+            for reader in entry.readers:
+                reader.close()  # type: ignore
+            entry.readers.clear()
+
+    def _evict(self):
+        """Close the least recently used idle readers above `max_readers`."""
+        closing = []
+        with self._readers_lock:
+            count = sum(len(entry.readers) for entry in self._readers.values())
+            for asset in list(self._readers):
+                entry = self._readers[asset]
+                while count > self.max_readers and entry.readers:
+                    closing.append(entry.readers.pop())
+                    count -= 1
+
+                if not entry.readers and not entry.in_use:
+                    del self._readers[asset]
+
+                if count <= self.max_readers:
+                    break
+
+        for reader in closing:
+            reader.close()  # type: ignore
+
+    @contextmanager
+    def _asset_reader(self, asset: str) -> Iterator[BaseReader]:
+        """
+        Yield a pooled reader for an asset (opened on first use).
+
+        Readers are checked out of the pool for the duration of the read, so
+        concurrent reads of the same asset use different readers.
+
+        """
+        with self._readers_lock:
+            entry = self._readers.setdefault(asset, _PoolEntry())
+            self._readers.move_to_end(asset)  # type: ignore
+            reader = entry.readers.pop() if entry.readers else None
+            entry.in_use += 1
+
+        try:
+            if reader is None:
+                url = self._get_asset_url(asset)
+                reader = self.reader(url, **self.reader_options)  # type: ignore
+
+            yield reader
+
+        finally:
+            with self._readers_lock:
+                entry.in_use -= 1
+                pooled = self._readers.get(asset) is entry
+                if pooled and reader is not None:
+                    entry.readers.append(reader)
+
+            # The STACReader was closed during the read
+            if not pooled and reader is not None:
+                reader.close()  # type: ignore
+
+            self._evict()
+
+    def _map_assets(
+        self,
+        assets: Sequence[str],
+        method: str,
+        *args: Any,
+        result_callback: Optional[Callable[[Any], Any]] = None,
+        threads: Optional[int] = None,
+        **kwargs: Any,
+    ) -> Dict:
+        """
+        Call a reader method for each asset using the shared executor.
+
+        `threads` overwrites the reader `threads` option for this call (assets
+        are read sequentially if <= 1), it is not forwarded to the method.
+
+        """
+        if threads is None:
+            threads = self.threads
+
+        def _worker(asset: str) -> Any:
+            with self._asset_reader(asset) as reader:
+                result = getattr(reader, method)(*args, **kwargs)
+
+            return result_callback(result) if result_callback else result
+
+        if threads and threads > 1 and len(assets) > 1:
+            results = list(get_executor().map(_worker, assets))
+        else:
+            results = [_worker(asset) for asset in assets]
+
+        return dict(zip(assets, results))
+
+    def _parse_assets(
+        self, assets: Union[Sequence[str], str] = None, expression: Optional[str] = ""
+    ) -> Sequence[str]:
+        """Validate assets and expression options."""
+        if isinstance(assets, str):
+            assets = (assets,)
+
+        if assets and expression:
+            warnings.warn(
+                "Both expression and assets passed; expression will overwrite assets parameter.",
+                ExpressionMixingWarning,
+            )
+
+        if expression:
+            assets = self.parse_expression(expression)
+
+        if not assets:
+            raise MissingAssets(
+                "assets must be passed either via expression or assets options."
+            )
+
+        return assets
+
+    def _multi_arrays(
+        self,
+        assets: Sequence[str],
+        assets_expression: Optional[str],
+        method: str,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """Read arrays from multiple assets, merge them and apply the expression."""
+
+        def _packed(result: Tuple[numpy.ndarray, numpy.ndarray]):
+            return result[0], pack(result[1])
+
+        results = self._map_assets(
+            assets, method, *args, result_callback=_packed, **kwargs
+        )
+        arrays, masks = zip(*[results[asset] for asset in assets])
+        data = numpy.concatenate(arrays)
+        mask = to_uint8(combine(masks))
+
+        if assets_expression:
+            blocks = assets_expression.split(",")
+            data = apply_expression(blocks, assets, data)
+
+        return data, mask
+
+    def info(
+        self, assets: Union[Sequence[str], str] = None, *args, **kwargs: Any
+    ) -> Dict:
+        """Return metadata from multiple assets"""
+        if not assets:
+            raise MissingAssets("Missing 'assets' option")
+
+        if isinstance(assets, str):
+            assets = (assets,)
+
+        return self._map_assets(assets, "info")
+
+    def stats(
+        self,
+        pmin: float = 2.0,
+        pmax: float = 98.0,
+        assets: Union[Sequence[str], str] = None,
+        **kwargs: Any,
+    ) -> Dict:
+        """Return array statistics from multiple assets"""
+        if not assets:
+            raise MissingAssets("Missing 'assets' option")
+
+        if isinstance(assets, str):
+            assets = (assets,)
+
+        return self._map_assets(assets, "stats", pmin, pmax, **kwargs)
+
+    def metadata(
+        self,
+        pmin: float = 2.0,
+        pmax: float = 98.0,
+        assets: Union[Sequence[str], str] = None,
+        **kwargs: Any,
+    ) -> Dict:
+        """Return metadata from multiple assets"""
+        if not assets:
+            raise MissingAssets("Missing 'assets' option")
+
+        if isinstance(assets, str):
+            assets = (assets,)
+
+        return self._map_assets(assets, "metadata", pmin, pmax, **kwargs)
+
+    def streaming_stats(
+        self,
+        pmin: float = 2.0,
+        pmax: float = 98.0,
+        assets: Union[Sequence[str], str] = None,
+        **kwargs: Any,
+    ) -> Dict:
+        """Return streaming statistics from multiple assets"""
+        if not assets:
+            raise MissingAssets("Missing 'assets' option")
+
+        if isinstance(assets, str):
+            assets = (assets,)
+
+        # Assets are read one after the other, their blocks with the shared
+        # executor (nested executors would multiply the number of threads).
+        threads = kwargs.pop("threads", self.threads)
+        executor = get_executor() if threads and threads > 1 else None
+
+        results = {}
+        for asset in assets:
+            with self._asset_reader(asset) as reader:
+                results[asset] = reader.streaming_stats(  # type: ignore
+                    pmin, pmax, threads=threads, executor=executor, **kwargs
+                )
+
+        return results
+
+    def tile(
+        self,
+        tile_x: int,
+        tile_y: int,
+        tile_z: int,
+        assets: Union[Sequence[str], str] = None,
+        expression: Optional[str] = "",
+        asset_expression: Optional[str] = "",
+        **kwargs: Any,
+    ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """Read a TMS map tile from multiple assets."""
+        assets = self._parse_assets(assets, expression)
+        return self._multi_arrays(
+            assets,
+            expression,
+            "tile",
+            tile_x,
+            tile_y,
+            tile_z,
+            expression=asset_expression,
+            **kwargs,
+        )
+
+    def part(
+        self,
+        bbox: Tuple[float, float, float, float],
+        assets: Union[Sequence[str], str] = None,
+        expression: Optional[str] = "",
+        asset_expression: Optional[str] = "",
+        **kwargs: Any,
+    ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """Read part of multiple assets."""
+        assets = self._parse_assets(assets, expression)
+        return self._multi_arrays(
+            assets, expression, "part", bbox, expression=asset_expression, **kwargs
+        )
+
+    def preview(
+        self,
+        assets: Union[Sequence[str], str] = None,
+        expression: Optional[str] = "",
+        asset_expression: Optional[str] = "",
+        **kwargs: Any,
+    ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """Return a preview from multiple assets."""
+        assets = self._parse_assets(assets, expression)
+        return self._multi_arrays(
+            assets, expression, "preview", expression=asset_expression, **kwargs
+        )
+
+    def point(
+        self,
+        lon: float,
+        lat: float,
+        assets: Union[Sequence[str], str] = None,
+        expression: Optional[str] = "",
+        asset_expression: Optional[str] = "",
+        **kwargs: Any,
+    ) -> List:
+        """Read a value from multiple assets."""
+        assets = self._parse_assets(assets, expression)
+        data = self._map_assets(
+            assets, "point", lon, lat, expression=asset_expression, **kwargs
+        )
+
+        values = [data[asset] for asset in assets]
+        if expression:
+            blocks = expression.split(",")
+            values = apply_expression(blocks, assets, values).tolist()
+
+        return values
+
+    def points(
+        self,
+        coords: Sequence[Tuple[float, float]],
+        coord_crs: CRS = constants.WGS84_CRS,
+        assets: Union[Sequence[str], str] = None,
+        expression: Optional[str] = "",
+        asset_expression: Optional[str] = "",
+        **kwargs: Any,
+    ) -> numpy.ma.MaskedArray:
+        """
+        Read values for multiple points from multiple assets.
+
+        Attributes
+        ----------
+        coords: sequence of (x, y)
+            Point coordinates in `coord_crs`.
+        coord_crs: CRS, optional
+            Coordinates reference system, default is "epsg:4326".
+        assets: str or sequence of str
+            Asset names.
+        expression: str
+            rio-tiler expression for the assets (e.g. B01/B02)
+        asset_expression: str
+            rio-tiler expression for each asset (e.g. b1/b2)
+        kwargs: dict, optional
+            These will be passed to the 'COGReader.points' method.
+
+        Returns
+        -------
+        values: numpy.ma.MaskedArray
+            Array of shape (points, bands).
+
+        """
+        assets = self._parse_assets(assets, expression)
+        data = self._map_assets(
+            assets, "points", coords, coord_crs, expression=asset_expression, **kwargs
+        )
+        values = numpy.ma.concatenate([data[asset] for asset in assets], axis=1)
+
+        if expression:
+            mask = numpy.ma.getmaskarray(values).any(axis=1)
+            blocks = expression.split(",")
+            values = apply_expression(blocks, assets, values.data.T).T
+            values = numpy.ma.MaskedArray(
+                values, mask=numpy.repeat(mask[:, None], values.shape[1], axis=1)
+            )
+
+        return values
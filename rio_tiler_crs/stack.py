@@ -0,0 +1,404 @@
+"""rio-tiler-crs.stack: read tiles from a time ordered stack of STAC items."""
+
+import abc
+import threading
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+import attr
+import morecantile
+import numpy
+from rasterio.crs import CRS
+
+from rio_tiler import constants
+from rio_tiler.errors import TileOutsideBounds
+
+from .pyramid import _read_ahead
+from .stac import STACReader
+
+default_tms = morecantile.tms.get("WebMercatorQuad")
+
+R = TypeVar("R")
+
+
+@attr.s
+class TemporalReducer(abc.ABC):
+    """
+    Abstract base class for the streaming temporal reducers.
+
+    Dates are added in any order with `update` (with their index in the
+    stack) and only the reducer state is kept in memory.
+
+    Attributes
+    ----------
+    count: int
+        Number of dates in the stack.
+
+    """
+
+    count: int = attr.ib()
+
+    data: Optional[numpy.ndarray] = attr.ib(init=False, default=None)
+    mask: Optional[numpy.ndarray] = attr.ib(init=False, default=None)
+
+    def _init(self, data: numpy.ndarray, mask: numpy.ndarray):
+        """Create the reducer state from the first date."""
+        self.data = numpy.zeros(data.shape, dtype=data.dtype)
+        self.mask = numpy.zeros(mask.shape, dtype="bool")
+
+    @abc.abstractmethod
+    def update(self, index: int, data: numpy.ndarray, mask: numpy.ndarray):
+        """Add the data (bands, y, x) and mask (y, x) of a date."""
+
+    def result(self) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """Return the reduced data and its uint8 mask."""
+        return self.data, self.mask.astype("uint8") * 255  # type: ignore
+
+
+@attr.s
+class MaxReducer(TemporalReducer):
+    """Maximum valid value."""
+
+    def update(self, index: int, data: numpy.ndarray, mask: numpy.ndarray):
+        """Add a date."""
+        if self.data is None:
+            self._init(data, mask)
+
+        valid = mask != 0
+        update = valid & (~self.mask | (data > self.data))
+        self.data = numpy.where(update, data, self.data)
+        self.mask |= valid
+
+
+@attr.s
+class MinReducer(TemporalReducer):
+    """Minimum valid value."""
+
+    def update(self, index: int, data: numpy.ndarray, mask: numpy.ndarray):
+        """Add a date."""
+        if self.data is None:
+            self._init(data, mask)
+
+        valid = mask != 0
+        update = valid & (~self.mask | (data < self.data))
+        self.data = numpy.where(update, data, self.data)
+        self.mask |= valid
+
+
+@attr.s
+class MeanReducer(TemporalReducer):
+    """Mean of the valid values."""
+
+    total: Optional[numpy.ndarray] = attr.ib(init=False, default=None)
+    valid_count: Optional[numpy.ndarray] = attr.ib(init=False, default=None)
+
+    def update(self, index: int, data: numpy.ndarray, mask: numpy.ndarray):
+        """Add a date."""
+        if self.data is None:
+            self._init(data, mask)
+            self.total = numpy.zeros(data.shape, dtype="float64")
+            self.valid_count = numpy.zeros(mask.shape, dtype="int64")
+
+        valid = mask != 0
+        self.total += numpy.where(valid, data, 0)
+        self.valid_count += valid
+        self.mask |= valid
+
+    def result(self) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """Return the mean."""
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            mean = numpy.where(self.mask, self.total / self.valid_count, 0)
+        return mean, self.mask.astype("uint8") * 255  # type: ignore
+
+
+@attr.s
+class LatestValidReducer(TemporalReducer):
+    """Value of the latest date (highest index) with a valid pixel."""
+
+    latest: Optional[numpy.ndarray] = attr.ib(init=False, default=None)
+
+    def update(self, index: int, data: numpy.ndarray, mask: numpy.ndarray):
+        """Add a date."""
+        if self.data is None:
+            self._init(data, mask)
+            self.latest = numpy.full(mask.shape, -1, dtype="int64")
+
+        update = (mask != 0) & (index > self.latest)
+        self.data = numpy.where(update, data, self.data)
+        self.latest = numpy.where(update, index, self.latest)
+        self.mask |= update
+
+
+@attr.s
+class MedianReducer(TemporalReducer):
+    """
+    Median of the valid values.
+
+    The median needs all the values of a pixel, so the dates are stored in a
+    preallocated (time, band, y, x) array (with the data type of the dates).
+
+    """
+
+    values: Optional[numpy.ma.MaskedArray] = attr.ib(init=False, default=None)
+
+    def update(self, index: int, data: numpy.ndarray, mask: numpy.ndarray):
+        """Add a date."""
+        if self.values is None:
+            self._init(data, mask)
+            self.values = numpy.ma.masked_all((self.count, *data.shape), data.dtype)
+
+        valid = mask != 0
+        self.values[index] = numpy.ma.MaskedArray(
+            data, mask=numpy.broadcast_to(~valid, data.shape)
+        )
+        self.mask |= valid
+
+    def result(self) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """Return the median."""
+        median = numpy.ma.median(self.values, axis=0)
+        return (
+            numpy.ma.filled(median, 0),
+            self.mask.astype("uint8") * 255,  # type: ignore
+        )
+
+
+REDUCERS: Dict[str, Type[TemporalReducer]] = {
+    "max": MaxReducer,
+    "min": MinReducer,
+    "mean": MeanReducer,
+    "median": MedianReducer,
+    "latest": LatestValidReducer,
+}
+
+
+@attr.s
+class STACStackReader:
+    """
+    Read tiles and point series from a time ordered stack of STAC items.
+
+    Dates are read in parallel (each item with its own STACReader, kept open
+    for the lifetime of the stack reader). Tiles are returned as a (time, band,
+    y, x) cube, or reduced over time with a streaming reducer so the full cube
+    is not held in memory.
+
+    Examples
+    --------
+    with STACStackReader(["item_2020-01.json", "item_2020-02.json"]) as stack:
+        cube, masks = stack.tile(..., assets="B01")
+        data, mask = stack.tile(..., assets="B01", reducer="max")
+
+    Attributes
+    ----------
+    items: sequence of str
+        STAC items paths, ordered by date.
+    tms: morecantile.TileMatrixSet, optional
+        TileMatrixSet to use, default is WebMercatorQuad.
+    reader: STACReader, optional
+        STAC reader (default is rio_tiler_crs.STACReader).
+    reader_options: dict, optional
+        Additional options to forward to the reader (default is {}).
+    threads: int, optional
+        Number of dates read concurrently (default is rio_tiler.constants.MAX_THREADS).
+
+    Properties
+    ----------
+    dates: list of str
+        Items `datetime` property.
+
+    Methods
+    -------
+    tile(0, 0, 0, assets="B01", reducer="median")
+        Read a map tile for each date (or reduced over time).
+    points([(10, 10), (11, 11)], assets="B01")
+        Read values for multiple points for each date.
+
+    """
+
+    items: Sequence[str] = attr.ib()
+    tms: morecantile.TileMatrixSet = attr.ib(default=default_tms)
+    reader: Type[STACReader] = attr.ib(default=STACReader)
+    reader_options: Dict = attr.ib(factory=dict)
+    threads: int = attr.ib(default=constants.MAX_THREADS)
+
+    _readers: Dict[int, STACReader] = attr.ib(init=False, factory=dict)
+    _readers_lock: threading.Lock = attr.ib(init=False, factory=threading.Lock)
+
+    def __attrs_post_init__(self):
+        """Forward tms to the readers options."""
+        self.reader_options.update({"tms": self.tms})
+
+    def __enter__(self):
+        """Support using with Context Managers."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Support using with Context Managers."""
+        self.close()
+
+    def close(self):
+        """Close the items readers."""
+        with self._readers_lock:
+            readers = list(self._readers.values())
+            self._readers.clear()
+
+        for reader in readers:
+            reader.close()
+
+    def _item_reader(self, index: int) -> STACReader:
+        """Return the reader of an item (opened on first use)."""
+        with self._readers_lock:
+            reader = self._readers.get(index)
+
+        if reader is None:
+            reader = self.reader(self.items[index], **self.reader_options)  # type: ignore
+            with self._readers_lock:
+                if index in self._readers:
+                    reader.close()
+                    reader = self._readers[index]
+                else:
+                    self._readers[index] = reader
+
+        return reader
+
+    @property
+    def dates(self) -> List[str]:
+        """Items `datetime` property."""
+        return [
+            self._item_reader(ix).item["properties"].get("datetime")
+            for ix in range(len(self.items))
+        ]
+
+    def _map_items(self, read: Callable[[STACReader], R]) -> Iterator[Tuple[int, R]]:
+        """
+        Yield (index, `read` result) for each item reader, in the items order.
+
+        At most `2 * threads` items are read ahead, and each result is only
+        referenced until it has been yielded, so memory does not depend on the
+        number of items when the results are consumed as they come.
+
+        """
+
+        def _worker(index: int) -> R:
+            return read(self._item_reader(index))
+
+        indexes = range(len(self.items))
+        threads = self.threads if len(self.items) > 1 else 1
+        yield from zip(indexes, _read_ahead(_worker, iter(indexes), threads or 1))
+
+    def tile(
+        self,
+        tile_x: int,
+        tile_y: int,
+        tile_z: int,
+        reducer: Optional[Union[str, Type[TemporalReducer]]] = None,
+        **kwargs: Any,
+    ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Read a TMS map tile for each date.
+
+        Attributes
+        ----------
+        tile_x: int
+            TMS tile X index.
+        tile_y: int
+            TMS tile Y index.
+        tile_z: int
+            TMS tile ZOOM level.
+        reducer: str or TemporalReducer, optional
+            Temporal reducer (`max`, `min`, `mean`, `median` or `latest`). If
+            not set the full cube is returned.
+        kwargs: dict, optional
+            These will be passed to the 'STACReader.tile' method (e.g assets).
+
+        Returns
+        -------
+        data: numpy ndarray
+            (time, band, y, x) cube, or (band, y, x) if reduced.
+        mask: numpy array
+            (time, y, x) masks, or (y, x) if reduced.
+
+        """
+        if isinstance(reducer, str):
+            reducer = REDUCERS[reducer]
+
+        count = len(self.items)
+        state = reducer(count) if reducer else None
+        cube: Optional[numpy.ndarray] = None
+        masks: Optional[numpy.ndarray] = None
+
+        def _read(reader: STACReader) -> Optional[Tuple[numpy.ndarray, numpy.ndarray]]:
+            try:
+                return reader.tile(tile_x, tile_y, tile_z, **kwargs)
+            except TileOutsideBounds:
+                return None
+
+        for index, tile in self._map_items(_read):
+            if tile is None:
+                continue
+
+            data, mask = tile
+            if state is not None:
+                state.update(index, data, mask)
+                continue
+
+            if cube is None:
+                cube = numpy.zeros((count, *data.shape), dtype=data.dtype)
+                masks = numpy.zeros((count, *mask.shape), dtype="uint8")
+
+            cube[index] = data
+            masks[index] = mask  # type: ignore
+
+        if (state.data if state is not None else cube) is None:
+            raise TileOutsideBounds(
+                "Tile {}/{}/{} is outside the items bounds".format(
+                    tile_z, tile_x, tile_y
+                )
+            )
+
+        if state is not None:
+            return state.result()
+
+        return cube, masks  # type: ignore
+
+    def points(
+        self,
+        coords: Sequence[Tuple[float, float]],
+        coord_crs: CRS = constants.WGS84_CRS,
+        **kwargs: Any,
+    ) -> numpy.ma.MaskedArray:
+        """
+        Read values for multiple points for each date.
+
+        Attributes
+        ----------
+        coords: sequence of (x, y)
+            Point coordinates in `coord_crs`.
+        coord_crs: CRS, optional
+            Coordinates reference system, default is "epsg:4326".
+        kwargs: dict, optional
+            These will be passed to the 'STACReader.points' method (e.g assets).
+
+        Returns
+        -------
+        values: numpy.ma.MaskedArray
+            Array of shape (time, points, bands), masked for dates without value.
+
+        """
+        series = [
+            values
+            for _, values in self._map_items(
+                lambda reader: reader.points(coords, coord_crs, **kwargs)
+            )
+        ]
+        return numpy.ma.stack(series)
@@ -0,0 +1,344 @@
+"""rio-tiler-crs.stats: streaming statistics over dataset blocks."""
+
+import math
+import threading
+from concurrent import futures
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import attr
+import numpy
+from rasterio import windows
+from rasterio.io import DatasetReader
+
+from rio_tiler import constants
+from rio_tiler.utils import _chunks
+
+# Number of histogram bins used to approximate float and 32/64 bits data
+APPROX_BINS = 10000
+
+
+@attr.s
+class BandAccumulator:
+    """
+    Streaming statistics for one band.
+
+    Count, mean and variance are accumulated with Chan's parallel algorithm.
+    Values are also counted in a fixed-bin histogram, exact for 8/16 bits
+    integer data (one bin per value) and used to approximate the percentiles
+    for other data types.
+
+    Attributes
+    ----------
+    edges: numpy.ndarray
+        Histogram bin edges.
+    exact: bool
+        True if each bin holds a single integer value.
+
+    """
+
+    edges: numpy.ndarray = attr.ib()
+    exact: bool = attr.ib(default=False)
+
+    count: int = attr.ib(init=False, default=0)
+    mean: float = attr.ib(init=False, default=0.0)
+    m2: float = attr.ib(init=False, default=0.0)
+    min: float = attr.ib(init=False, default=math.inf)
+    max: float = attr.ib(init=False, default=-math.inf)
+    counts: numpy.ndarray = attr.ib(init=False)
+
+    def __attrs_post_init__(self):
+        """Create histogram counts."""
+        self.counts = numpy.zeros(len(self.edges) - 1, dtype="int64")
+
+    @classmethod
+    def for_dtype(
+        cls,
+        dtype: Union[str, numpy.dtype],
+        data_range: Optional[Tuple[float, float]] = None,
+    ) -> "BandAccumulator":
+        """Create an accumulator for a data type."""
+        data_type = numpy.dtype(dtype)
+        if data_type.kind in "biu" and data_type.itemsize <= 2:
+            info = numpy.iinfo(data_type)
+            edges = numpy.arange(info.min, info.max + 2, dtype="float64") - 0.5
+            return cls(edges, exact=True)
+
+        low, high = data_range or (0.0, 1.0)
+        if high <= low:
+            high = low + 1.0
+
+        return cls(numpy.linspace(low, high, APPROX_BINS + 1))
+
+    def update(self, values: numpy.ndarray):
+        """Add valid values."""
+        if not values.size:
+            return
+
+        values = values.astype("float64")
+        self.merge_values(
+            values.size,
+            float(values.mean()),
+            float(((values - values.mean()) ** 2).sum()),
+            float(values.min()),
+            float(values.max()),
+        )
+
+        if self.exact:
+            idx = (values - self.edges[0] - 0.5).astype("int64")
+        else:
+            idx = numpy.searchsorted(self.edges, values, side="right") - 1
+            idx = numpy.clip(idx, 0, len(self.counts) - 1)
+
+        self.counts += numpy.bincount(idx, minlength=len(self.counts))
+
+    def merge_values(
+        self, count: int, mean: float, m2: float, vmin: float, vmax: float
+    ):
+        """Merge partial moments."""
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta ** 2 * self.count * count / total
+        self.count = total
+        self.min = min(self.min, vmin)
+        self.max = max(self.max, vmax)
+
+    def merge(self, other: "BandAccumulator"):
+        """Merge another accumulator with the same bins."""
+        if not other.count:
+            return
+
+        self.merge_values(other.count, other.mean, other.m2, other.min, other.max)
+        self.counts += other.counts
+
+    def _value_at(self, rank: int) -> float:
+        """Return the value at a rank in the sorted values."""
+        cumulative = numpy.cumsum(self.counts)
+        ix = int(numpy.searchsorted(cumulative, rank, side="right"))
+        if self.exact:
+            return self.edges[ix] + 0.5
+
+        value = (self.edges[ix] + self.edges[ix + 1]) / 2
+        return min(max(value, self.min), self.max)
+
+    def percentile(self, pc: float) -> float:
+        """Return the (linearly interpolated) percentile."""
+        rank = pc / 100.0 * (self.count - 1)
+        low = self._value_at(math.floor(rank))
+        high = self._value_at(math.ceil(rank))
+        return low + (high - low) * (rank - math.floor(rank))
+
+    def histogram(self, bins: Union[int, Sequence] = 10, range=None) -> List:
+        """Return histogram of the values (`numpy.histogram` options)."""
+        centers = (self.edges[:-1] + self.edges[1:]) / 2
+        if not self.exact:
+            centers = numpy.clip(centers, self.min, self.max)
+
+        range = range or (self.min, self.max)
+        sample, edges = numpy.histogram(
+            centers, bins=bins, range=range, weights=self.counts
+        )
+        return [sample.astype("int64").tolist(), edges.tolist()]
+
+    def to_dict(
+        self,
+        dtype: str,
+        percentiles: Tuple[float, float] = (2.0, 98.0),
+        hist_options: Optional[Dict] = None,
+    ) -> Dict:
+        """Return statistics in the `rio_tiler.utils._stats` format."""
+        if not self.count:
+            return {
+                "pc": [None for _ in percentiles],
+                "min": None,
+                "max": None,
+                "std": None,
+                "mean": None,
+                "count": 0,
+                "histogram": [[], []],
+            }
+
+        hist_options = hist_options or {}
+        return {
+            "pc": numpy.array([self.percentile(pc) for pc in percentiles])
+            .astype(dtype)
+            .tolist(),
+            "min": numpy.array(self.min).astype(dtype).item(),
+            "max": numpy.array(self.max).astype(dtype).item(),
+            "std": math.sqrt(self.m2 / self.count),
+            "mean": self.mean,
+            "count": self.count,
+            "histogram": self.histogram(**hist_options),
+        }
+
+
+def _block_windows(
+    src_dst: DatasetReader, overview_level: Optional[int] = None
+) -> List[Tuple[windows.Window, Tuple[int, int]]]:
+    """Return the blocks windows and shapes of a dataset or of an overview level."""
+    if overview_level is None:
+        return [
+            (window, (int(window.height), int(window.width)))
+            for _, window in src_dst.block_windows(1)
+        ]
+
+    # Overview blocks, read by decimation of the full resolution windows
+    factor = src_dst.overviews(1)[overview_level]
+    height = math.ceil(src_dst.height / factor)
+    width = math.ceil(src_dst.width / factor)
+    block_height, block_width = src_dst.block_shapes[0]
+
+    blocks = []
+    for row in range(0, height, block_height):
+        for col in range(0, width, block_width):
+            shape = (min(block_height, height - row), min(block_width, width - col))
+            window = windows.Window(
+                col * factor,
+                row * factor,
+                min(shape[1] * factor, src_dst.width - col * factor),
+                min(shape[0] * factor, src_dst.height - row * factor),
+            )
+            blocks.append((window, shape))
+
+    return blocks
+
+
+def _accumulate(
+    src_dst: DatasetReader,
+    lock: threading.Lock,
+    blocks: Sequence[Tuple[windows.Window, Tuple[int, int]]],
+    indexes: Sequence[int],
+    accumulators: List[BandAccumulator],
+    nodata: Optional[Union[float, int]] = None,
+    unscale: bool = False,
+) -> List[BandAccumulator]:
+    """Accumulate the statistics of blocks (read one at a time on the dataset)."""
+    for window, shape in blocks:
+        with lock:
+            data = src_dst.read(indexes=indexes, window=window, out_shape=shape)
+            if nodata is None:
+                valid = src_dst.dataset_mask(window=window, out_shape=shape) != 0
+
+        if nodata is not None:
+            masks = [band != nodata for band in data]
+        else:
+            masks = [valid] * len(indexes)
+
+        for acc, bidx, band, mask in zip(accumulators, indexes, data, masks):
+            values = band[mask]
+            if unscale:
+                values = values * src_dst.scales[bidx - 1] + src_dst.offsets[bidx - 1]
+            acc.update(values)
+
+    return accumulators
+
+
+def stream_stats(
+    src_dst: DatasetReader,
+    indexes: Optional[Sequence[int]] = None,
+    overview_level: Optional[int] = None,
+    percentiles: Tuple[float, float] = (2.0, 98.0),
+    hist_options: Optional[Dict] = None,
+    nodata: Optional[Union[float, int]] = None,
+    unscale: bool = False,
+    threads: int = constants.MAX_THREADS,
+    executor: Optional[futures.Executor] = None,
+) -> Dict:
+    """
+    Compute bands statistics by streaming over the dataset internal blocks.
+
+    Blocks are read one at a time on the dataset handle (so any dataset, e.g
+    a WarpedVRT, can be used) and their statistics are accumulated by `threads`
+    workers, so memory use is bounded by the block size times the number of
+    workers.
+
+    Attributes
+    ----------
+    src_dst: rasterio.io.DatasetReader
+        Rasterio dataset.
+    indexes: sequence of int, optional
+        Band indexes (default is all bands).
+    overview_level: int, optional
+        Overview level to read (default is None, full resolution).
+    percentiles: tuple, optional
+        Tuple of Min/Max percentiles to compute. Default is (2, 98).
+    hist_options: dict, optional
+        Options to forward to numpy.histogram function.
+    nodata: int or float, optional
+        Overwrite the dataset nodata value.
+    unscale: bool, optional
+        If True, apply scale and offset to the data.
+    threads: int, optional
+        Number of workers (default is rio_tiler.constants.MAX_THREADS).
+    executor: concurrent.futures.Executor, optional
+        Executor running the workers (default is a new ThreadPoolExecutor).
+
+    Returns
+    -------
+    dict
+        Statistics for each band index.
+
+    """
+    indexes = indexes or src_dst.indexes
+    dtypes = ["float32" if unscale else src_dst.dtypes[bidx - 1] for bidx in indexes]
+    blocks = _block_windows(src_dst, overview_level)
+
+    data_ranges: List[Optional[Tuple[float, float]]] = [None for _ in indexes]
+    exact = [
+        numpy.dtype(dtype).kind in "biu" and numpy.dtype(dtype).itemsize <= 2
+        for dtype in dtypes
+    ]
+    if not all(exact):
+        # Approximate data range from the lowest resolution
+        decim = max(src_dst.width, src_dst.height) / 256
+        out_shape = (
+            len(indexes),
+            max(1, int(src_dst.height / decim)),
+            max(1, int(src_dst.width / decim)),
+        )
+        data = src_dst.read(indexes=indexes, out_shape=out_shape, masked=True)
+        for ix, (bidx, band) in enumerate(zip(indexes, data)):
+            if unscale:
+                band = band * src_dst.scales[bidx - 1] + src_dst.offsets[bidx - 1]
+            if band.count():
+                data_ranges[ix] = (float(band.min()), float(band.max()))
+
+    threads = max(1, min(threads or 1, len(blocks)))
+    chunk_size = math.ceil(len(blocks) / threads)
+    lock = threading.Lock()
+
+    def _worker(
+        chunk: Sequence[Tuple[windows.Window, Tuple[int, int]]]
+    ) -> List[BandAccumulator]:
+        accumulators = [
+            BandAccumulator.for_dtype(dtype, data_range)
+            for dtype, data_range in zip(dtypes, data_ranges)
+        ]
+        return _accumulate(
+            src_dst,
+            lock,
+            chunk,
+            indexes,  # type: ignore
+            accumulators,
+            nodata=nodata,
+            unscale=unscale,
+        )
+
+    chunks = list(_chunks(blocks, chunk_size))
+    if threads > 1 and executor is not None:
+        results = list(executor.map(_worker, chunks))
+    elif threads > 1:
+        with futures.ThreadPoolExecutor(max_workers=threads) as pool:
+            results = list(pool.map(_worker, chunks))
+    else:
+        results = [_worker(chunk) for chunk in chunks]
+
+    accumulators = results[0]
+    for partial in results[1:]:
+        for acc, other in zip(accumulators, partial):
+            acc.merge(other)
+
+    return {
+        bidx: acc.to_dict(dtype, percentiles=percentiles, hist_options=hist_options)
+        for bidx, dtype, acc in zip(indexes, dtypes, accumulators)
+    }
@@ -0,0 +1,170 @@
+"""rio-tiler-crs.tms: TileMatrixSet registry with cached matrices and bounds."""
+
+import hashlib
+import math
+import threading
+from typing import Dict, Iterator, Sequence, Tuple
+
+import attr
+import morecantile
+from morecantile.models import TileMatrix
+from morecantile.utils import meters_per_unit
+from rasterio.crs import CRS
+from rasterio.warp import transform
+
+from .cache import LRUCache
+
+WGS84_CRS = CRS.from_epsg(4326)
+
+
+@attr.s
+class PreparedTMS:
+    """
+    TileMatrixSet with cached matrices, resolutions and tile bounds.
+
+    `morecantile.TileMatrixSet.bounds` re-projects the whole TMS bounding box
+    for each tile corner, and `matrix` scans the list of matrices on each call.
+    Here the per-zoom grid parameters are computed once and the WGS84 tile
+    bounds are transformed in one call and cached.
+
+    Examples
+    --------
+    tms = rio_tiler_crs.tms.get("WebMercatorQuad")
+    tms.xy_bounds(1, 1, 2)
+
+    Attributes
+    ----------
+    tms: morecantile.TileMatrixSet
+        TileMatrixSet to prepare.
+    maxsize: int, optional
+        Maximum number of cached tile bounds (default is 4096).
+    key: str
+        Hash of the TMS definition (unique for custom TMS sharing an identifier).
+
+    """
+
+    tms: morecantile.TileMatrixSet = attr.ib()
+    maxsize: int = attr.ib(default=4096)
+
+    _matrices: Dict[int, TileMatrix] = attr.ib(init=False, factory=dict)
+    _grids: Dict[int, Tuple[float, float, float, float]] = attr.ib(
+        init=False, factory=dict
+    )
+    _bounds: LRUCache = attr.ib(init=False)
+    _mpu: float = attr.ib(init=False)
+    key: str = attr.ib(init=False)
+
+    @_bounds.default
+    def _bounds_cache(self):
+        return LRUCache(maxsize=self.maxsize)
+
+    def __attrs_post_init__(self):
+        """Compute the CRS dependent values once."""
+        self._mpu = meters_per_unit(self.tms.crs)
+        # Custom TMS can share an identifier, cache keys use the whole definition
+        self.key = hashlib.sha1(self.tms.json().encode()).hexdigest()
+
+    @property
+    def identifier(self) -> str:
+        """TMS identifier."""
+        return self.tms.identifier
+
+    @property
+    def crs(self) -> CRS:
+        """TMS CRS."""
+        return self.tms.crs
+
+    def matrix(self, zoom: int) -> TileMatrix:
+        """Return the TileMatrix for a zoom level."""
+        matrix = self._matrices.get(zoom)
+        if matrix is None:
+            matrix = self._matrices[zoom] = self.tms.matrix(zoom)
+
+        return matrix
+
+    def resolution(self, zoom: int) -> float:
+        """Return the pixel resolution for a zoom level."""
+        return self.matrix(zoom).scaleDenominator * 0.28e-3 / self._mpu
+
+    def _grid(self, zoom: int) -> Tuple[float, float, float, float]:
+        """Return the grid origin and tile span for a zoom level."""
+        grid = self._grids.get(zoom)
+        if grid is None:
+            matrix = self.matrix(zoom)
+            res = self.resolution(zoom)
+            origin_x, origin_y = matrix.topLeftCorner
+            if self.tms._invert_axis:
+                origin_x, origin_y = origin_y, origin_x
+
+            grid = (origin_x, origin_y, res * matrix.tileWidth, res * matrix.tileHeight)
+            self._grids[zoom] = grid
+
+        return grid
+
+    def xy_bounds(self, *tile: morecantile.Tile) -> morecantile.CoordsBbox:
+        """Return the bounding box of a tile in the TMS CRS."""
+        x, y, z = morecantile.models._parse_tile_arg(*tile)
+        origin_x, origin_y, span_x, span_y = self._grid(z)
+        return morecantile.CoordsBbox(
+            origin_x + x * span_x,
+            origin_y - (y + 1) * span_y,
+            origin_x + (x + 1) * span_x,
+            origin_y - y * span_y,
+        )
+
+    def xy_tiles(
+        self, bounds: Sequence[float], zoom: int
+    ) -> Iterator[morecantile.Tile]:
+        """
+        Return the tiles intersecting a bounding box in the TMS CRS.
+
+        Unlike `morecantile.TileMatrixSet.tiles`, which takes WGS84 bounds and
+        only uses their corners, the tiles are selected in the TMS coordinates,
+        so they cover the whole area in any projection (e.g polar grids).
+
+        """
+        left, bottom, right, top = bounds
+        matrix = self.matrix(zoom)
+        origin_x, origin_y, span_x, span_y = self._grid(zoom)
+        # Tiles only touching the bounding box edges are not selected
+        minx = max(0, math.floor((left - origin_x) / span_x))
+        maxx = min(matrix.matrixWidth, math.ceil((right - origin_x) / span_x)) - 1
+        miny = max(0, math.floor((origin_y - top) / span_y))
+        maxy = min(matrix.matrixHeight, math.ceil((origin_y - bottom) / span_y)) - 1
+        for y in range(miny, maxy + 1):
+            for x in range(minx, maxx + 1):
+                yield morecantile.Tile(x, y, zoom)
+
+    def bounds(self, *tile: morecantile.Tile) -> morecantile.CoordsBbox:
+        """Return the bounding box of a tile in WGS84."""
+        tile = morecantile.models._parse_tile_arg(*tile)
+        bounds = self._bounds.get(tile)
+        if bounds is None:
+            left, bottom, right, top = self.xy_bounds(tile)
+            xs, ys = transform(self.crs, WGS84_CRS, [left, right], [top, bottom])
+            bounds = morecantile.CoordsBbox(xs[0], ys[1], xs[1], ys[0])
+            self._bounds.set(tile, bounds)
+
+        return bounds
+
+
+_registry = LRUCache(maxsize=64)
+_registry_lock = threading.Lock()
+
+
+def prepare(tms: morecantile.TileMatrixSet) -> PreparedTMS:
+    """Return the shared PreparedTMS of a TileMatrixSet."""
+    prepared = _registry.get(id(tms))
+    if prepared is None or prepared.tms is not tms:
+        with _registry_lock:
+            prepared = _registry.get(id(tms))
+            if prepared is None or prepared.tms is not tms:
+                prepared = PreparedTMS(tms)
+                _registry.set(id(tms), prepared)
+
+    return prepared
+
+
+def get(identifier: str) -> PreparedTMS:
+    """Return the shared PreparedTMS of a registered TileMatrixSet."""
+    return prepare(morecantile.tms.get(identifier))
@@ -10,6 +10,7 @@ inst_reqs = ["morecantile>=1.1.0", "rio-tiler>=2.0b13<2.1"]
 extra_reqs = {
     "test": ["pytest", "pytest-cov"],
     "dev": ["pytest", "pytest-cov", "pre-commit"],
+    "xarray": ["dask[array]", "xarray"],
 }
 
 setup(
@@ -0,0 +1,179 @@
+"""Tests for rio_tiler_crs.cache."""
+
+import os
+import threading
+import time
+from concurrent import futures
+from unittest.mock import patch
+
+import numpy
+import pytest
+
+from rio_tiler_crs.cache import LRUCache, SharedTileCache, SingleFlight
+
+
+def test_lru_cache():
+    """Should evict least recently used entries."""
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert len(cache) == 2
+
+    assert cache.pop("a") == 1
+    assert cache.get("a", "missing") == "missing"
+
+    cache.clear()
+    assert not len(cache)
+
+
+def test_lru_cache_ttl():
+    """Should expire entries."""
+    cache = LRUCache(ttl=0.05)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert not len(cache)
+
+
+def test_single_flight():
+    """Concurrent calls with the same key should run once."""
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def _work(value):
+        calls.append(value)
+        started.set()
+        release.wait()
+        return value * 2
+
+    with futures.ThreadPoolExecutor(max_workers=6) as executor:
+        first = executor.submit(flight.do, "key", _work, 1)
+        started.wait()
+        others = [executor.submit(flight.do, "key", _work, 1) for _ in range(3)]
+        other_key = executor.submit(flight.do, "other", lambda: "other")
+        assert other_key.result() == "other"
+        assert len(flight) == 1
+        time.sleep(0.2)  # let the other calls wait on the in-flight one
+        release.set()
+        assert first.result() == 2
+        assert [f.result() for f in others] == [2, 2, 2]
+
+    assert calls == [1]
+    assert not len(flight)
+
+    def _fail():
+        raise ValueError("failed")
+
+    with pytest.raises(ValueError):
+        flight.do("key", _fail)
+
+    # errors are not cached
+    assert flight.do("key", _work, 2) == 4
+
+
+def _shared_cache_worker(path, key):
+    """Read a key from another process."""
+    cache = SharedTileCache(path, slots=16, slot_size=4096, ways=4)
+    try:
+        return cache.get(key)
+    finally:
+        cache.close()
+
+
+def test_shared_tile_cache(tmpdir):
+    """Should share entries between processes and evict per set."""
+    path = str(tmpdir.join("tiles.cache"))
+    cache = SharedTileCache(path, slots=16, slot_size=4096, ways=4)
+
+    data = numpy.arange(16, dtype="uint16").reshape(1, 4, 4)
+    mask = numpy.full((4, 4), 255, dtype="uint8")
+    assert cache.set(("cog.tif", 1, 1, 2), (data, mask))
+    assert cache.set("image", b"PNG")
+    assert cache.set("scale", (2, 1.5, b"a"))
+
+    out_data, out_mask = cache.get(("cog.tif", 1, 1, 2))
+    numpy.testing.assert_array_equal(out_data, data)
+    assert out_data.dtype == data.dtype
+    numpy.testing.assert_array_equal(out_mask, mask)
+    assert cache.get("image") == b"PNG"
+    assert cache.get("scale") == (2, 1.5, b"a")
+    assert cache.get("missing", "default") == "default"
+    assert len(cache) == 3
+
+    # Values larger than a slot are not cached
+    with pytest.warns(UserWarning):
+        assert not cache.set("large", numpy.zeros(4096, dtype="uint8"))
+    assert "large" not in cache
+
+    with pytest.raises(TypeError):
+        cache.set("object", object())
+
+    # Other processes see the entries
+    with futures.ProcessPoolExecutor(max_workers=1) as executor:
+        assert executor.submit(_shared_cache_worker, path, "image").result() == b"PNG"
+
+    # Re-opening with other options fails
+    with pytest.raises(ValueError):
+        SharedTileCache(path, slots=32, slot_size=4096, ways=4)
+
+    # Least recently used entries of a set are evicted
+    for ix in range(64):
+        cache.set(("tile", ix), b"x" * ix)
+        cache.get("image")
+
+    assert cache.get("image") == b"PNG"
+    assert len(cache) <= 16
+
+    assert cache.pop("image") == b"PNG"
+    assert "image" not in cache
+
+    cache.clear()
+    assert not len(cache)
+    cache.close()
+
+
+def test_shared_tile_cache_ttl(tmpdir):
+    """Should expire entries."""
+    cache = SharedTileCache(str(tmpdir.join("tiles.cache")), slots=4, ttl=0.1)
+    cache.set("a", b"1")
+    assert cache.get("a") == b"1"
+    time.sleep(0.2)
+    assert cache.get("a") is None
+    cache.close()
+
+
+def test_shared_tile_cache_preallocate(tmpdir):
+    """Should reserve the file space or fail when opening, and not leak the fd."""
+    path = str(tmpdir.join("tiles.cache"))
+    cache = SharedTileCache(path, slots=4, slot_size=4096, preallocate=True)
+    assert os.stat(path).st_blocks * 512 >= os.stat(path).st_size
+    cache.close()
+
+    fds = len(os.listdir("/proc/self/fd"))
+    path = str(tmpdir.join("full.cache"))
+    with patch("rio_tiler_crs.cache._allocate", side_effect=OSError(28, "No space")):
+        with pytest.raises(OSError):
+            SharedTileCache(path, slots=4, slot_size=4096, preallocate=True)
+
+    # The file is left empty so the next process initializes it again
+    assert os.stat(path).st_size == 0
+    assert len(os.listdir("/proc/self/fd")) == fds
+
+    with patch("rio_tiler_crs.cache.mmap.mmap", side_effect=OSError):
+        with pytest.raises(OSError):
+            SharedTileCache(path, slots=4, slot_size=4096)
+    assert len(os.listdir("/proc/self/fd")) == fds
+
+    cache = SharedTileCache(path, slots=4, slot_size=4096)
+    cache.set("a", b"1")
+    assert cache.get("a") == b"1"
+    cache.close()
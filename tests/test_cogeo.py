@@ -1,14 +1,25 @@
 """Tests for rio_tiler_crs."""
 
 import os
+from unittest.mock import patch
 
 import morecantile
+import numpy
 import pytest
+import rasterio
+from rasterio._env import get_gdal_config
 from rasterio.crs import CRS
+from rasterio.transform import from_bounds
 
-from rio_tiler.errors import TileOutsideBounds
+from rio_tiler import reader
+from rio_tiler.errors import InvalidMosaicMethod, TileOutsideBounds
+from rio_tiler.mosaic.methods.defaults import FirstMethod
 from rio_tiler_crs import COGReader
-from rio_tiler_crs.cogeo import geotiff_options
+from rio_tiler_crs.cache import LRUCache, SharedTileCache
+from rio_tiler_crs.cogeo import geotiff_options, multi_tile
+from rio_tiler_crs.errors import InvalidPerformanceProfile
+from rio_tiler_crs.profiles import PerformanceProfile, get_profile
+from rio_tiler_crs.tms import prepare
 
 COG_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "cog.tif")
 COG_CMAP_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "cog_cmap.tif")
@@ -54,6 +65,18 @@ def test_reader_tiles():
         with pytest.raises(TileOutsideBounds):
             cog.tile(x, y, z)
 
+    extent = (-4194300, -4194300, 4194300, 4194300)
+    tms = morecantile.TileMatrixSet.custom(
+        extent, CRS.from_epsg(3413), identifier="EPSG3413", matrix_scale=[2, 2]
+    )
+    with COGReader(COG_PATH, tms=tms) as cog:
+        assert cog.footprint is not None
+        # Tile inside the COG WGS84 bounds but outside its footprint
+        tile_bounds = tms.bounds(111, 182, 7)
+        assert tile_bounds[2] > cog.bounds[0] and tile_bounds[1] > cog.bounds[1]
+        with pytest.raises(TileOutsideBounds):
+            cog.tile(111, 182, 7)
+
 
 def test_reader_part():
     """Test COGReader.part."""
@@ -121,6 +144,121 @@ def test_reader_point():
     assert len(data) == 2
 
 
+def test_reader_points():
+    """Test COGReader.points."""
+    lon = -58.181
+    lat = 73.8794
+    coords = [(lon, lat), (lon + 0.01, lat), (lon + 50, lat)]
+
+    with COGReader(COG_PATH) as cog:
+        values = cog.points(coords)
+        assert values.shape == (3, 1)
+        assert values[0, 0] == cog.point(lon, lat)[0]
+        assert values[1, 0] == cog.point(lon + 0.01, lat)[0]
+        assert values.mask[2].all()
+        assert not values.mask[:2].any()
+
+        values = cog.points(coords, indexes=(1, 1))
+        assert values.shape == (3, 2)
+
+        values = cog.points(coords, expression="B1/2,B1+3")
+        assert values.shape == (3, 2)
+        assert values[0, 1] == cog.point(lon, lat)[0] + 3
+
+        x, y = cog.dataset.xy(10, 10)
+        values = cog.points([(x, y)], coord_crs=cog.dataset.crs)
+        assert values[0, 0] == cog.dataset.read(1)[10, 10]
+
+    with COGReader(COG_SCALE_PATH, unscale=True) as cog:
+        p = cog.points([(310000, 4100000)], coord_crs=cog.dataset.crs)
+        assert round(float(p[0, 0]), 3) == 1000.892
+
+
+def test_reader_points_band_scales(tmpdir):
+    """Should unscale each band with its own scale and offset."""
+    path = str(tmpdir.join("scales.tif"))
+    data = numpy.arange(2 * 16 * 16, dtype="int16").reshape(2, 16, 16)
+    profile = dict(
+        driver="GTiff",
+        count=2,
+        dtype="int16",
+        width=16,
+        height=16,
+        crs=CRS.from_epsg(32621),
+        transform=from_bounds(300000, 8100000, 300160, 8100160, 16, 16),
+    )
+    with rasterio.open(path, "w", **profile) as dst:
+        dst.write(data)
+        dst.scales = (1.0, 0.5)
+        dst.offsets = (0.0, 10.0)
+
+    with COGReader(path, unscale=True) as cog:
+        x, y = cog.dataset.xy(3, 5)
+        values = cog.points([(x, y)], coord_crs=cog.dataset.crs)
+        assert values[0].tolist() == [data[0, 3, 5], data[1, 3, 5] * 0.5 + 10]
+
+        values = cog.points([(x, y)], coord_crs=cog.dataset.crs, indexes=2)
+        assert values[0].tolist() == [data[1, 3, 5] * 0.5 + 10]
+
+
+def test_reader_tile_stats():
+    """Test COGReader.tile_stats."""
+    with COGReader(COG_PATH) as cog:
+        stats = cog.tile_stats(6)
+        tiles = list(cog.tms.tiles(*cog.bounds, zooms=6))
+        assert len(stats) == len(tiles)
+        assert stats.dtype.names == ("x", "y", "z", "valid", "min", "max", "mean")
+        assert (stats.z == 6).all()
+        assert stats["min"].shape == (len(tiles), 1)
+
+        x, y = stats.x[0], stats.y[0]
+        data, mask = cog.tile(x, y, 6)
+        values = data[0][mask != 0]
+        assert stats["min"][0, 0] == values.min()
+        assert stats["max"][0, 0] == values.max()
+        assert stats.valid[0] == (mask != 0).mean()
+
+        single = cog.tile_stats(6, threads=1, expression="B1/2,B1+3")
+        assert single["mean"].shape == (len(tiles), 2)
+        assert single["min"][0, 1] == stats["min"][0, 0] + 3
+
+    with COGReader(COG_PATH, nodata=1) as cog:
+        stats = cog.tile_stats(5, tilesize=64)
+        assert (stats["min"][stats.valid > 0] > 1).all()
+
+    # Tiles without valid pixels are skipped by the coverage index
+    with COGReader(COG_CMAP_PATH, coverage_index=True) as cog:
+        with patch.object(reader, "part", wraps=reader.part) as part:
+            stats = cog.tile_stats(5, tilesize=16)
+            assert part.call_count < len(stats) == len(cog._tiles(5))
+
+        empty = [cog.coverage.is_empty(cog.tms, tile) for tile in cog._tiles(5)]
+        assert (stats.valid[empty] == 0).all()
+        assert numpy.isnan(stats["max"][empty]).all()
+
+    # All the tiles intersecting the COG footprint on a polar grid
+    tms = morecantile.TileMatrixSet.custom(
+        (-4194300, -4194300, 4194300, 4194300),
+        CRS.from_epsg(3413),
+        identifier="EPSG3413",
+        matrix_scale=[2, 2],
+    )
+    with COGReader(COG_PATH, tms=tms) as cog:
+        stats = cog.tile_stats(7, tilesize=16)
+        wgs84_tiles = [
+            t for t in tms.tiles(*cog.bounds, zooms=7) if cog._tile_exists(t)
+        ]
+        xmin, ymin = cog.footprint.min(axis=0) - 1e5
+        xmax, ymax = cog.footprint.max(axis=0) + 1e5
+        expected = {
+            tuple(t)
+            for t in prepare(tms).xy_tiles((xmin, ymin, xmax, ymax), 7)
+            if cog._tile_exists(t)
+        }
+        assert {(x, y, z) for x, y, z in zip(stats.x, stats.y, stats.z)} == expected
+        assert len(expected) > len(wgs84_tiles)
+
+
 def test_reader_stats():
     """Test COGReader.stats."""
     with COGReader(COG_PATH) as cog:
@@ -234,3 +372,204 @@ def test_COGReader_Options():
     with COGReader(COG_PATH, vrt_options={"cutline": cutline}) as cog:
         _, mask = cog.preview()
         assert not mask.all()
+
+
+def test_reader_tile_scales():
+    """Should read multiple tile sizes from one read."""
+    tms = morecantile.tms.get("WebMercatorQuad")
+    x, y, z = tms.tile(-58.181, 73.8794, 8)
+
+    with COGReader(COG_PATH) as cog:
+        tiles = cog.tile_scales(x, y, z, scales=(1, 2, 3))
+        assert sorted(tiles) == [1, 2, 3]
+        assert tiles[1][0].shape == (1, 256, 256)
+        assert tiles[2][0].shape == (1, 512, 512)
+        assert tiles[2][1].shape == (512, 512)
+
+        data, mask = cog.tile(x, y, z, tilesize=768)
+        numpy.testing.assert_array_equal(tiles[3][0], data)
+        numpy.testing.assert_array_equal(tiles[3][1], mask)
+
+
+def test_reader_multi_tms():
+    """Should read tiles in multiple TMS from one reader."""
+    lon, lat = -58.181, 73.8794
+    tms_3413 = morecantile.TileMatrixSet.custom(
+        (-4194300, -4194300, 4194300, 4194300),
+        CRS.from_epsg(3413),
+        identifier="EPSG3413",
+        matrix_scale=[2, 2],
+    )
+    grids = [
+        morecantile.tms.get("WebMercatorQuad"),
+        morecantile.tms.get("WorldCRS84Quad"),
+        tms_3413,
+    ]
+
+    with COGReader(COG_PATH) as cog:
+        for tms in grids:
+            metadata = cog.tms_metadata(tms)
+            assert cog.tms_metadata(tms) is metadata
+
+            x, y, z = tms.tile(lon, lat, metadata.maxzoom)
+            data, mask = cog.tile(x, y, z, tms=tms)
+
+            with COGReader(COG_PATH, tms=tms) as tms_cog:
+                assert (metadata.minzoom, metadata.maxzoom) == (
+                    tms_cog.minzoom,
+                    tms_cog.maxzoom,
+                )
+                numpy.testing.assert_array_equal(metadata.footprint, tms_cog.footprint)
+                expected, expected_mask = tms_cog.tile(x, y, z)
+
+            numpy.testing.assert_array_equal(data, expected)
+            numpy.testing.assert_array_equal(mask, expected_mask)
+
+        # reader TMS is unchanged
+        assert cog.tms.identifier == "WebMercatorQuad"
+        assert cog.tms_metadata().minzoom == cog.minzoom
+
+        x, y, z = tms_3413.tile(lon + 10, lat, 7)
+        with pytest.raises(TileOutsideBounds):
+            cog.tile(x, y, z, tms=tms_3413)
+
+
+def test_multi_tile():
+    """Should stop reading assets once the tile is filled."""
+    x, y, z = morecantile.tms.get("WebMercatorQuad").tile(-58.181, 73.8794, 8)
+
+    data, mask = multi_tile([COG_PATH, COG_PATH], x, y, z)
+    assert data.shape == (2, 256, 256)
+    assert mask.dtype == numpy.uint8
+
+    masked, _ = multi_tile([COG_PATH, COG_PATH], x, y, z, masked=True)
+    assert isinstance(masked, numpy.ma.MaskedArray)
+    numpy.testing.assert_array_equal(masked.data, data)
+    assert masked.count() == numpy.count_nonzero(mask) * 2
+
+    with COGReader(COG_PATH) as cog:
+        expected, expected_mask = cog.tile(x, y, z)
+    assert expected_mask.all()
+
+    with patch.object(COGReader, "tile", autospec=True, side_effect=COGReader.tile):
+        data, mask = multi_tile(
+            [COG_PATH] * 10, x, y, z, pixel_selection=FirstMethod, threads=1
+        )
+        assert COGReader.tile.call_count == 1
+
+    numpy.testing.assert_array_equal(data, expected)
+    assert mask.dtype == numpy.uint8
+    assert mask.all()
+
+    # Assets outside the tile are skipped
+    outside = morecantile.tms.get("WebMercatorQuad").tile(-18.181, 73.8794, 8)
+    with pytest.raises(TileOutsideBounds):
+        multi_tile([COG_PATH, COG_PATH], *outside, pixel_selection=FirstMethod)
+
+    with pytest.raises(InvalidMosaicMethod):
+        multi_tile([COG_PATH], x, y, z, pixel_selection=dict)
+
+
+def test_reader_profile():
+    """Should apply the performance profile warp options to every read."""
+    x, y, z = morecantile.tms.get("WebMercatorQuad").tile(-58.181, 73.8794, 8)
+
+    with COGReader(COG_PATH) as cog:
+        assert "profile" not in cog.info()
+        expected, expected_mask = cog.tile(x, y, z)
+
+    with pytest.raises(InvalidPerformanceProfile):
+        COGReader(COG_PATH, profile="fast")
+
+    env = {}
+
+    def _post_process(data, mask):
+        env["VSI_CACHE"] = get_gdal_config("VSI_CACHE")
+        return data, mask
+
+    with COGReader(COG_PATH, profile="latency", post_process=_post_process) as cog:
+        info = cog.info()["profile"]
+        assert info["name"] == "latency"
+        assert info["vrt_options"]["warp_mem_limit"] == 64
+
+        # GDAL options are process wide, they are not set by the reader
+        data, mask = cog.tile(x, y, z)
+        numpy.testing.assert_array_equal(data, expected)
+        numpy.testing.assert_array_equal(mask, expected_mask)
+        assert env["VSI_CACHE"] is None
+
+        cog.part(cog.bounds, max_size=64)
+        cog.preview(max_size=64)
+
+    # User options take precedence over the profile options
+    with COGReader(
+        COG_PATH, profile="throughput", vrt_options={"warp_mem_limit": 32}
+    ) as cog:
+        options = cog.info()["profile"]["vrt_options"]
+        assert options["warp_mem_limit"] == 32
+        assert options["warp_extras"] == {"NUM_THREADS": "ALL_CPUS"}
+        data, mask = cog.tile(x, y, z)
+        assert data.shape == (1, 256, 256)
+
+    profile = PerformanceProfile("custom", env={"VSI_CACHE": "FALSE"})
+    with COGReader(COG_PATH, profile=profile) as cog:
+        assert cog.info()["profile"]["name"] == "custom"
+        data, mask = cog.tile(x, y, z)
+        numpy.testing.assert_array_equal(data, expected)
+
+    # The application sets the GDAL options once
+    with get_profile("latency").gdal_env(GDAL_CACHEMAX=64):
+        assert get_gdal_config("VSI_CACHE") == "TRUE"
+        with COGReader(COG_PATH, post_process=_post_process) as cog:
+            cog.tile(x, y, z)
+        assert env["VSI_CACHE"] == "TRUE"
+
+    assert get_gdal_config("VSI_CACHE") is None
+
+
+def test_reader_tile_cache(tmpdir):
+    """Should read the tiles once with a tile cache."""
+    x, y, z = morecantile.tms.get("WebMercatorQuad").tile(-58.181, 73.8794, 8)
+
+    with COGReader(COG_PATH) as cog:
+        expected, expected_mask = cog.tile(x, y, z)
+
+    caches = [
+        LRUCache(maxsize=8),
+        SharedTileCache(str(tmpdir.join("tiles.cache")), slots=8, slot_size=2 ** 18),
+    ]
+    for cache in caches:
+        with patch("rio_tiler_crs.cogeo.reader.part", wraps=reader.part) as part:
+            with COGReader(COG_PATH, tile_cache=cache) as cog:
+                cog.tile(x, y, z)
+                data, mask = cog.tile(x, y, z)
+                assert part.call_count == 1
+
+                # Options are part of the key
+                cog.tile(x, y, z, resampling_method="bilinear")
+                assert part.call_count == 2
+
+            # Shared by the readers
+            with COGReader(COG_PATH, tile_cache=cache) as cog:
+                cog.tile(x, y, z)
+                assert part.call_count == 2
+
+        numpy.testing.assert_array_equal(data, expected)
+        numpy.testing.assert_array_equal(mask, expected_mask)
+
+    caches[1].close()
+
+    # Custom TMS sharing an identifier have their own tiles
+    cache = LRUCache(maxsize=8)
+    with COGReader(COG_PATH, tile_cache=cache) as cog:
+        left, bottom, right, top = cog.dataset.bounds
+        tms = morecantile.TileMatrixSet.custom(cog.dataset.bounds, cog.dataset.crs)
+        shifted = morecantile.TileMatrixSet.custom(
+            (left + 1e5, bottom, right + 1e5, top), cog.dataset.crs
+        )
+        assert tms.identifier == shifted.identifier
+
+        data, _ = cog.tile(0, 0, 0, tms=tms)
+        other, _ = cog.tile(0, 0, 0, tms=shifted)
+        assert len(cache) == 2
+        assert not numpy.array_equal(data, other)
@@ -0,0 +1,204 @@
+"""Tests for rio_tiler_crs.coverage."""
+
+import os
+from unittest.mock import patch
+
+import morecantile
+import numpy
+import pytest
+import rasterio
+from rasterio.crs import CRS
+from rasterio.enums import Resampling
+from rasterio.transform import from_bounds
+from rasterio.warp import transform
+
+from rio_tiler.errors import TileOutsideBounds
+from rio_tiler_crs import COGReader
+from rio_tiler_crs.coverage import (
+    CoverageIndex,
+    coverage_cache,
+    footprint,
+    polygon_intersects,
+)
+
+PREFIX = os.path.join(os.path.dirname(__file__), "fixtures")
+COG_PATH = os.path.join(PREFIX, "B02.tif")
+
+EPSG3413 = morecantile.TileMatrixSet.custom(
+    (-4194300, -4194300, 4194300, 4194300),
+    CRS.from_epsg(3413),
+    identifier="EPSG3413",
+    matrix_scale=[2, 2],
+)
+
+
+def test_polygon_intersects():
+    """Should check polygon/bbox intersection."""
+    triangle = numpy.array([(0, 0), (10, 0), (0, 10)])
+    assert polygon_intersects(triangle, (1, 1, 2, 2))  # bbox inside
+    assert polygon_intersects(triangle, (-1, -1, 11, 11))  # polygon inside
+    assert polygon_intersects(triangle, (4, 4, 6, 6))  # crossing edges
+    assert not polygon_intersects(triangle, (6, 6, 8, 8))  # inside the bbox
+    assert not polygon_intersects(triangle, (-5, -5, -1, -1))
+
+
+def test_footprint():
+    """Should return the footprint in the TMS CRS."""
+    with rasterio.open(os.path.join(PREFIX, "cog.tif")) as src_dst:
+        polygon = footprint(src_dst, EPSG3413, densify_pts=5)
+        assert polygon.shape == (24, 2)
+        xmin, ymin, xmax, ymax = EPSG3413.xy_bbox
+        assert (polygon[:, 0] > xmin).all() and (polygon[:, 0] < xmax).all()
+
+        # same CRS
+        tms = morecantile.TileMatrixSet.custom(src_dst.bounds, src_dst.crs)
+        polygon = footprint(src_dst, tms, densify_pts=0)
+        assert polygon[:, 0].min() == src_dst.bounds[0]
+        assert polygon[:, 1].max() == src_dst.bounds[3]
+
+
+@pytest.mark.parametrize("identifier", ["WebMercatorQuad", "WorldCRS84Quad"])
+def test_coverage_index(identifier):
+    """Should only report tiles without valid pixels as empty."""
+    tms = morecantile.tms.get(identifier)
+    with rasterio.open(COG_PATH) as src_dst:
+        index = CoverageIndex.from_dataset(src_dst, max_size=256)
+        assert max(index.width, index.height) <= 256
+
+    empty = 0
+    with COGReader(COG_PATH, tms=tms) as cog:
+        for tile in tms.tiles(*cog.bounds, zooms=cog.maxzoom):
+            _, mask = cog.tile(*tile)
+            if index.is_empty(tms, tile):
+                empty += 1
+                assert not mask.any()
+
+    assert empty
+
+
+@pytest.fixture
+def sparse_cog(tmpdir):
+    """Write 4096x4096 COGs with 200 scattered valid pixels (nodata and mask)."""
+    rng = numpy.random.RandomState(2020)
+    rows = rng.randint(0, 4096, 200)
+    cols = rng.randint(0, 4096, 200)
+    data = numpy.zeros((1, 4096, 4096), dtype="uint8")
+    data[0, rows, cols] = 100
+
+    profile = dict(
+        driver="GTiff",
+        count=1,
+        dtype="uint8",
+        width=4096,
+        height=4096,
+        crs=CRS.from_epsg(32621),
+        transform=from_bounds(300000, 8100000, 340960, 8140960, 4096, 4096),
+        tiled=True,
+        blockxsize=512,
+        blockysize=512,
+    )
+
+    def _write(path, nodata=None):
+        with rasterio.Env(GDAL_TIFF_INTERNAL_MASK=True):
+            with rasterio.open(path, "w", nodata=nodata, **profile) as dst:
+                dst.write(data)
+                if nodata is None:
+                    dst.write_mask(data[0] != 0)
+                # average overviews keep the isolated valid pixels
+                dst.build_overviews([2, 4, 8, 16], Resampling.average)
+
+    nodata_path = str(tmpdir.join("sparse_nodata.tif"))
+    mask_path = str(tmpdir.join("sparse_mask.tif"))
+    _write(nodata_path, nodata=0)
+    _write(mask_path)
+
+    xs, ys = rasterio.transform.xy(profile["transform"], rows, cols)
+    lons, lats = transform(profile["crs"], "epsg:4326", xs, ys)
+    return nodata_path, mask_path, list(zip(lons, lats))
+
+
+def test_coverage_sparse(sparse_cog):
+    """Should never report tiles with sparse valid pixels as empty."""
+    nodata_path, mask_path, points = sparse_cog
+    tms = morecantile.tms.get("WebMercatorQuad")
+    tiles = {tms.tile(lon, lat, 14) for lon, lat in points}
+
+    for path, options in [(nodata_path, {"nodata": 0}), (mask_path, {})]:
+        with rasterio.open(path) as src_dst:
+            index = CoverageIndex.from_dataset(src_dst, max_size=64, **options)
+            # 200 valid pixels, dilated by one cell
+            assert index.count(src_dst.bounds) <= 200 * 9 < index.width * index.height
+
+        assert not [tile for tile in tiles if index.is_empty(tms, tile)]
+
+    coverage_cache.clear()
+    with COGReader(nodata_path, nodata=0, coverage_index=True) as cog:
+        for tile in tiles:
+            _, mask = cog.tile(*tile)
+            assert mask.any()
+
+
+def test_coverage_overview(sparse_cog):
+    """Should read the mask of the lowest resolution overview only."""
+    _, mask_path, _ = sparse_cog
+    with rasterio.open(mask_path) as src_dst:
+        with patch.object(
+            src_dst, "dataset_mask", wraps=src_dst.dataset_mask
+        ) as dataset_mask:
+            index = CoverageIndex.from_dataset(src_dst, max_size=64)
+            dataset_mask.assert_called_once_with(out_shape=(256, 256))
+
+        assert index.width == index.height == 64
+
+
+def test_coverage_tms_key():
+    """Should not mix tiles of custom TMS sharing an identifier."""
+    with rasterio.open(COG_PATH) as src_dst:
+        index = CoverageIndex.from_dataset(src_dst)
+        left, bottom, right, top = src_dst.bounds
+        tms = morecantile.TileMatrixSet.custom(src_dst.bounds, src_dst.crs)
+        shifted = morecantile.TileMatrixSet.custom(
+            (left + 1e6, bottom, right + 1e6, top), src_dst.crs
+        )
+
+    assert tms.identifier == shifted.identifier
+    tile = morecantile.Tile(0, 0, 0)
+    assert not index.is_empty(tms, tile)
+    assert index.is_empty(shifted, tile)
+
+
+def test_coverage_nodata():
+    """Should use the nodata option."""
+    with rasterio.open(COG_PATH) as src_dst:
+        index = CoverageIndex.from_dataset(src_dst)
+        assert index.count(src_dst.bounds)
+
+        index = CoverageIndex.from_dataset(src_dst, nodata=-1)
+        assert index.count(src_dst.bounds) == index.width * index.height
+
+        # bounds outside the dataset
+        assert not index.count((0, 0, 1, 1))
+
+
+def test_reader_coverage_index():
+    """Should raise TileOutsideBounds for empty tiles."""
+    coverage_cache.clear()
+    tms = morecantile.tms.get("WebMercatorQuad")
+    with COGReader(COG_PATH) as cog:
+        tiles = [
+            tile
+            for tile in tms.tiles(*cog.bounds, zooms=cog.maxzoom)
+            if not cog.tile(*tile)[1].any()
+        ]
+    assert tiles
+    assert not len(coverage_cache)
+
+    with COGReader(COG_PATH, coverage_index=True) as cog:
+        with pytest.raises(TileOutsideBounds):
+            cog.tile(*tiles[0])
+
+        index = cog.coverage
+
+    assert len(coverage_cache) == 1
+    with COGReader(COG_PATH, coverage_index=True) as cog:
+        assert cog.coverage is index
@@ -0,0 +1,127 @@
+"""Tests for rio_tiler_crs.dataarray."""
+
+import os
+import pickle
+from unittest.mock import patch
+
+import morecantile
+import numpy
+import pytest
+from rasterio.crs import CRS
+from rasterio.warp import transform_bounds
+
+from rio_tiler import reader
+from rio_tiler_crs import COGReader
+from rio_tiler_crs.dataarray import TileLoader
+from rio_tiler_crs.tms import prepare
+
+da = pytest.importorskip("dask.array")
+xarray = pytest.importorskip("xarray")
+
+COG_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "cog.tif")
+
+EPSG3413 = morecantile.TileMatrixSet.custom(
+    (-4194300, -4194300, 4194300, 4194300),
+    CRS.from_epsg(3413),
+    identifier="EPSG3413",
+    matrix_scale=[2, 2],
+)
+
+
+def test_reader_to_xarray():
+    """Should return a lazy DataArray with one chunk per tile."""
+    with COGReader(COG_PATH, tms=EPSG3413) as cog:
+        zoom = cog.maxzoom - 1
+        tiles = cog._tiles(zoom)
+
+        with patch.object(reader, "part", wraps=reader.part) as part:
+            arr = cog.to_xarray(zoom, tilesize=64)
+            assert not part.called
+
+        assert isinstance(arr, xarray.DataArray)
+        assert isinstance(arr.data, da.Array)
+        assert arr.dims == ("band", "y", "x")
+        assert arr.dtype == numpy.uint16
+        assert arr.band.values.tolist() == [1]
+        assert arr.attrs["zoom"] == zoom
+        assert arr.attrs["tms"] == "EPSG3413"
+        assert arr.attrs["nodata"] == 0
+        assert arr.data.chunksize == (1, 64, 64)
+
+        minx = min(tile.x for tile in tiles)
+        miny = min(tile.y for tile in tiles)
+        nx = max(tile.x for tile in tiles) - minx + 1
+        ny = max(tile.y for tile in tiles) - miny + 1
+        assert arr.shape == (1, ny * 64, nx * 64)
+        assert arr.data.numblocks == (1, ny, nx)
+
+        # Pixel centers in the TMS CRS
+        left, _, right, top = EPSG3413.xy_bounds(minx, miny, zoom)
+        res = (right - left) / 64
+        assert arr.x.values[0] == pytest.approx(left + res / 2)
+        assert arr.y.values[0] == pytest.approx(top - res / 2)
+
+        tile = tiles[len(tiles) // 4]
+        data, mask = cog.tile(*tile, tilesize=64)
+        row, col = tile.y - miny, tile.x - minx
+        block = arr[:, row * 64 : (row + 1) * 64, col * 64 : (col + 1) * 64].values
+        numpy.testing.assert_array_equal(block, numpy.where(mask, data, 0))
+
+    # Tiles outside the dataset are filled
+    with COGReader(COG_PATH) as cog:
+        bounds = (-61.3, 72.9, -60.9, 73.3)
+        arr = cog.to_xarray(9, bounds=bounds, fill_value=1)
+        xy_bounds = transform_bounds("epsg:4326", cog.tms.crs, *bounds, densify_pts=21)
+        tiles = list(prepare(cog.tms).xy_tiles(xy_bounds, 9))
+        assert arr.data.npartitions == len(tiles)
+        out = arr.values
+        assert (out == 1).any()
+        assert (out != 1).any()
+
+    with COGReader(COG_PATH) as cog:
+        arr = cog.to_xarray(8, expression="b1/2,b1*2")
+        assert arr.band.values.tolist() == ["b1/2", "b1*2"]
+        assert arr.dtype == numpy.float64
+        assert arr.shape[0] == 2
+
+
+def test_reader_to_xarray_polar():
+    """Should cover all the tiles of the COG on polar grids."""
+    with COGReader(COG_PATH, tms=EPSG3413) as cog:
+        zoom = 7
+        tiles = cog._tiles(zoom)
+        wgs84_tiles = [
+            t for t in EPSG3413.tiles(*cog.bounds, zooms=zoom) if cog._tile_exists(t)
+        ]
+        assert set(wgs84_tiles) < set(tiles)
+
+        arr = cog.to_xarray(zoom, tilesize=16)
+        minx = min(tile.x for tile in tiles)
+        miny = min(tile.y for tile in tiles)
+        nx = max(tile.x for tile in tiles) - minx + 1
+        ny = max(tile.y for tile in tiles) - miny + 1
+        assert arr.data.numblocks == (1, ny, nx)
+
+        left, _, _, top = EPSG3413.xy_bounds(minx, miny, zoom)
+        assert arr.attrs["transform"][2] == pytest.approx(left)
+        assert arr.attrs["transform"][5] == pytest.approx(top)
+
+
+def test_tile_loader_pickle():
+    """Loaders should be sent to other processes."""
+    with COGReader(COG_PATH, tms=EPSG3413) as cog:
+        zoom = cog.maxzoom - 1
+        arr = cog.to_xarray(zoom, tilesize=64)
+        tile = [
+            t for t in EPSG3413.tiles(*cog.bounds, zooms=zoom) if cog._tile_exists(t)
+        ][0]
+        data, mask = cog.tile(*tile, tilesize=64)
+
+    # The whole graph can be sent to dask distributed workers
+    arr_copy = pickle.loads(pickle.dumps(arr.data))
+    numpy.testing.assert_array_equal(arr_copy.compute(), arr.values)
+
+    loader = TileLoader(COG_PATH, COGReader, {"tms": EPSG3413}, 64, 0)
+    loader = pickle.loads(pickle.dumps(loader))
+    assert loader(morecantile.Tile(0, 0, 1)) is None
+    numpy.testing.assert_array_equal(loader(tile), numpy.where(mask, data, 0))
@@ -0,0 +1,109 @@
+"""Tests for rio_tiler_crs.export."""
+
+import os
+
+import morecantile
+import numpy
+import pytest
+import rasterio
+from rasterio.crs import CRS
+
+from rio_tiler.errors import TileOutsideBounds
+from rio_tiler_crs import COGReader
+from rio_tiler_crs.export import tiles_grid
+from rio_tiler_crs.tms import prepare
+
+COG_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "cog.tif")
+
+EPSG3413 = morecantile.TileMatrixSet.custom(
+    (-4194300, -4194300, 4194300, 4194300),
+    CRS.from_epsg(3413),
+    identifier="EPSG3413",
+    matrix_scale=[2, 2],
+)
+
+
+def test_tiles_grid():
+    """Should return the tiles grid."""
+    tms = morecantile.tms.get("WebMercatorQuad")
+    tiles = [morecantile.Tile(1, 2, 3), morecantile.Tile(2, 3, 3)]
+    grid = tiles_grid(tms, tiles, tilesize=256)
+    assert grid["width"] == 512
+    assert grid["height"] == 512
+    assert (grid["minx"], grid["miny"]) == (1, 2)
+    left, _, _, top = tms.xy_bounds(1, 2, 3)
+    assert grid["transform"].c == pytest.approx(left)
+    assert grid["transform"].f == pytest.approx(top)
+
+
+@pytest.mark.parametrize("cog_output", [True, False])
+def test_reader_export(tmpdir, cog_output):
+    """Should write the tiles to a GeoTIFF."""
+    dst_path = str(tmpdir.join("out.tif"))
+    with COGReader(COG_PATH, tms=EPSG3413) as cog:
+        zoom = cog.maxzoom - 1
+        profile = cog.export(dst_path, zoom, tilesize=64, threads=2, cog=cog_output)
+        tiles = cog._tiles(zoom)
+        tile = tiles[len(tiles) // 2]
+        data, mask = cog.tile(*tile, tilesize=64)
+
+    grid = tiles_grid(EPSG3413, tiles, tilesize=64)
+    with rasterio.open(dst_path) as src_dst:
+        assert src_dst.crs == EPSG3413.crs
+        assert src_dst.width == grid["width"] == profile["width"]
+        assert src_dst.block_shapes[0] == (64, 64)
+        assert src_dst.overviews(1)
+
+        window = rasterio.windows.Window(
+            (tile.x - grid["minx"]) * 64, (tile.y - grid["miny"]) * 64, 64, 64
+        )
+        numpy.testing.assert_array_equal(src_dst.read(window=window), data)
+        numpy.testing.assert_array_equal(src_dst.dataset_mask(window=window), mask)
+
+
+def test_reader_export_polar(tmpdir):
+    """Should export all the tiles with data on a polar grid."""
+    dst_path = str(tmpdir.join("out.tif"))
+    with COGReader(COG_PATH, tms=EPSG3413) as cog:
+        zoom = cog.maxzoom
+        cog.export(dst_path, zoom, tilesize=16, cog=False)
+
+        xmin, ymin = cog.footprint.min(axis=0) - 1e5
+        xmax, ymax = cog.footprint.max(axis=0) + 1e5
+        tiles = [
+            tile
+            for tile in prepare(EPSG3413).xy_tiles((xmin, ymin, xmax, ymax), zoom)
+            if cog._tile_exists(tile) and cog.tile(*tile, tilesize=16)[1].any()
+        ]
+
+    grid = tiles_grid(EPSG3413, tiles, tilesize=16)
+    with rasterio.open(dst_path) as src_dst:
+        assert (src_dst.width, src_dst.height) == (grid["width"], grid["height"])
+        mask = src_dst.dataset_mask()
+
+    exported = [
+        tile
+        for tile in tiles
+        if mask[
+            (tile.y - grid["miny"]) * 16 : (tile.y - grid["miny"] + 1) * 16,
+            (tile.x - grid["minx"]) * 16 : (tile.x - grid["minx"] + 1) * 16,
+        ].any()
+    ]
+    assert len(exported) == len(tiles)
+
+    # Tiles enumerated from the WGS84 bounds miss some polar tiles
+    with COGReader(COG_PATH, tms=EPSG3413) as cog:
+        wgs84_tiles = EPSG3413.tiles(*cog.bounds, zooms=zoom)
+        assert len([tile for tile in wgs84_tiles if cog._tile_exists(tile)]) < len(
+            tiles
+        )
+
+
+def test_reader_export_empty(tmpdir):
+    """Should raise TileOutsideBounds when there is no data."""
+    dst_path = str(tmpdir.join("out.tif"))
+    with COGReader(COG_PATH) as cog:
+        with pytest.raises(TileOutsideBounds):
+            cog.export(dst_path, 8, bounds=(0, 0, 1, 1))
+
+    assert not os.listdir(str(tmpdir))
@@ -0,0 +1,33 @@
+"""Tests for rio_tiler_crs lazy imports."""
+
+import subprocess
+import sys
+
+CHECK_IMPORT = """
+import sys
+import rio_tiler_crs
+heavy = [name for name in ("rasterio", "rio_tiler", "morecantile") if name in sys.modules]
+assert not heavy, heavy
+assert "COGReader" in dir(rio_tiler_crs)
+from rio_tiler_crs import COGReader, STACReader
+assert COGReader.__module__ == "rio_tiler_crs.cogeo"
+assert "rasterio" in sys.modules
+"""
+
+
+def test_lazy_import():
+    """`import rio_tiler_crs` should not load the heavy dependencies."""
+    subprocess.run([sys.executable, "-c", CHECK_IMPORT], check=True)
+
+
+def test_import_time():
+    """Package import should stay fast."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import rio_tiler_crs"],
+        check=True,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    # last line: "import time: self [us] | cumulative | rio_tiler_crs"
+    cumulative = int(proc.stderr.strip().splitlines()[-1].split("|")[1])
+    assert cumulative < 100000
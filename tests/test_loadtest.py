@@ -0,0 +1,67 @@
+"""Tests for the demo load test harness (demo/loadtest.py)."""
+
+import importlib.util
+import os
+import random
+
+import morecantile
+
+spec = importlib.util.spec_from_file_location(
+    "loadtest", os.path.join(os.path.dirname(__file__), "..", "demo", "loadtest.py"),
+)
+loadtest = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(loadtest)  # type: ignore
+
+tms = morecantile.tms.get("WebMercatorQuad")
+
+
+def test_viewport():
+    """Should return the viewport tiles, from the center, inside the matrix."""
+    center = morecantile.Tile(10, 20, 6)
+    tiles = loadtest.viewport(tms, center)
+    assert len(tiles) == 12
+    assert tiles[0] == center
+    assert {tile.x for tile in tiles} == {8, 9, 10, 11}
+    assert {tile.y for tile in tiles} == {19, 20, 21}
+    distances = [(t.x - 10) ** 2 + (t.y - 20) ** 2 for t in tiles]
+    assert distances == sorted(distances)
+
+    # Tiles outside the matrix are dropped
+    tiles = loadtest.viewport(tms, morecantile.Tile(0, 0, 1))
+    assert sorted(tiles) == [(0, 0, 1), (0, 1, 1), (1, 0, 1), (1, 1, 1)]
+
+
+def test_session():
+    """Should create reproducible sessions without duplicated tiles."""
+    bounds = (-61.3, 72.9, -52.3, 74.7)
+    views = loadtest.session(tms, bounds, 5, 9, 10, random.Random(1))
+    assert len(views) == 10
+    tiles = [tile for view in views for tile in view]
+    assert len(tiles) == len(set(tiles))
+    assert all(5 <= tile.z <= 9 for tile in tiles)
+    assert views == loadtest.session(tms, bounds, 5, 9, 10, random.Random(1))
+
+
+def test_parse_server_timing():
+    """Should parse the Server-Timing durations."""
+    header = "cache;dur=0.1, read;dur=12.5,render;dur=3, wait;desc=skip"
+    assert loadtest._parse_server_timing(header) == {
+        "cache": 0.1,
+        "read": 12.5,
+        "render": 3.0,
+    }
+    assert loadtest._parse_server_timing(None) == {}
+    assert loadtest._parse_server_timing("") == {}
+
+
+def test_summarize():
+    """Should count the requests and compute the stages percentiles."""
+    results = [
+        {"status": 200, "tms": "A", "latency": 10.0, "size": 5, "stages": {"read": 4}},
+        {"status": 404, "tms": "A", "latency": 20.0, "size": 0, "stages": {}},
+    ]
+    summary = loadtest.summarize(results, 2.0)
+    assert summary["requests"] == 2
+    assert summary["rps"] == 1.0
+    assert summary["status"] == {200: 1, 404: 1}
+    assert summary["stages"]["read"]["count"] == 1
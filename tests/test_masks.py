@@ -0,0 +1,54 @@
+"""Tests for rio_tiler_crs.masks."""
+
+import numpy
+import pytest
+
+from rio_tiler_crs import masks
+
+
+def test_pack():
+    """Should pack masks 8 pixels per byte."""
+    mask = numpy.zeros((3, 10), dtype="uint8")
+    mask[1] = 255
+    mask[2, 9] = 1
+
+    packed = masks.pack(mask)
+    assert packed[0].shape == (3, 2)
+    assert packed[1] == 10
+
+    numpy.testing.assert_array_equal(masks.unpack(packed), mask != 0)
+    out = masks.to_uint8(packed)
+    assert out.dtype == numpy.uint8
+    numpy.testing.assert_array_equal(out, numpy.where(mask != 0, 255, 0))
+
+
+def test_combine():
+    """Should combine masks with bitwise operations."""
+    rng = numpy.random.RandomState(0)
+    arrays = [(rng.rand(5, 13) > 0.3).astype("uint8") * 255 for _ in range(4)]
+    packed = [masks.pack(mask) for mask in arrays]
+
+    numpy.testing.assert_array_equal(
+        masks.unpack(masks.combine(packed)), numpy.all(arrays, axis=0)
+    )
+    numpy.testing.assert_array_equal(
+        masks.unpack(masks.combine(packed, how="any")), numpy.any(arrays, axis=0)
+    )
+    # Inputs are not modified
+    numpy.testing.assert_array_equal(masks.unpack(packed[0]), arrays[0] != 0)
+
+    with pytest.raises(ValueError):
+        masks.combine(packed, how="first")
+
+
+def test_masked_array():
+    """Should return a masked view of the data."""
+    data = numpy.arange(2 * 3 * 4).reshape(2, 3, 4)
+    mask = numpy.zeros((3, 4), dtype="uint8")
+    mask[0] = 255
+
+    arr = masks.masked_array(data, mask)
+    assert numpy.shares_memory(arr.data, data)
+    assert arr.count() == 8
+    assert arr.mask.shape == data.shape
+    assert arr.sum() == data[:, 0].sum()
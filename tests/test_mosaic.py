@@ -0,0 +1,117 @@
+"""Tests for rio_tiler_crs.mosaic."""
+
+import os
+from unittest.mock import patch
+
+import morecantile
+import numpy
+import pytest
+from rasterio.crs import CRS
+
+from rio_tiler.errors import TileOutsideBounds
+from rio_tiler.mosaic.methods import defaults
+from rio_tiler_crs import COGReader, MosaicReader
+from rio_tiler_crs.tms import PreparedTMS, prepare
+
+prefix = os.path.join(os.path.dirname(__file__), "fixtures")
+COG_PATH = os.path.join(prefix, "cog.tif")
+B01_PATH = os.path.join(prefix, "B01.tif")
+B02_PATH = os.path.join(prefix, "B02.tif")
+
+tms = morecantile.tms.get("WebMercatorQuad")
+
+EPSG3413 = morecantile.TileMatrixSet.custom(
+    (-4194300, -4194300, 4194300, 4194300),
+    CRS.from_epsg(3413),
+    identifier="EPSG3413",
+    matrix_scale=[2, 2],
+)
+
+
+def test_mosaic_index():
+    """Should index datasets footprints."""
+    with MosaicReader([B01_PATH, COG_PATH, B02_PATH]) as mosaic:
+        assert mosaic.minzoom == 5
+        assert mosaic.maxzoom == 10
+        assert mosaic.index_zoom == 5
+        assert mosaic.bounds[0] < -61 and mosaic.bounds[2] > 24
+
+        tile = tms.tile(23.7, 32, 9)
+        assert mosaic.assets_for_tile(*tile) == [B01_PATH, B02_PATH]
+
+        tile = tms.tile(-58.181, 73.8794, 7)
+        assert mosaic.assets_for_tile(*tile) == [COG_PATH]
+
+        assert mosaic.assets_for_tile(0, 0, 5) == []
+        with pytest.raises(TileOutsideBounds):
+            mosaic.tile(0, 0, 5)
+
+    footprints = {B01_PATH: (23.1, 31.5, 24.3, 32.5)}
+    with MosaicReader([B01_PATH], footprints=footprints, index_zoom=3) as mosaic:
+        assert mosaic.minzoom == tms.minzoom
+        assert mosaic.assets_for_tile(*tms.tile(23.7, 32, 9)) == [B01_PATH]
+
+    # Index zoom derived from the footprints size
+    with MosaicReader([B01_PATH], footprints=footprints) as mosaic:
+        assert mosaic.index_zoom == 8
+        assert mosaic.assets_for_tile(*tms.tile(23.7, 32, 9)) == [B01_PATH]
+        assert mosaic.assets_for_tile(*tms.tile(20, 32, 9)) == []
+
+    # Low zoom tiles are not expanded to the index tiles
+    footprints = {B01_PATH: (23.7, 32.0, 23.71, 32.01), B02_PATH: (-10, 0, -9, 1)}
+    assets = [B01_PATH, B02_PATH]
+    with MosaicReader(assets, footprints=footprints, index_zoom=12) as mosaic:
+        with patch.object(PreparedTMS, "xy_tiles") as xy_tiles:
+            assert mosaic.assets_for_tile(*tms.tile(23.7, 32, 2)) == [B01_PATH]
+            assert mosaic.assets_for_tile(*tms.tile(-9.5, 0.5, 0)) == [
+                B01_PATH,
+                B02_PATH,
+            ]
+            assert not xy_tiles.called
+
+
+@pytest.mark.parametrize("zoom", [5, 6, 7])
+def test_mosaic_index_polar(zoom):
+    """Should find the datasets of all the tiles with data on a polar grid."""
+    with COGReader(COG_PATH, tms=EPSG3413) as cog:
+        xy_bbox = (*cog.footprint.min(axis=0), *cog.footprint.max(axis=0))
+        tiles = [
+            tile
+            for tile in prepare(EPSG3413).xy_tiles(xy_bbox, zoom)
+            if cog._tile_exists(tile)
+        ]
+
+    assert tiles
+    with MosaicReader([COG_PATH, B01_PATH], tms=EPSG3413) as mosaic:
+        for tile in tiles:
+            assert mosaic.assets_for_tile(*tile) == [COG_PATH]
+
+    footprints = {COG_PATH: cog.bounds}
+    with MosaicReader([COG_PATH], tms=EPSG3413, footprints=footprints) as mosaic:
+        for tile in tiles:
+            assert mosaic.assets_for_tile(*tile) == [COG_PATH]
+
+
+def test_mosaic_tile():
+    """Should read and merge datasets."""
+    tile = tms.tile(23.7, 32, 9)
+
+    with COGReader(B01_PATH) as cog:
+        b01, b01_mask = cog.tile(*tile)
+
+    with COGReader(B02_PATH) as cog:
+        b02, _ = cog.tile(*tile)
+
+    with MosaicReader([B01_PATH, B02_PATH]) as mosaic:
+        data, mask = mosaic.tile(*tile)
+        assert data.shape == (1, 256, 256)
+        assert mask.dtype == numpy.uint8
+        valid = b01_mask == 255
+        numpy.testing.assert_array_equal(data[0][valid], b01[0][valid])
+        assert (mask[valid] == 255).all()
+
+        data, mask = mosaic.tile(*tile, pixel_selection=defaults.HighestMethod)
+        assert (data[0][valid] == numpy.maximum(b01, b02)[0][valid]).all()
+
+        data, _ = mosaic.tile(*tile, tilesize=512)
+        assert data.shape == (1, 512, 512)
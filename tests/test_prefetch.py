@@ -0,0 +1,67 @@
+"""Tests for rio_tiler_crs.prefetch."""
+
+import os
+
+import morecantile
+import numpy
+import rasterio
+
+from rio_tiler_crs import COGReader
+from rio_tiler_crs.prefetch import coalesce_blocks, plan_reads, tile_blocks
+
+COG_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "cog.tif")
+
+tms = morecantile.tms.get("WebMercatorQuad")
+
+
+def test_coalesce_blocks():
+    """Should merge adjacent blocks in rectangles."""
+    blocks = {(0, 0), (0, 1), (1, 0), (1, 1), (3, 4)}
+    assert coalesce_blocks(blocks) == [(0, 2, 0, 2), (3, 4, 4, 5)]
+
+    blocks = {(0, 0), (0, 2)}
+    assert coalesce_blocks(blocks) == [(0, 1, 0, 1), (0, 1, 2, 3)]
+    assert coalesce_blocks(blocks, max_gap=1) == [(0, 1, 0, 3)]
+
+    blocks = {(0, 0), (0, 1), (1, 0)}
+    assert coalesce_blocks(blocks) == [(0, 1, 0, 2), (1, 2, 0, 1)]
+
+
+def test_plan_reads():
+    """Should plan fewer requests than blocks."""
+    tile = tms.tile(-58.181, 73.8794, 8)
+    tiles = [
+        morecantile.Tile(tile.x + dx, tile.y + dy, tile.z)
+        for dx in range(2)
+        for dy in range(2)
+    ]
+
+    with rasterio.open(COG_PATH) as src_dst:
+        level, blocks = tile_blocks(src_dst, tms, tiles[0])
+        assert level == -1
+        assert blocks
+
+        plan = plan_reads(src_dst, tiles, tms)
+        assert len(plan.tiles) == 4
+        assert plan.block_count <= plan.naive_block_count
+        assert len(plan.requests) < plan.block_count
+
+        # tile outside the dataset
+        assert tile_blocks(src_dst, tms, morecantile.Tile(0, 0, 8)) is None
+
+
+def test_reader_prefetch():
+    """Prefetch should not change tile values."""
+    tile = tms.tile(-58.181, 73.8794, 8)
+    tiles = [tile, morecantile.Tile(tile.x + 1, tile.y, tile.z), (0, 0, 8)]
+
+    with COGReader(COG_PATH) as cog:
+        expected, expected_mask = cog.tile(*tile)
+
+    with COGReader(COG_PATH) as cog:
+        plan = cog.prefetch(tiles)
+        assert len(plan.tiles) == 2
+        data, mask = cog.tile(*tile)
+
+    numpy.testing.assert_array_equal(data, expected)
+    numpy.testing.assert_array_equal(mask, expected_mask)
@@ -0,0 +1,169 @@
+"""Tests for rio_tiler_crs.pyramid."""
+
+import os
+
+import morecantile
+import numpy
+import pytest
+from rasterio.crs import CRS
+
+from rio_tiler_crs import COGReader
+from rio_tiler_crs.errors import InvalidTileMatrixSet
+from rio_tiler_crs.pyramid import (
+    children,
+    downsample,
+    is_quadtree,
+    merge_children,
+    resize,
+)
+from rio_tiler_crs.tms import prepare
+
+COG_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "B02.tif")
+POLAR_COG_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "cog.tif")
+
+EPSG3413 = morecantile.TileMatrixSet.custom(
+    (-4194300, -4194300, 4194300, 4194300),
+    CRS.from_epsg(3413),
+    identifier="EPSG3413",
+    matrix_scale=[2, 2],
+)
+
+
+def test_downsample():
+    """Should aggregate 2x2 blocks, ignoring masked pixels."""
+    data = numpy.array([[[1, 3, 5, 5], [5, 7, 5, 6], [0, 0, 2, 2], [0, 0, 2, 2]]])
+    mask = numpy.array(
+        [[255, 255, 255, 255], [255, 0, 0, 255], [0, 0, 255, 255], [0, 0, 255, 255]]
+    )
+
+    values, out_mask = downsample(data.astype("uint8"), mask, method="mean")
+    assert values.dtype == "uint8"
+    numpy.testing.assert_array_equal(values, [[[3, 5], [0, 2]]])
+    numpy.testing.assert_array_equal(out_mask, [[255, 255], [0, 255]])
+
+    values, out_mask = downsample(data, mask, method="mode")
+    numpy.testing.assert_array_equal(values, [[[1, 5], [0, 2]]])
+
+    values, out_mask = downsample(data, mask, method="nearest")
+    numpy.testing.assert_array_equal(values, [[[1, 5], [0, 2]]])
+
+    # first valid pixel
+    mask[0, 0] = 0
+    values, _ = downsample(data, mask, method="nearest")
+    assert values[0, 0, 0] == 3
+
+    with pytest.raises(ValueError):
+        downsample(data, mask, method="max")
+
+
+def test_merge_children():
+    """Should assemble children tiles."""
+    tile = (numpy.ones((1, 2, 2), dtype="uint8"), numpy.full((2, 2), 255))
+    data, mask = merge_children([None, tile, None, None])
+    assert data.shape == (1, 4, 4)
+    assert mask[:2, 2:].all()
+    assert not mask[:, :2].any()
+    assert merge_children([None] * 4) is None
+
+
+def test_is_quadtree():
+    """Should check the TMS matrices."""
+    assert is_quadtree(morecantile.tms.get("WebMercatorQuad"), 0, 10)
+    tms = morecantile.TileMatrixSet.custom(
+        (-4194300, -4194300, 4194300, 4194300),
+        CRS.from_epsg(3413),
+        matrix_scale=[2, 2],
+    )
+    assert is_quadtree(tms, 0, 10)
+
+    options = morecantile.tms.get("WebMercatorQuad").dict(exclude_none=True)
+    options["tileMatrix"][6]["matrixWidth"] = 3
+    tms = morecantile.TileMatrixSet(**options)
+    assert not is_quadtree(tms, 0, 10)
+    assert is_quadtree(tms, 0, 5)
+
+
+def test_reader_pyramid():
+    """Should create lower zooms from the max zoom tiles."""
+    tms = morecantile.tms.get("WebMercatorQuad")
+    with COGReader(COG_PATH, tms=tms) as cog:
+        minzoom, maxzoom = cog.maxzoom - 2, cog.maxzoom
+        tiles = list(cog.pyramid(minzoom, maxzoom, tilesize=64, threads=2))
+        zooms = [tile.z for tile, _, _ in tiles]
+        assert set(zooms) == {minzoom, minzoom + 1, maxzoom}
+
+        # children are yielded before their parent
+        index = {tile: ix for ix, (tile, _, _) in enumerate(tiles)}
+        for tile in index:
+            if tile.z < maxzoom:
+                assert all(
+                    index[child] < index[tile]
+                    for child in children(tile)
+                    if child in index
+                )
+
+        # max zoom tiles are the COG tiles
+        tile, data, mask = next(t for t in tiles if t[0].z == maxzoom)
+        expected, expected_mask = cog.tile(*tile, tilesize=64)
+        numpy.testing.assert_array_equal(data, expected)
+        numpy.testing.assert_array_equal(mask, expected_mask)
+
+        # lower zoom tiles are close to the COG tiles
+        tile, data, mask = next(t for t in tiles if t[0].z == minzoom)
+        expected, expected_mask = cog.tile(*tile, tilesize=64)
+        assert data.shape == expected.shape
+        valid = (mask != 0) & (expected_mask != 0)
+        assert valid.sum() > 0.9 * (expected_mask != 0).sum()
+        assert abs(data[:, valid].mean() - expected[:, valid].mean()) < 0.1 * float(
+            expected[:, valid].mean()
+        )
+
+        assert [(t[0], t[1].sum()) for t in tiles] == [
+            (t[0], t[1].sum())
+            for t in cog.pyramid(minzoom, maxzoom, tilesize=64, threads=1)
+        ]
+
+    options = morecantile.tms.get("WebMercatorQuad").dict(exclude_none=True)
+    options["tileMatrix"][6]["scaleDenominator"] *= 1.5
+    with COGReader(COG_PATH, tms=morecantile.TileMatrixSet(**options)) as cog:
+        with pytest.raises(InvalidTileMatrixSet):
+            list(cog.pyramid(5, 7, tilesize=64))
+
+
+def test_resize():
+    """Should downsample tiles to a lower size."""
+    data = numpy.arange(36, dtype="uint16").reshape(1, 6, 6)
+    mask = numpy.full((6, 6), 255, dtype="uint8")
+    mask[:3, :3] = 0
+
+    values, out_mask = resize(data, mask, 6)
+    assert values is data
+
+    values, out_mask = resize(data, mask, 2)
+    numpy.testing.assert_array_equal(values, [[[7, 10], [25, 28]]])
+    numpy.testing.assert_array_equal(out_mask, [[0, 255], [255, 255]])
+
+    values, out_mask = resize(data, mask, 2, method="mean")
+    numpy.testing.assert_array_equal(values, [[[0, 10], [25, 28]]])
+    numpy.testing.assert_array_equal(out_mask, [[0, 255], [255, 255]])
+
+    # non integer factor uses nearest
+    values, out_mask = resize(data, mask, 4, method="mean")
+    assert values.shape == (1, 4, 4)
+    assert out_mask.shape == (4, 4)
+
+
+def test_reader_pyramid_polar():
+    """Should read all the max zoom tiles with data on a polar grid."""
+    with COGReader(POLAR_COG_PATH, tms=EPSG3413) as cog:
+        tiles = {tile for tile, _, _ in cog.pyramid(6, 7, tilesize=16) if tile.z == 7}
+
+        xmin, ymin = cog.footprint.min(axis=0) - 1e5
+        xmax, ymax = cog.footprint.max(axis=0) + 1e5
+        expected = {
+            tile
+            for tile in prepare(EPSG3413).xy_tiles((xmin, ymin, xmax, ymax), 7)
+            if cog._tile_exists(tile) and cog.tile(*tile, tilesize=16)[1].any()
+        }
+
+    assert tiles == expected
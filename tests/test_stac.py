@@ -1,7 +1,7 @@
 """Tests for stac_reader."""
 
 import os
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 import morecantile
 import pytest
@@ -9,6 +9,7 @@ import rasterio
 
 from rio_tiler.errors import InvalidAssetName, MissingAssets
 from rio_tiler_crs import STACReader
+from rio_tiler_crs.stac import ItemCache
 
 prefix = os.path.join(os.path.dirname(__file__), "fixtures")
 STAC_PATH = os.path.join(prefix, "item.json")
@@ -147,6 +148,17 @@ def test_reader_tiles(rio):
         assert data.shape == (1, 256, 256)
         assert mask.shape == (256, 256)
 
+    # Per call `threads` option (not forwarded to the assets readers)
+    with STACReader(STAC_PATH) as stac:
+        with patch("rio_tiler_crs.stac.get_executor") as get_executor:
+            data, mask = stac.tile(*tile, assets=["B01", "B02"], threads=1)
+            assert not get_executor.called
+
+        assert data.shape == (2, 256, 256)
+        data, mask = stac.tile(*tile, assets=["B01", "B02"], threads=2)
+        assert data.shape == (2, 256, 256)
+        assert stac.point(23.8, 31.9, assets="B01", threads=1)
+
 
 @patch("rio_tiler.io.cogeo.rasterio")
 def test_reader_part(rio):
@@ -279,6 +291,29 @@ def test_reader_point(rio):
         assert len(data) == 2
 
 
+@patch("rio_tiler.io.cogeo.rasterio")
+def test_reader_points(rio):
+    """Test STACReader.points."""
+    rio.open = mock_rasterio_open
+
+    lat = 32
+    lon = 23.7
+
+    with STACReader(STAC_PATH) as stac:
+        with pytest.raises(MissingAssets):
+            stac.points([(lon, lat)])
+
+        data = stac.points([(lon, lat), (lon, lat + 10)], assets=["B04", "B02"])
+        assert data.shape == (2, 2)
+        assert data[0].tolist() == stac.point(lon, lat, assets=["B04", "B02"])[0] + (
+            stac.point(lon, lat, assets=["B04", "B02"])[1]
+        )
+        assert data.mask[1].all()
+
+        data = stac.points([(lon, lat)], expression="B04/B02")
+        assert data.shape == (1, 1)
+
+
 @patch("rio_tiler.io.cogeo.rasterio")
 def test_reader_stats(rio):
     """Test STACReader.stats."""
@@ -299,6 +334,26 @@ def test_reader_stats(rio):
         assert data["B04"]
 
 
+@patch("rio_tiler.io.cogeo.rasterio")
+def test_reader_streaming_stats(rio):
+    """Test STACReader.streaming_stats."""
+    rio.open = mock_rasterio_open
+
+    with STACReader(STAC_PATH) as stac:
+        with pytest.raises(MissingAssets):
+            stac.streaming_stats()
+
+        # Blocks of all the assets are read with the shared executor
+        with patch("rio_tiler_crs.stats.futures.ThreadPoolExecutor") as pool:
+            data = stac.streaming_stats(assets=["B01", "B02"], overview_level=0)
+            assert not pool.called
+        assert len(data.keys()) == 2
+        assert data["B01"][1]["count"]
+
+        single = stac.streaming_stats(assets="B01", overview_level=0, threads=1)
+        assert single["B01"] == data["B01"]
+
+
 @patch("rio_tiler.io.cogeo.rasterio")
 def test_reader_info(rio):
     """Test STACReader.info."""
@@ -338,3 +393,74 @@ def test_reader_metadata(rio):
         assert len(data.keys()) == 2
         assert data["B02"]
         assert data["B04"]
+
+
+@patch("rio_tiler.io.cogeo.rasterio")
+def test_reader_pool(rio):
+    """Asset readers should be reused and closed with the STACReader."""
+    rio.open = mock_rasterio_open
+
+    with STACReader(STAC_PATH) as stac:
+        stac.info(assets=["B01", "B02"])
+        readers = {asset: entry.readers for asset, entry in stac._readers.items()}
+        assert list(readers) == ["B01", "B02"]
+        reader = readers["B01"][0]
+
+        stac.metadata(assets=["B01", "B02"])
+        stac.tile(289, 207, 9, assets="B01")
+        assert stac._readers["B01"].readers == [reader]
+        assert len(stac._readers["B02"].readers) == 1
+
+    assert not stac._readers
+    assert reader.dataset.closed
+
+    with STACReader(STAC_PATH, max_readers=2, threads=1) as stac:
+        meta = stac.metadata(assets=["B01", "B02", "B03"])
+        assert list(meta) == ["B01", "B02", "B03"]
+        assert list(stac._readers) == ["B02", "B03"]
+
+    # Concurrent reads of an asset use different readers
+    with STACReader(STAC_PATH, max_readers=1) as stac:
+        with stac._asset_reader("B01") as first:
+            with pytest.raises(ValueError):
+                with stac._asset_reader("B01") as second:
+                    assert second is not first
+                    raise ValueError("read error")
+
+            # Failed reads are checked in and evicted
+            assert stac._readers["B01"].readers == [second]
+
+        assert stac._readers["B01"].readers == [second]
+        assert first.dataset.closed
+        assert not second.dataset.closed
+
+
+def test_item_cache(tmpdir):
+    """Items and assets list should be cached."""
+    cache = ItemCache(directory=str(tmpdir))
+    item = cache.get(STAC_PATH)
+    assert cache.get(STAC_PATH) is item
+    assert len(tmpdir.listdir()) == 1
+
+    assets = cache.assets(STAC_PATH, item, include={"B01", "B02"})
+    assert assets == ["B01", "B02"]
+
+    with STACReader(STAC_PATH, item_cache=cache) as stac:
+        assert stac.item is item
+        assert "metadata" not in stac.assets
+
+    with STACReader(STAC_PATH, item_cache=cache, include_assets={"B01"}) as stac:
+        assert stac.assets == ["B01"]
+
+    # items are read back from disk
+    cache.clear()
+    with patch("rio_tiler_crs.stac.fetch") as fetch:
+        fetch.__wrapped__ = Mock()
+        assert cache.get(STAC_PATH) == item
+        assert not fetch.__wrapped__.called
+
+    cache.invalidate(STAC_PATH)
+    assert not tmpdir.listdir()
+
+    with STACReader(STAC_PATH, item_cache=None) as stac:
+        assert stac.item == item
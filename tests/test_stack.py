@@ -0,0 +1,193 @@
+"""Tests for rio_tiler_crs.stack."""
+
+import json
+import os
+import time
+from unittest.mock import patch
+
+import morecantile
+import numpy
+import pytest
+import rasterio
+
+from rio_tiler.errors import TileOutsideBounds
+from rio_tiler_crs import STACReader
+from rio_tiler_crs.stack import REDUCERS, STACStackReader, TemporalReducer
+
+prefix = os.path.join(os.path.dirname(__file__), "fixtures")
+STAC_PATH = os.path.join(prefix, "item.json")
+
+
+def mock_rasterio_open(asset):
+    """Mock rasterio Open."""
+    assert asset.startswith("https://somewhereovertherainbow.io")
+    asset = asset.replace("https://somewhereovertherainbow.io", prefix)
+    return rasterio.open(asset)
+
+
+def write_items(tmpdir, bands):
+    """Write one item per band, with the `B01` asset pointing to the band."""
+    with open(STAC_PATH) as f:
+        item = json.load(f)
+
+    paths = []
+    for month, band in enumerate(bands, 1):
+        item["properties"]["datetime"] = f"2020-{month:02}-18T09:11:33Z"
+        item["assets"]["B01"]["href"] = item["assets"][band]["href"]
+        path = str(tmpdir.join(f"item_{month}.json"))
+        with open(path, "w") as f:
+            json.dump(item, f)
+        paths.append(path)
+
+    return paths
+
+
+@pytest.fixture
+def items(tmpdir):
+    """Write 3 items, with the `B01` asset pointing to B01, B02 and B03."""
+    return write_items(tmpdir, ["B01", "B02", "B03"])
+
+
+def test_reducers():
+    """Reducers should ignore the masked values."""
+    data = numpy.array([[[[1, 5]]], [[[3, 2]]], [[[2, 9]]]], dtype="uint16")
+    masks = numpy.array([[[255, 255]], [[255, 0]], [[0, 0]]], dtype="uint8")
+
+    expected = {
+        "max": [3, 5],
+        "min": [1, 5],
+        "mean": [2, 5],
+        "median": [2, 5],
+        "latest": [3, 5],
+    }
+    for name, values in expected.items():
+        reducer = REDUCERS[name](3)
+        # Dates can be added in any order
+        for ix in (2, 0, 1):
+            reducer.update(ix, data[ix], masks[ix])
+
+        out, mask = reducer.result()
+        assert out.shape == (1, 1, 2)
+        assert out[0, 0].tolist() == values
+        assert mask.tolist() == [[255, 255]]
+
+    reducer = REDUCERS["max"](1)
+    reducer.update(0, data[2], masks[2])
+    out, mask = reducer.result()
+    assert not mask.any()
+
+    with pytest.raises(TypeError):
+        TemporalReducer(1)
+
+
+@patch("rio_tiler.io.cogeo.rasterio")
+def test_stack_tile(rio, items):
+    """Should return a time cube and reduce it."""
+    rio.open = mock_rasterio_open
+
+    tile = morecantile.Tile(z=9, x=289, y=207)
+
+    with STACStackReader(items) as stack:
+        assert stack.dates == [
+            "2020-01-18T09:11:33Z",
+            "2020-02-18T09:11:33Z",
+            "2020-03-18T09:11:33Z",
+        ]
+
+        cube, masks = stack.tile(*tile, assets="B01")
+        assert cube.shape == (3, 1, 256, 256)
+        assert masks.shape == (3, 256, 256)
+
+        for ix, band in enumerate(["B01", "B02", "B03"]):
+            with STACReader(STAC_PATH) as stac:
+                data, mask = stac.tile(*tile, assets=band)
+            numpy.testing.assert_array_equal(cube[ix], data)
+            numpy.testing.assert_array_equal(masks[ix], mask)
+
+        valid = masks.astype("bool")
+        expected = numpy.ma.MaskedArray(
+            cube, mask=~numpy.broadcast_to(valid[:, None], cube.shape)
+        )
+
+        data, mask = stack.tile(*tile, assets="B01", reducer="max")
+        assert data.shape == (1, 256, 256)
+        assert mask.shape == (256, 256)
+        numpy.testing.assert_array_equal(
+            data[:, mask != 0], expected.max(axis=0)[:, mask != 0]
+        )
+
+        data, mask = stack.tile(*tile, assets="B01", reducer="median")
+        numpy.testing.assert_array_equal(
+            data[:, mask != 0], numpy.ma.median(expected, axis=0)[:, mask != 0]
+        )
+
+        data, mask = stack.tile(*tile, assets="B01", reducer="latest")
+        latest = numpy.where(valid[2], cube[2], numpy.where(valid[1], cube[1], cube[0]))
+        numpy.testing.assert_array_equal(data[:, mask != 0], latest[:, mask != 0])
+
+    # Sequential reads
+    with STACStackReader(items, threads=0) as stack:
+        cube_seq, masks_seq = stack.tile(*tile, assets="B01")
+        numpy.testing.assert_array_equal(cube, cube_seq)
+        numpy.testing.assert_array_equal(masks, masks_seq)
+
+    with STACStackReader(items) as stack:
+        with pytest.raises(TileOutsideBounds):
+            stack.tile(0, 0, 9, assets="B01")
+
+
+@patch("rio_tiler.io.cogeo.rasterio")
+def test_stack_points(rio, items):
+    """Should return the points values for each date."""
+    rio.open = mock_rasterio_open
+
+    coords = [(23.8, 31.9), (23.9, 32.0)]
+    with STACStackReader(items) as stack:
+        values = stack.points(coords, assets="B01")
+        assert values.shape == (3, 2, 1)
+
+        with STACReader(STAC_PATH) as stac:
+            numpy.testing.assert_array_equal(
+                values[1], stac.points(coords, assets="B02")
+            )
+
+
+@patch("rio_tiler.io.cogeo.rasterio")
+def test_stack_streaming(rio, tmpdir):
+    """Reducers should consume the dates before all the reads are submitted."""
+    rio.open = mock_rasterio_open
+    paths = write_items(tmpdir, ["B01", "B02", "B03"] * 4)
+    events = []
+
+    def _reads():
+        return sum(event == "read" for event, _ in events)
+
+    class Recorder(REDUCERS["max"]):
+        def update(self, index, data, mask):
+            events.append(("update", index))
+            if index == 0:
+                # Slow consumer, give time to the workers to read all the dates
+                start = time.time()
+                while _reads() < len(paths) and time.time() - start < 1:
+                    time.sleep(0.01)
+
+            super().update(index, data, mask)
+
+    tile = STACReader.tile
+
+    def _tile(self, *args, **kwargs):
+        events.append(("read", paths.index(self.filepath)))
+        return tile(self, *args, **kwargs)
+
+    with patch.object(STACReader, "tile", _tile):
+        with STACStackReader(paths, threads=2) as stack:
+            data, mask = stack.tile(289, 207, 9, assets="B01", reducer=Recorder)
+
+    assert data.shape == (1, 256, 256)
+    # At most 2 * threads dates are read ahead of the reducer
+    for ix, (event, index) in enumerate(events):
+        if event == "update":
+            reads = [e for e in events[:ix] if e[0] == "read"]
+            assert len(reads) <= index + 1 + 2 * 2
+
+    assert [ix for event, ix in events if event == "update"] == list(range(len(paths)))
@@ -0,0 +1,132 @@
+"""Tests for rio_tiler_crs.stats."""
+
+import os
+
+import numpy
+import rasterio
+from rasterio.crs import CRS
+from rasterio.transform import from_bounds
+from rasterio.vrt import WarpedVRT
+
+from rio_tiler_crs import COGReader
+from rio_tiler_crs.stats import BandAccumulator, stream_stats
+
+prefix = os.path.join(os.path.dirname(__file__), "fixtures")
+COG_PATH = os.path.join(prefix, "cog.tif")
+COG_CMAP_PATH = os.path.join(prefix, "cog_cmap.tif")
+COG_SCALE_PATH = os.path.join(prefix, "cog_scale.tif")
+
+
+def test_band_accumulator():
+    """Should merge partial statistics."""
+    values = numpy.random.randint(0, 1000, size=10000).astype("uint16")
+
+    acc = BandAccumulator.for_dtype("uint16")
+    acc.update(values[:3000])
+    other = BandAccumulator.for_dtype("uint16")
+    other.update(values[3000:])
+    acc.merge(other)
+
+    assert acc.count == 10000
+    assert acc.min == values.min()
+    assert acc.max == values.max()
+    assert round(acc.mean, 6) == round(values.mean(), 6)
+    assert round(acc.m2 / acc.count, 3) == round(values.var(), 3)
+    for pc in [0, 2, 50, 98, 100]:
+        assert acc.percentile(pc) == numpy.percentile(values, pc)
+
+    hist = acc.histogram(bins=10)
+    expected = numpy.histogram(values, bins=10)
+    assert hist[0] == expected[0].tolist()
+
+    values = numpy.random.normal(size=10000).astype("float32")
+    acc = BandAccumulator.for_dtype("float32", (values.min(), values.max()))
+    acc.update(values)
+    assert abs(acc.percentile(50) - numpy.percentile(values, 50)) < 0.01
+
+    assert BandAccumulator.for_dtype("uint8").to_dict("uint8")["count"] == 0
+
+
+def test_stream_stats():
+    """Should match statistics of the full resolution data."""
+    with rasterio.open(COG_PATH) as src_dst:
+        arr = src_dst.read(1, masked=True)
+        values = arr.compressed()
+
+    with rasterio.open(COG_PATH) as src_dst:
+        stats = stream_stats(src_dst)
+        single = stream_stats(src_dst, threads=1)
+        overview = stream_stats(src_dst, overview_level=1, indexes=(1,))
+        nodata = stream_stats(src_dst, nodata=1, hist_options={"bins": 5})
+
+    assert stats[1]["min"] == values.min()
+    assert stats[1]["max"] == values.max()
+    assert stats[1]["count"] == values.size
+    assert round(stats[1]["std"], 4) == round(values.std(), 4)
+    assert stats[1]["pc"] == numpy.percentile(values, (2, 98)).astype("uint16").tolist()
+
+    assert single[1]["pc"] == stats[1]["pc"]
+    assert single[1]["histogram"] == stats[1]["histogram"]
+
+    with rasterio.open(COG_PATH, overview_level=1) as src_dst:
+        values = src_dst.read(1, masked=True).compressed()
+    assert overview[1]["count"] == values.size
+    assert overview[1]["min"] == values.min()
+    assert overview[1]["max"] == values.max()
+
+    assert nodata[1]["min"] > 1
+    assert len(nodata[1]["histogram"][0]) == 5
+
+
+def test_reader_streaming_stats():
+    """Test COGReader.streaming_stats."""
+    with COGReader(COG_PATH) as cog:
+        stats = cog.streaming_stats()
+        assert stats[1]["min"] == 1
+        assert stats[1]["max"] == 7872
+
+    with COGReader(COG_CMAP_PATH) as cog:
+        stats = cog.streaming_stats()
+        assert stats[1]["histogram"][1] == list(range(20))
+
+    with COGReader(COG_SCALE_PATH, unscale=True) as cog:
+        stats = cog.streaming_stats()
+        assert isinstance(stats[1]["min"], float)
+
+
+def test_stream_stats_bands(tmpdir):
+    """Should use each band scale and offset."""
+    path = str(tmpdir.join("scales.tif"))
+    data = numpy.arange(2 * 64 * 64, dtype="int16").reshape(2, 64, 64)
+    profile = dict(
+        driver="GTiff",
+        count=2,
+        dtype="int16",
+        width=64,
+        height=64,
+        crs=CRS.from_epsg(32621),
+        transform=from_bounds(300000, 8100000, 300640, 8100640, 64, 64),
+    )
+    with rasterio.open(path, "w", **profile) as dst:
+        dst.write(data)
+        dst.scales = (1.0, 0.5)
+        dst.offsets = (0.0, 10.0)
+
+    with COGReader(path, unscale=True) as cog:
+        stats = cog.streaming_stats()
+    assert stats[1]["min"] == data[0].min()
+    assert stats[2]["min"] == data[1].min() * 0.5 + 10
+    assert stats[2]["max"] == data[1].max() * 0.5 + 10
+
+
+def test_reader_streaming_stats_vrt():
+    """Should read the reader dataset (not a new handle on the file)."""
+    with rasterio.open(COG_PATH) as src_dst:
+        with WarpedVRT(src_dst, crs="epsg:4326") as vrt:
+            values = vrt.read(1, masked=True).compressed()
+            with COGReader(None, dataset=vrt) as cog:
+                stats = cog.streaming_stats()
+
+    assert stats[1]["count"] == values.size
+    assert stats[1]["min"] == values.min()
+    assert stats[1]["max"] == values.max()
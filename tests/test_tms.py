@@ -0,0 +1,69 @@
+"""Tests for rio_tiler_crs.tms."""
+
+import morecantile
+import pytest
+from rasterio.crs import CRS
+
+from rio_tiler_crs import tms as tms_registry
+
+EPSG3413 = morecantile.TileMatrixSet.custom(
+    (-4194300, -4194300, 4194300, 4194300),
+    CRS.from_epsg(3413),
+    identifier="EPSG3413",
+    matrix_scale=[2, 2],
+)
+
+
+@pytest.mark.parametrize(
+    "tms",
+    [
+        morecantile.tms.get("WebMercatorQuad"),
+        morecantile.tms.get("WorldCRS84Quad"),
+        morecantile.tms.get("EuropeanETRS89_LAEAQuad"),
+        EPSG3413,
+    ],
+)
+def test_prepared_tms(tms):
+    """Should return the same values as morecantile."""
+    prepared = tms_registry.prepare(tms)
+    assert prepared.identifier == tms.identifier
+    assert prepared.crs == tms.crs
+
+    for tile in [(0, 0, 1), (3, 2, 3), (100, 60, 8)]:
+        assert prepared.matrix(tile[2]) == tms.matrix(tile[2])
+        assert prepared.resolution(tile[2]) == tms._resolution(tms.matrix(tile[2]))
+        assert prepared.xy_bounds(*tile) == pytest.approx(tms.xy_bounds(*tile))
+        assert prepared.bounds(*tile) == pytest.approx(tms.bounds(*tile))
+        assert prepared.bounds(morecantile.Tile(*tile)) == pytest.approx(
+            tms.bounds(*tile)
+        )
+
+
+def test_xy_tiles():
+    """Should return the tiles intersecting a TMS bounding box."""
+    prepared = tms_registry.prepare(EPSG3413)
+    left, bottom, right, top = prepared.xy_bounds(3, 2, 3)
+    assert list(prepared.xy_tiles((left, bottom, right, top), 3)) == [
+        morecantile.Tile(3, 2, 3)
+    ]
+    assert list(prepared.xy_tiles((left + 1, bottom - 1, right, top), 3)) == [
+        morecantile.Tile(3, 2, 3),
+        morecantile.Tile(3, 3, 3),
+    ]
+    assert len(list(prepared.xy_tiles(prepared.xy_bounds(0, 0, 1), 3))) == 16
+
+    # Clamped to the matrix
+    assert len(list(prepared.xy_tiles((-1e8, -1e8, 1e8, 1e8), 2))) == 64
+
+
+def test_registry():
+    """Should share the prepared TMS."""
+    tms = tms_registry.get("WebMercatorQuad")
+    assert tms.tms is morecantile.tms.get("WebMercatorQuad")
+    assert tms_registry.get("WebMercatorQuad") is tms
+    assert tms_registry.prepare(morecantile.tms.get("WebMercatorQuad")) is tms
+
+    custom = morecantile.TileMatrixSet.custom(
+        (-4194300, -4194300, 4194300, 4194300), CRS.from_epsg(3413)
+    )
+    assert tms_registry.prepare(custom) is not tms_registry.prepare(EPSG3413)